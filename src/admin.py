@@ -0,0 +1,70 @@
+# src/admin.py
+"""
+CLI administracyjne - tylko baza danych (bez YOLO / OCR / OpenCV), startuje szybko.
+
+Przykłady:
+    python -m src.admin open
+    python -m src.admin history --limit 20
+    python -m src.admin exit SCZ26114
+    python -m src.admin export data/parking_export.csv --incremental
+    python -m src.admin export data/2025-01.csv --from 2025-01-01 --to 2025-02-01
+"""
+import argparse
+from datetime import datetime
+
+from src.storage.db import init_db
+from src.storage.export import export_events
+from src.storage.repo import list_last, list_open, manual_exit, EVENT_COLUMNS
+
+
+def _print_rows(rows: list[dict]):
+    if not rows:
+        print("(brak rekordów)")
+        return
+
+    widths = {c: max(len(c), *(len(str(r[c] if r[c] is not None else "")) for r in rows))
+              for c in EVENT_COLUMNS}
+    print("  ".join(c.ljust(widths[c]) for c in EVENT_COLUMNS))
+    for r in rows:
+        print("  ".join(str(r[c] if r[c] is not None else "").ljust(widths[c]) for c in EVENT_COLUMNS))
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Parking ALPR - administracja bazą")
+    sub = ap.add_subparsers(dest="cmd", required=True)
+
+    sub.add_parser("open", help="auta aktualnie na parkingu (IN)")
+
+    p = sub.add_parser("history", help="ostatnie zdarzenia")
+    p.add_argument("--limit", type=int, default=50)
+
+    p = sub.add_parser("exit", help="ręczne wypuszczenie (MANUAL_EXIT)")
+    p.add_argument("plate")
+
+    p = sub.add_parser("export", help="eksport historii do CSV / Parquet")
+    p.add_argument("out", help="np. data/parking_export.csv albo .parquet")
+    p.add_argument("--incremental", action="store_true", help="tylko zmiany od ostatniego eksportu (CSV)")
+    p.add_argument("--from", dest="date_from", type=datetime.fromisoformat, default=None)
+    p.add_argument("--to", dest="date_to", type=datetime.fromisoformat, default=None)
+
+    args = ap.parse_args()
+    init_db()
+
+    if args.cmd == "open":
+        _print_rows(list_open())
+    elif args.cmd == "history":
+        _print_rows(list_last(args.limit))
+    elif args.cmd == "exit":
+        event_id = manual_exit(args.plate.upper())
+        print(f"MANUAL_EXIT: {args.plate.upper()} (id={event_id})")
+    elif args.cmd == "export":
+        try:
+            n = export_events(args.out, date_from=args.date_from, date_to=args.date_to,
+                              incremental=args.incremental)
+        except (RuntimeError, ValueError) as e:
+            ap.error(str(e))
+        print(f"Zapisano: {args.out} ({n} rekordów)")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,88 +1,363 @@
 # src/app_service.py
+import contextlib
 from datetime import datetime
 from pathlib import Path
 
-import cv2
-
+from src.config import DETECTOR_BACKEND, OCR_CASCADE, BoxFilter, DetectorBackend, OcrCascade, camera_roi
 from src.storage.db import init_db
-from src.storage.repo import register_entry, register_exit, list_open, list_last, list_all
-from src.vision.detector import PlateDetector
-from src.vision.preprocess import crop_with_padding, basic_preprocess
-from src.vision.ocr import PlateOCR
-from src.vision.validate import validate_and_fix
+from src.storage.export import export_events
+from src.storage.repo import register_entry, register_exit, list_open, list_last
+from src.timing import StageTimer
+from src.vision import registry
+from src.vision.cache import RecognitionCache, bytes_sha1, file_sha1
+
+# margines cropa tablicy (px) - ten sam w odczycie i w kluczu cache
+PLATE_PAD = 30
+
+# cv2 / numpy / ultralytics / paddleocr ładowane leniwie - przy pierwszym odczycie,
+# więc ścieżki tylko-bazodanowe (open_cars, history, export) startują szybko.
+
+
+def _weights_id(path: Path) -> str:
+    """SHA-1 treści wag (plik albo katalog eksportu); brak wag -> sama ścieżka."""
+    if path.is_file():
+        return file_sha1(str(path))
+    if path.is_dir():
+        files = sorted(p for p in path.rglob("*") if p.is_file())
+        return bytes_sha1("".join(f"{p.relative_to(path)}={file_sha1(str(p))};" for p in files).encode())
+    return str(path)
 
 
 class ParkingService:
-    def __init__(self, model_path: str = "models/plate_detector.pt", yolo_conf: float = 0.35):
+    def __init__(self, model_path: str = "models/plate_detector.pt", yolo_conf: float = 0.35,
+                 ocr_mode: str = "full", cache_size: int = 128, cache_db: str | None = None,
+                 detector=None, ocr=None, camera: str | None = None,
+                 multi_plate: bool = False, box_filter: BoxFilter | None = None,
+                 backend: DetectorBackend | None = None, timings: bool = False,
+                 preprocess_workers: int = 1, ocr_cascade: OcrCascade | None = None,
+                 cache_frames: bool = False):
+        """
+        ocr_cascade: warianty cropa dla OCR, kolejny tylko przy niepewnym odczycie
+                    (domyślnie src.config.OCR_CASCADE; statystyki: cascade_stats())
+        timings:    histogramy czasów etapów w procesie (self.timer: p50/p95/p99, Prometheus, JSON)
+        preprocess_workers: wątki preprocessu paczki cropów (przydatne przy multi_plate / wielu pasach)
+        backend:    runtime detektora (torch / onnx / openvino); domyślnie src.config.DETECTOR_BACKEND
+        camera:     nazwa kamery z src.config.CAMERAS - YOLO widzi tylko jej ROI
+        multi_plate: OCR wszystkich tablic w kadrze (nie tylko najpewniejszej ramki YOLO);
+                    wynik ma listę "candidates", a "plate" to najlepszy kandydat
+        box_filter: filtr ramek w trybie multi_plate (domyślnie BoxFilter())
+        cache_size: ile ostatnich odczytów trzymać w LRU (0 = bez cache)
+        cache_frames: cache także dla klatek ndarray (SHA-1 całej klatki na każdy odczyt -
+                    dla wideo na żywo zwykle strata, więc domyślnie tylko pliki / bajty)
+        cache_db:   opcjonalny plik SQLite dla cache odczytów
+        detector / ocr: gotowe modele; domyślnie współdzielone z rejestru procesu
+        """
         init_db()
-        self.detector = PlateDetector(model_path, conf=yolo_conf)
-        self.ocr = PlateOCR()
-
-    def read_plate(self, img_path: str) -> dict:
-        p = Path(img_path)
-        if not p.exists():
-            return {"ok": False, "error": f"Brak pliku: {img_path}"}
-
-        img = cv2.imread(str(p))
-        if img is None:
-            return {"ok": False, "error": f"Nie mogę wczytać: {img_path}"}
-
-        det = self.detector.detect_best(img)
-        if det is None:
-            return {"ok": False, "error": "Brak detekcji tablicy (YOLO)"}
-
-        x1, y1, x2, y2, yconf = det
-        plate_bgr = crop_with_padding(img, x1, y1, x2, y2, pad=30)
-        if plate_bgr is None or plate_bgr.size == 0:
-            return {"ok": False, "error": "Pusty crop tablicy"}
-
-        plate_rgb = basic_preprocess(plate_bgr)
-        raw, rconf = self.ocr.read_best(plate_rgb)
-        fixed = validate_and_fix(raw)
-
-        return {
-            "ok": True,
-            "plate": fixed or None,
-            "raw": raw,
-            "ocr_conf": float(rconf),
-            "yolo_conf": float(yconf),
-        }
-
-    def entry_from_image(self, img_path: str) -> dict:
-        res = self.read_plate(img_path)
+        self.model_path = model_path
+        self.yolo_conf = yolo_conf
+        self.ocr_mode = ocr_mode
+        self.backend = backend or DETECTOR_BACKEND
+        self.roi = camera_roi(camera)
+        self.multi_plate = multi_plate
+        self.box_filter = box_filter or BoxFilter()
+        self._detector = detector
+        self._ocr = ocr
+        self.timer = StageTimer(enabled=timings)
+        self.preprocess_workers = preprocess_workers
+        self.ocr_cascade = ocr_cascade or OCR_CASCADE
+        self._cascade = None
+        self.cache_frames = cache_frames
+
+        # wynik zależy od treści zdjęcia + modelu + progów
+        self.cache = RecognitionCache(cache_size, cache_db) if cache_size > 0 else None
+        if self.cache is not None:
+            from src.vision.backends import exported_path
+
+            # wagi faktycznie ładowane przez backend (.pt / .onnx / katalog openvino)
+            weights = exported_path(model_path, self.backend)
+            self._cache_ident = (f"{weights}:{_weights_id(weights)}|{self.backend.tag}"
+                                 f"|yolo={yolo_conf}|ocr={ocr_mode}|pad={PLATE_PAD}"
+                                 f"|roi={self.roi}|cascade={self.ocr_cascade}")
+            if multi_plate:
+                self._cache_ident += f"|multi={self.box_filter}"
+
+    @property
+    def detector(self):
+        if self._detector is None:
+            self._detector = registry.get_detector(self.model_path, self.yolo_conf,
+                                                   backend=self.backend)
+        return self._detector
+
+    @property
+    def ocr(self):
+        if self._ocr is None:
+            self._ocr = registry.get_ocr(self.ocr_mode)
+        return self._ocr
+
+    @property
+    def cascade(self):
+        if self._cascade is None:
+            from src.vision.cascade import CascadeReader
+            self._cascade = CascadeReader(self.ocr_cascade, workers=self.preprocess_workers)
+        return self._cascade
+
+    def load_models(self):
+        """Ładuje (i rozgrzewa) modele od razu, zamiast przy pierwszym odczycie."""
+        return self.detector, self.ocr
+
+    def read_plate(self, img_path: str, timings: bool = False) -> dict:
+        return self.read_plates([img_path], timings=timings)[0]
+
+    def read_frame(self, frame, timings: bool = False) -> dict:
+        """
+        Odczyt klatki z pamięci - bez zapisu na dysk:
+        - zakodowane bajty (bytes / bytearray / memoryview, np. JPEG z kamery lub uploadu)
+        - gotowy obraz BGR (numpy.ndarray) - używany bez kopiowania
+        """
+        return self.read_plates([frame], timings=timings)[0]
+
+    def read_plates(self, images: list, timings: bool = False) -> list[dict]:
+        """
+        Odczyt wielu zdjęć naraz (np. kilka pasów w jednej chwili).
+        Elementy: ścieżka (str / Path), zakodowane bajty albo ndarray BGR.
+        Detekcja YOLO idzie jednym przebiegiem dla wszystkich wczytanych obrazów.
+        Powtórny odczyt tego samego zdjęcia (ta sama treść) bierzemy z cache
+        (klatki ndarray tylko z cache_frames=True).
+
+        timings: dodaje do wyników "timings_ms" - czasy etapów całego wywołania
+                 (przy kilku obrazach: suma dla paczki)
+        """
+        import cv2
+        import numpy as np
+
+        timer = self.timer
+        acc = {} if timings else None
+
+        results: list[dict | None] = [None] * len(images)
+        keys: dict[int, str] = {}
+        frames = []
+        idx = []
+        for i, src in enumerate(images):
+            data = None
+            img = None
+            if isinstance(src, np.ndarray):
+                img = src
+            elif isinstance(src, (str, Path)):
+                p = Path(src)
+                if not p.exists():
+                    results[i] = {"ok": False, "error": f"Brak pliku: {src}"}
+                    continue
+                with timer.stage("read", acc):
+                    data = p.read_bytes()
+                label = str(src)
+            else:
+                data = src
+                label = "obraz z pamięci"
+
+            if self.cache is not None and (data is not None or self.cache_frames):
+                with timer.stage("cache", acc):
+                    if data is None:
+                        # treść klatki + kształt (te same bajty mogą mieć inny układ)
+                        keys[i] = f"{bytes_sha1(np.ascontiguousarray(img).data)}|{img.shape}|{self._cache_ident}"
+                    else:
+                        keys[i] = f"{bytes_sha1(data)}|{self._cache_ident}"
+                    cached = self.cache.get(keys[i])
+                if cached is not None:
+                    results[i] = cached
+                    continue
+
+            if data is not None and len(data):
+                with timer.stage("decode", acc):
+                    # frombuffer: widok na bufor, bez kopii
+                    img = cv2.imdecode(np.frombuffer(data, np.uint8), cv2.IMREAD_COLOR)
+
+            if img is None:
+                results[i] = {"ok": False, "error": f"Nie mogę wczytać: {label}"}
+                continue
+
+            frames.append(img)
+            idx.append(i)
+
+        # same trafienia cache / błędy wczytania: bez ładowania modeli i pustych próbek "detect"
+        if frames:
+            if self.multi_plate:
+                self._read_all(frames, idx, results, acc)
+            else:
+                self._read_best(frames, idx, results, acc)
+
+        if self.cache is not None:
+            for i in idx:
+                if i in keys:
+                    self.cache.put(keys[i], results[i])
+
+        if acc is not None:
+            # kopia - nie zmieniamy słowników trzymanych w cache
+            ms = {k: round(1000 * v, 3) for k, v in acc.items()}
+            results = [{**r, "timings_ms": dict(ms)} for r in results]
+        return results
+
+    def _read_best(self, frames, idx, results, acc=None):
+        from src.vision.preprocess import crop_with_padding
+        from src.vision.roi import detect_batch_roi
+
+        timer = self.timer
+        # ramki wracają w układzie pełnej klatki
+        with timer.stage("detect", acc):
+            dets = detect_batch_roi(self.detector, frames, self.roi)
+
+        # crop (widoki na klatki), potem kaskada OCR: każdy wariant jednym wywołaniem dla wszystkich tablic
+        pending = []
+        crops = []
+        for i, img, det in zip(idx, frames, dets):
+            if det is None:
+                results[i] = {"ok": False, "error": "Brak detekcji tablicy (YOLO)"}
+                continue
+
+            x1, y1, x2, y2, yconf = det
+            with timer.stage("crop", acc):
+                plate_bgr = crop_with_padding(img, x1, y1, x2, y2, pad=PLATE_PAD, copy=False)
+            if plate_bgr is None or plate_bgr.size == 0:
+                results[i] = {"ok": False, "error": "Pusty crop tablicy"}
+                continue
+
+            pending.append((i, yconf))
+            crops.append(plate_bgr)
+
+        for (i, yconf), r in zip(pending, self.cascade.read(self.ocr, crops, timer, acc)):
+            results[i] = {
+                "ok": True,
+                "plate": r.plate,
+                "raw": r.raw,
+                "ocr_conf": r.conf,
+                "ocr_variant": r.variant,
+                "yolo_conf": float(yconf),
+            }
+
+    def _read_all(self, frames, idx, results, acc=None):
+        """
+        Wszystkie ramki ze wszystkich obrazów -> kaskada OCR (jedno wywołanie na wariant).
+        Ranking kandydatów: poprawna tablica, potem ocr_conf * yolo_conf.
+        """
+        from src.vision.preprocess import crop_with_padding
+        from src.vision.roi import detect_all_batch_roi
+
+        timer = self.timer
+        with timer.stage("detect", acc):
+            per_frame = detect_all_batch_roi(self.detector, frames, self.roi, self.box_filter)
+
+        pending = []
+        crops = []
+        for i, img, boxes in zip(idx, frames, per_frame):
+            if not boxes:
+                results[i] = {"ok": False, "error": "Brak detekcji tablicy (YOLO)"}
+                continue
+            for x1, y1, x2, y2, yconf in boxes:
+                with timer.stage("crop", acc):
+                    plate_bgr = crop_with_padding(img, x1, y1, x2, y2, pad=PLATE_PAD, copy=False)
+                if plate_bgr is None or plate_bgr.size == 0:
+                    continue
+                pending.append((i, (x1, y1, x2, y2), yconf))
+                crops.append(plate_bgr)
+
+        candidates: dict[int, list[dict]] = {}
+        for (i, box, yconf), r in zip(pending, self.cascade.read(self.ocr, crops, timer, acc)):
+            candidates.setdefault(i, []).append({
+                "plate": r.plate,
+                "raw": r.raw,
+                "ocr_conf": r.conf,
+                "ocr_variant": r.variant,
+                "yolo_conf": float(yconf),
+                "box": box,
+            })
+
+        for i, boxes in zip(idx, per_frame):
+            if not boxes:
+                continue
+            cands = candidates.get(i)
+            if not cands:
+                results[i] = {"ok": False, "error": "Pusty crop tablicy"}
+                continue
+            cands.sort(key=lambda c: (c["plate"] is not None, c["ocr_conf"] * c["yolo_conf"]),
+                       reverse=True)
+            best = cands[0]
+            results[i] = {
+                "ok": True,
+                "plate": best["plate"],
+                "raw": best["raw"],
+                "ocr_conf": best["ocr_conf"],
+                "ocr_variant": best["ocr_variant"],
+                "yolo_conf": best["yolo_conf"],
+                "candidates": cands,
+            }
+
+    def entry_from_image(self, img_path: str, timings: bool = False) -> dict:
+        return self._entry(self.read_plate(img_path, timings=timings))
+
+    def entry_from_frame(self, frame, timings: bool = False) -> dict:
+        """Wjazd z klatki w pamięci (bajty albo ndarray BGR) - patrz read_frame."""
+        return self._entry(self.read_frame(frame, timings=timings))
+
+    def exit_from_image(self, img_path: str, timings: bool = False) -> dict:
+        return self._exit(self.read_plate(img_path, timings=timings))
+
+    def exit_from_frame(self, frame, timings: bool = False) -> dict:
+        """Wyjazd z klatki w pamięci (bajty albo ndarray BGR) - patrz read_frame."""
+        return self._exit(self.read_frame(frame, timings=timings))
+
+    def _entry(self, res: dict) -> dict:
         if not res["ok"] or not res.get("plate"):
             return {"ok": False, "error": res.get("error", "UNKNOWN"), "read": res}
 
         plate = res["plate"]
-        
+
         try:
-            event_id = register_entry(plate)
+            with self._db_stage(res):
+                event_id = register_entry(plate)
             return {"ok": True, "event_id": event_id, "plate": plate, "read": res}
         except ValueError as e:
             return {"ok": False, "error": str(e), "plate": plate, "read": res}
 
-
-
-        
-
-    def exit_from_image(self, img_path: str) -> dict:
-        res = self.read_plate(img_path)
+    def _exit(self, res: dict) -> dict:
         if not res["ok"] or not res.get("plate"):
             return {"ok": False, "error": res.get("error", "UNKNOWN"), "read": res}
 
         plate = res["plate"]
-        out = register_exit(plate, datetime.now())
+        with self._db_stage(res):
+            out = register_exit(plate, datetime.now())
         if out is None:
             return {"ok": False, "error": f"BLOCKED: brak aktywnego wjazdu dla {plate}", "read": res}
 
         return {"ok": True, "exit": out, "plate": plate, "read": res}
 
+    @contextlib.contextmanager
+    def _db_stage(self, res: dict):
+        """Zapis SQLite jako etap "db"; przy odczycie z timings=True także w res["timings_ms"]."""
+        ms = res.get("timings_ms")
+        acc = {} if ms is not None else None
+        try:
+            with self.timer.stage("db", acc):
+                yield
+        finally:
+            if acc:
+                ms["db"] = round(1000 * acc["db"], 3)
+
+    def cache_stats(self) -> dict | None:
+        return self.cache.stats() if self.cache is not None else None
+
+    def cascade_stats(self) -> dict | None:
+        """Statystyki kaskady OCR (None, dopóki nic nie odczytano)."""
+        return self._cascade.stats.snapshot() if self._cascade is not None else None
+
     def open_cars(self):
         return list_open()
 
     def history(self, limit: int = 50):
         return list_last(limit)
 
-    def export_all(self, out_csv: str):
-        rows = list_all()
-        return rows
+    def export_all(self, out_csv: str, incremental: bool = False,
+                   date_from: datetime | None = None, date_to: datetime | None = None) -> int:
+        """
+        Strumieniowy eksport historii do out_csv (CSV, albo Parquet dla *.parquet).
+        Zwraca liczbę zapisanych rekordów.
+        """
+        return export_events(out_csv, date_from=date_from, date_to=date_to, incremental=incremental)
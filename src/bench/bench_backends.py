@@ -0,0 +1,115 @@
+# src/bench/bench_backends.py
+"""
+Porównanie backendów detektora na CPU: torch (.pt) vs ONNX / OpenVINO (fp32 / int8).
+
+Dla każdego backendu: latencja detect_best (p50/p95), przyrost pamięci po załadowaniu
+i rozgrzewce, oraz zgodność z torch na data/images: wspólne detekcje, średnie IoU
+ramek, średnia / maks. różnica conf. Brakujące eksporty tworzy --export.
+
+Przykład:
+    python -m src.bench.bench_backends --backends onnx,openvino,openvino-int8 --export
+"""
+import argparse
+import gc
+import os
+import time
+
+from src.bench.bench_detect import _load_images
+from src.config import DetectorBackend
+from src.timing import quantile
+
+
+def _parse_backend(spec: str) -> DetectorBackend:
+    name, _, q = spec.partition("-")
+    return DetectorBackend(name, int8=(q == "int8"))
+
+
+def _measure(weights: str, imgs, repeat: int) -> tuple[list, list[float], float | None]:
+    from src.vision.detector import PlateDetector
+    from src.vision.registry import _rss_mb
+
+    gc.collect()
+    rss0 = _rss_mb()
+    detector = PlateDetector(weights)
+    detector.detect_best(imgs[0])  # rozgrzewka
+    rss1 = _rss_mb()
+
+    times = []
+    dets = []
+    for r in range(repeat):
+        for im in imgs:
+            t0 = time.perf_counter()
+            d = detector.detect_best(im)
+            times.append(time.perf_counter() - t0)
+            if r == 0:
+                dets.append(d)
+
+    del detector
+    gc.collect()
+    mem = (rss1 - rss0) if rss0 is not None and rss1 is not None else None
+    return dets, times, mem
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--images", default="data/images")
+    ap.add_argument("--model", default="models/plate_detector.pt")
+    ap.add_argument("--backends", default="onnx,openvino,openvino-int8",
+                    help="lista: onnx, openvino, openvino-int8 (torch zawsze jako odniesienie)")
+    ap.add_argument("--limit", type=int, default=None)
+    ap.add_argument("--repeat", type=int, default=2)
+    ap.add_argument("--threads", type=int, default=None, help="wątki torch / OpenCV")
+    ap.add_argument("--export", action="store_true", help="wyeksportuj brakujące modele")
+    args = ap.parse_args()
+
+    os.environ["CUDA_VISIBLE_DEVICES"] = ""
+    if args.threads:
+        import cv2
+        import torch
+        cv2.setNumThreads(args.threads)
+        torch.set_num_threads(args.threads)
+
+    from src.vision.backends import resolve_weights
+    from src.vision.tracker import iou
+
+    imgs = _load_images(args.images, args.limit)
+    if not imgs:
+        raise FileNotFoundError(f"No .jpg found in {args.images}")
+
+    backends = [DetectorBackend()] + [_parse_backend(b) for b in args.backends.split(",") if b]
+    rows = []
+    ref = None
+    for b in backends:
+        weights = resolve_weights(args.model, b, auto_export=args.export)
+        dets, times, mem = _measure(weights, imgs, args.repeat)
+        if ref is None:
+            ref = dets
+
+        both = [(a, d) for a, d in zip(ref, dets) if a is not None and d is not None]
+        ious = [iou(a, d) for a, d in both]
+        dconf = [abs(a[4] - d[4]) for a, d in both]
+        rows.append({
+            "backend": b.tag,
+            "p50_ms": 1000 * quantile(times, 0.50),
+            "p95_ms": 1000 * quantile(times, 0.95),
+            "mem_mb": mem,
+            "agree": sum(1 for a, d in zip(ref, dets) if (a is None) == (d is None)),
+            "mean_iou": sum(ious) / len(ious) if ious else 0.0,
+            "mean_dconf": sum(dconf) / len(dconf) if dconf else 0.0,
+            "max_dconf": max(dconf, default=0.0),
+        })
+
+    n = len(imgs)
+    print(f"Images: {n}, repeat={args.repeat}, reference=torch")
+    print(f"{'backend':>14} {'p50 ms':>8} {'p95 ms':>8} {'x p50':>6} {'mem MB':>7} "
+          f"{'agree':>7} {'IoU':>6} {'dconf':>6} {'max':>6}")
+    base = rows[0]["p50_ms"]
+    for r in rows:
+        mem = f"{r['mem_mb']:7.1f}" if r["mem_mb"] is not None else f"{'-':>7}"
+        print(f"{r['backend']:>14} {r['p50_ms']:8.1f} {r['p95_ms']:8.1f} "
+              f"{base / max(r['p50_ms'], 1e-9):6.2f} {mem} {r['agree']:>3}/{n:<3} "
+              f"{r['mean_iou']:6.3f} {r['mean_dconf']:6.3f} {r['max_dconf']:6.3f}")
+
+
+if __name__ == "__main__":
+    main()
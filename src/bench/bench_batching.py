@@ -0,0 +1,118 @@
+# src/bench/bench_batching.py
+"""
+Benchmark MicroBatcher: latencja p50/p99 w funkcji tempa żądań (rozkład Poissona, pętla otwarta).
+
+--mode stub: atrapy modeli (src/vision/stubs.py) z kosztem batcha base + per_item - działa wszędzie
+--mode real: ParkingService.read_plates na data/images (prawdziwe modele)
+
+Przykład:
+    python -m src.bench.bench_batching --rates 10,25,50,100 --batch 1,4,8 --wait-ms 5,20
+"""
+import argparse
+import asyncio
+import glob
+import random
+import statistics
+import time
+from pathlib import Path
+
+from src.scheduler import MicroBatcher
+from src.timing import quantile
+
+
+def _stub_fn():
+    from src.vision.stubs import StubDetector, StubOCR
+
+    det = StubDetector()
+    ocr = StubOCR()
+
+    def read_batch(items):
+        dets = det.detect_batch(items)
+        reads = ocr.read_batch(dets)
+        return [{"ok": True, "plate": t, "ocr_conf": c} for t, c in reads]
+
+    return read_batch
+
+
+def _real_fn(images_dir: str):
+    from src.app_service import ParkingService
+
+    service = ParkingService(cache_size=0)
+    service.load_models()
+    paths = sorted(glob.glob(str(Path(images_dir) / "*.jpg")))
+    return service.read_plates, paths
+
+
+async def _run_point(fn, items, rate: float, n: int, max_batch: int, wait_ms: float,
+                     max_queue: int, seed: int) -> dict:
+    rnd = random.Random(seed)
+    latencies = []
+    rejected = 0
+
+    async def one(item):
+        t0 = time.perf_counter()
+        await batcher.submit(item)
+        latencies.append(time.perf_counter() - t0)
+
+    batcher = MicroBatcher(fn, max_batch=max_batch, max_wait_ms=wait_ms, max_queue=max_queue)
+    async with batcher:
+        tasks = []
+        t_start = time.perf_counter()
+        for i in range(n):
+            if batcher.qsize() >= max_queue:
+                rejected += 1
+            else:
+                tasks.append(asyncio.create_task(one(items[i % len(items)])))
+            await asyncio.sleep(rnd.expovariate(rate))
+        await asyncio.gather(*tasks)
+        elapsed = time.perf_counter() - t_start
+        stats = batcher.stats()
+
+    return {
+        "rate": rate,
+        "max_batch": max_batch,
+        "wait_ms": wait_ms,
+        "done": len(latencies),
+        "rejected": rejected,
+        "throughput": len(latencies) / elapsed,
+        "p50_ms": 1000 * quantile(latencies, 0.50),
+        "p99_ms": 1000 * quantile(latencies, 0.99),
+        "mean_ms": 1000 * statistics.fmean(latencies) if latencies else 0.0,
+        "avg_batch": stats["avg_batch"],
+    }
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--mode", choices=["stub", "real"], default="stub")
+    ap.add_argument("--images", default="data/images")
+    ap.add_argument("--rates", default="10,25,50,100", help="żądań/s")
+    ap.add_argument("--batch", default="1,4,8", help="max_batch (1 = bez batchowania)")
+    ap.add_argument("--wait-ms", default="5,20")
+    ap.add_argument("--requests", type=int, default=300, help="żądań na punkt")
+    ap.add_argument("--max-queue", type=int, default=256)
+    args = ap.parse_args()
+
+    if args.mode == "stub":
+        fn, items = _stub_fn(), [None]
+    else:
+        fn, items = _real_fn(args.images)
+
+    rates = [float(x) for x in args.rates.split(",")]
+    batches = [int(x) for x in args.batch.split(",")]
+    waits = [float(x) for x in args.wait_ms.split(",")]
+
+    print(f"{'rate/s':>7} {'batch':>5} {'wait':>5} {'done':>5} {'rej':>4} {'thr/s':>7} "
+          f"{'p50 ms':>8} {'p99 ms':>8} {'avg bs':>6}")
+    for rate in rates:
+        for max_batch in batches:
+            for wait_ms in (waits if max_batch > 1 else [0.0]):
+                r = asyncio.run(_run_point(fn, items, rate, args.requests, max_batch,
+                                           wait_ms, args.max_queue, seed=0))
+                print(f"{r['rate']:7.0f} {r['max_batch']:5d} {r['wait_ms']:5.0f} {r['done']:5d} "
+                      f"{r['rejected']:4d} {r['throughput']:7.1f} {r['p50_ms']:8.1f} "
+                      f"{r['p99_ms']:8.1f} {r['avg_batch']:6.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+# src/bench/bench_concurrency.py
+"""
+Test obciążeniowy wielu procesów bramek na jednej bazie: przejścia wjazd/wyjazd na sekundę
+oraz sprawdzenie poprawności po zakończeniu:
+- żadna tablica nie ma dwóch aktywnych IN
+- każdy wjazd zamknięty dokładnie raz (brak podwójnych wyjazdów tego samego id)
+- liczby udanych wjazdów/wyjazdów zgadzają się ze stanem tabeli
+- brak nieoczekiwanych wyjątków (IntegrityError, "database is locked", ...)
+
+Przykład:
+    python -m src.bench.bench_concurrency --procs 4 --ops 2000 --plates 20
+"""
+import argparse
+import multiprocessing as mp
+import random
+import tempfile
+import time
+from collections import Counter
+from pathlib import Path
+
+
+def _worker(args) -> dict:
+    db_path, seed, ops, plates = args
+
+    from src.storage import db, repo
+
+    db.DB_PATH = Path(db_path)
+    rnd = random.Random(seed)
+    stats = {"entries": 0, "entry_rejected": 0, "exits": [], "blocked": 0, "errors": []}
+
+    for _ in range(ops):
+        plate = f"ST{rnd.randrange(plates):04d}"
+        try:
+            if rnd.random() < 0.5:
+                repo.register_entry(plate)
+                stats["entries"] += 1
+            else:
+                out = repo.register_exit(plate)
+                if out is None:
+                    stats["blocked"] += 1
+                else:
+                    stats["exits"].append(out["id"])
+        except ValueError:
+            stats["entry_rejected"] += 1
+        except Exception as e:  # każdy inny wyjątek to błąd współbieżności
+            stats["errors"].append(repr(e))
+
+    db.close_conn()
+    return stats
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--procs", type=int, default=4)
+    ap.add_argument("--ops", type=int, default=2000, help="operacji na proces")
+    ap.add_argument("--plates", type=int, default=20, help="mała pula = dużo kolizji")
+    args = ap.parse_args()
+
+    from src.storage import db
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = Path(tmp) / "stress.db"
+        db.DB_PATH = db_path
+        db.init_db()
+        db.close_conn()
+
+        ctx = mp.get_context("spawn")
+        jobs = [(str(db_path), seed, args.ops, args.plates) for seed in range(args.procs)]
+        with ctx.Pool(args.procs) as pool:
+            t0 = time.perf_counter()
+            results = pool.map(_worker, jobs)
+            dt = time.perf_counter() - t0
+
+        entries = sum(r["entries"] for r in results)
+        exit_ids = [i for r in results for i in r["exits"]]
+        blocked = sum(r["blocked"] for r in results)
+        rejected = sum(r["entry_rejected"] for r in results)
+        errors = [e for r in results for e in r["errors"]]
+
+        conn = db.connect(db_path)
+        by_status = dict(conn.execute(
+            "SELECT status, COUNT(*) FROM parking_events GROUP BY status"
+        ).fetchall())
+        double_in = conn.execute(
+            "SELECT COUNT(*) FROM (SELECT plate FROM parking_events WHERE status='IN' "
+            "GROUP BY plate HAVING COUNT(*) > 1)"
+        ).fetchone()[0]
+        conn.close()
+
+    total = args.procs * args.ops
+    dup_exits = sum(1 for c in Counter(exit_ids).values() if c > 1)
+    checks = {
+        "no double IN": double_in == 0,
+        "no double exit": dup_exits == 0,
+        "entries == IN + OUT": entries == by_status.get("IN", 0) + by_status.get("OUT", 0),
+        "exits == OUT": len(exit_ids) == by_status.get("OUT", 0),
+        "blocked == BLOCKED": blocked == by_status.get("BLOCKED", 0),
+        "no errors": not errors,
+    }
+
+    print(f"Procs: {args.procs}, ops: {total}, plates: {args.plates}")
+    print(f"Throughput: {total / dt:.1f} transitions/s ({dt:.2f}s)")
+    print(f"Entries: {entries} (rejected {rejected}), exits: {len(exit_ids)}, blocked: {blocked}")
+    for name, ok in checks.items():
+        print(f"[{'OK' if ok else 'FAIL'}] {name}")
+    for e in errors[:5]:
+        print(f"  error: {e}")
+
+    if not all(checks.values()):
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+# src/bench/bench_db.py
+"""
+Mikro-benchmark tabeli parking_events: zdarzenia/s przed i po zmianach w storage.db.
+
+- legacy: nowe sqlite3.connect na każde wywołanie, domyślny rollback journal
+- pooled: połączenie per wątek (get_conn), WAL, synchronous=NORMAL
+
+Każdy wariant działa na osobnym pliku w katalogu tymczasowym (journal_mode jest zapisywany w pliku bazy).
+
+Przykład:
+    python -m src.bench.bench_db --events 5000
+"""
+import argparse
+import tempfile
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+from src.storage import db, repo
+
+
+def _run(events: int, plates: int) -> float:
+    db.init_db()
+    t0 = datetime(2025, 1, 1, 8, 0, 0)
+
+    start = time.perf_counter()
+    for i in range(events):
+        plate = f"BEN{i % plates:05d}"
+        when = t0 + timedelta(seconds=i)
+        # co druga operacja na tablicy: wjazd / wyjazd
+        if (i // plates) % 2 == 0:
+            repo.register_entry(plate, when)
+        else:
+            repo.register_exit(plate, when)
+        if i % 50 == 0:
+            repo.list_open()
+    return time.perf_counter() - start
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--events", type=int, default=5000)
+    ap.add_argument("--plates", type=int, default=100)
+    args = ap.parse_args()
+
+    orig_path = db.DB_PATH
+    orig_get_conn = repo.get_conn
+    results = {}
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            # legacy: nowe połączenie na każde wywołanie, bez strojenia
+            db.DB_PATH = Path(tmp) / "legacy.db"
+            repo.get_conn = db.get_conn = lambda: db.connect(db.DB_PATH, tuned=False)
+            results["legacy"] = _run(args.events, args.plates)
+
+            # pooled: długo żyjące połączenie + WAL
+            repo.get_conn = db.get_conn = orig_get_conn
+            db.DB_PATH = Path(tmp) / "pooled.db"
+            results["pooled"] = _run(args.events, args.plates)
+            db.close_conn()
+    finally:
+        db.DB_PATH = orig_path
+        repo.get_conn = db.get_conn = orig_get_conn
+
+    print(f"Events: {args.events} ({args.plates} plates, list_open every 50)")
+    for name, dt in results.items():
+        print(f"{name:8s} {args.events / dt:10.1f} events/s  ({dt:.2f}s)")
+    print(f"speedup  x{results['legacy'] / results['pooled']:.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+# src/bench/bench_detect.py
+"""
+Benchmark detekcji: pętla detect_best (obraz po obrazie) vs detect_batch.
+
+Przykład:
+    python -m src.bench.bench_detect --batch 8 --repeat 3
+"""
+import argparse
+import glob
+import os
+import time
+from pathlib import Path
+
+
+def _load_images(images_dir: str, limit: int | None):
+    import cv2
+
+    paths = sorted(glob.glob(str(Path(images_dir) / "*.jpg")))
+    if limit:
+        paths = paths[:limit]
+    imgs = [cv2.imread(p) for p in paths]
+    return [im for im in imgs if im is not None]
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--images", default="data/images")
+    ap.add_argument("--model", default="models/plate_detector.pt")
+    ap.add_argument("--limit", type=int, default=None)
+    ap.add_argument("--batch", type=int, default=8)
+    ap.add_argument("--repeat", type=int, default=3)
+    ap.add_argument("--gpu", action="store_true", help="domyślnie wymuszamy CPU")
+    args = ap.parse_args()
+
+    if not args.gpu:
+        os.environ["CUDA_VISIBLE_DEVICES"] = ""
+
+    from src.vision.detector import PlateDetector
+
+    imgs = _load_images(args.images, args.limit)
+    if not imgs:
+        raise FileNotFoundError(f"No .jpg found in {args.images}")
+
+    detector = PlateDetector(args.model)
+    detector.detect_batch(imgs[:1])  # rozgrzewka
+
+    t_loop = []
+    t_batch = []
+    for _ in range(args.repeat):
+        t0 = time.perf_counter()
+        loop_res = [detector.detect_best(im) for im in imgs]
+        t_loop.append(time.perf_counter() - t0)
+
+        t0 = time.perf_counter()
+        batch_res = detector.detect_batch(imgs, batch_size=args.batch)
+        t_batch.append(time.perf_counter() - t0)
+
+    same = sum(1 for a, b in zip(loop_res, batch_res) if a == b)
+    n = len(imgs)
+    loop_ips = n / min(t_loop)
+    batch_ips = n / min(t_batch)
+
+    print(f"Images:        {n} (batch={args.batch}, repeat={args.repeat})")
+    print(f"detect_best:   {loop_ips:8.2f} img/s")
+    print(f"detect_batch:  {batch_ips:8.2f} img/s  (x{batch_ips / loop_ips:.2f})")
+    print(f"Same boxes:    {same}/{n}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,130 @@
+# src/bench/bench_http.py
+"""
+Generator obciążenia dla src.http_api: odtwarza zdjęcia z data/images w zadanym tempie
+(pętla otwarta) i raportuje przepustowość oraz latencję (p50/p95/p99/max).
+
+--url:        działający serwer (np. http://127.0.0.1:8080)
+--serve-stub: uruchamia w tym procesie serwer z atrapami modeli na tymczasowej bazie,
+              żeby zmierzyć narzut samego serwisu (HTTP + dekodowanie + SQLite)
+
+Przykład:
+    python -m src.bench.bench_http --serve-stub --rate 50 --requests 500 --endpoint read
+"""
+import argparse
+import glob
+import random
+import tempfile
+import threading
+import time
+import urllib.error
+import urllib.request
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from src.timing import quantile
+
+
+def _post(url: str, body: bytes, timeout: float) -> int:
+    req = urllib.request.Request(url, data=body, method="POST",
+                                 headers={"Content-Type": "application/octet-stream"})
+    try:
+        with urllib.request.urlopen(req, timeout=timeout) as resp:
+            resp.read()
+            return resp.status
+    except urllib.error.HTTPError as e:
+        return e.code
+    except (urllib.error.URLError, TimeoutError):
+        return 0
+
+
+def run_load(base_url: str, images: list[bytes], rate: float, n: int, endpoint: str,
+             concurrency: int, timeout: float, seed: int = 0) -> dict:
+    rnd = random.Random(seed)
+    latencies: list[float] = []
+    statuses: Counter = Counter()
+    lock = threading.Lock()
+
+    def one(i: int):
+        ep = endpoint if endpoint != "mix" else rnd.choice(["read", "entry", "exit"])
+        t0 = time.perf_counter()
+        status = _post(f"{base_url}/{ep}", images[i % len(images)], timeout)
+        dt = time.perf_counter() - t0
+        with lock:
+            statuses[status] += 1
+            if status == 200:
+                latencies.append(dt)
+
+    t_start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as ex:
+        next_t = t_start
+        for i in range(n):
+            ex.submit(one, i)
+            next_t += rnd.expovariate(rate)
+            delay = next_t - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+    elapsed = time.perf_counter() - t_start
+
+    return {
+        "sent": n,
+        "ok": len(latencies),
+        "statuses": dict(statuses),
+        "elapsed_s": elapsed,
+        "throughput": len(latencies) / elapsed,
+        "p50_ms": 1000 * quantile(latencies, 0.50),
+        "p95_ms": 1000 * quantile(latencies, 0.95),
+        "p99_ms": 1000 * quantile(latencies, 0.99),
+        "max_ms": 1000 * max(latencies, default=0.0),
+    }
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--url", default="http://127.0.0.1:8080")
+    ap.add_argument("--serve-stub", action="store_true", help="serwer z atrapami modeli w tym procesie")
+    ap.add_argument("--workers", type=int, default=4, help="limit równoległości serwera (--serve-stub)")
+    ap.add_argument("--images", default="data/images")
+    ap.add_argument("--endpoint", choices=["read", "entry", "exit", "mix"], default="read")
+    ap.add_argument("--rate", type=float, default=20.0, help="żądań/s")
+    ap.add_argument("--requests", type=int, default=200)
+    ap.add_argument("--concurrency", type=int, default=64, help="maks. żądań w locie po stronie klienta")
+    ap.add_argument("--timeout", type=float, default=30.0)
+    args = ap.parse_args()
+
+    images = [Path(p).read_bytes() for p in sorted(glob.glob(str(Path(args.images) / "*.jpg")))]
+    if not images:
+        raise FileNotFoundError(f"No .jpg found in {args.images}")
+
+    server = None
+    base_url = args.url.rstrip("/")
+    tmp = None
+    if args.serve_stub:
+        from src.http_api import make_server, make_stub_service
+        from src.storage import db
+
+        tmp = tempfile.TemporaryDirectory()
+        db.DB_PATH = Path(tmp.name) / "load.db"
+        server = make_server(make_stub_service(), port=0, max_workers=args.workers)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        base_url = f"http://127.0.0.1:{server.server_address[1]}"
+
+    try:
+        r = run_load(base_url, images, args.rate, args.requests, args.endpoint,
+                     args.concurrency, args.timeout)
+    finally:
+        if server is not None:
+            server.shutdown()
+            server.server_close()
+        if tmp is not None:
+            tmp.cleanup()
+
+    print(f"Target:     {base_url}/{args.endpoint} @ {args.rate:.0f} req/s")
+    print(f"Sent:       {r['sent']}  OK: {r['ok']}  statuses: {r['statuses']}")
+    print(f"Throughput: {r['throughput']:.1f} req/s ({r['elapsed_s']:.2f}s)")
+    print(f"Latency:    p50 {r['p50_ms']:.1f} ms  p95 {r['p95_ms']:.1f} ms  "
+          f"p99 {r['p99_ms']:.1f} ms  max {r['max_ms']:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+# src/bench/bench_import.py
+"""
+Czas importu modułów (python -X importtime) - każdy moduł w świeżym interpreterze.
+
+Raport: łączny czas importu modułu, najcięższe importy pod nim oraz czy
+wciągnął ciężkie stosy (cv2, numpy, torch, ultralytics, paddle*, pandas).
+
+Przykład:
+    python -m src.bench.bench_import
+    python -m src.bench.bench_import --modules src.admin src.app_service --top 15 --out data/results/importtime.txt
+"""
+import argparse
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+DEFAULT_MODULES = ["src.storage.repo", "src.admin", "src.app_service", "src.vision.registry"]
+HEAVY = ("cv2", "numpy", "torch", "ultralytics", "paddle", "paddleocr", "paddlex", "pandas", "streamlit")
+
+
+def measure(module: str) -> dict:
+    """Uruchamia `python -X importtime -c "import <module>"` i parsuje raport ze stderr."""
+    t0 = time.perf_counter()
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True, text=True, cwd=Path(__file__).resolve().parents[2],
+    )
+    wall = time.perf_counter() - t0
+
+    # format linii: "import time:  self [us] | cumulative | imported package"
+    entries = []
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        parts = line[len("import time:"):].split("|")
+        if len(parts) != 3:
+            continue
+        entries.append((int(parts[0]), int(parts[1]), parts[2].rstrip()))
+
+    total_us = next((cum for _, cum, name in entries if name.strip() == module), 0)
+    loaded = {name.strip() for _, _, name in entries}
+    heavy = sorted(m for m in loaded if m.split(".")[0] in HEAVY and "." not in m)
+
+    return {
+        "module": module,
+        "ok": proc.returncode == 0,
+        "error": proc.stderr.strip().splitlines()[-1] if proc.returncode else "",
+        "wall_s": wall,
+        "import_ms": total_us / 1000,
+        "heavy": heavy,
+        "top": sorted(entries, key=lambda e: e[1], reverse=True),
+    }
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--modules", nargs="+", default=DEFAULT_MODULES)
+    ap.add_argument("--top", type=int, default=10, help="najcięższe importy na moduł")
+    ap.add_argument("--out", default=None, help="zapisz raport do pliku")
+    args = ap.parse_args()
+
+    lines = []
+    for module in args.modules:
+        r = measure(module)
+        if not r["ok"]:
+            lines.append(f"== {module}: FAILED ({r['error']})")
+            continue
+
+        lines.append(f"== {module}: import {r['import_ms']:.1f} ms, "
+                     f"interpreter total {r['wall_s'] * 1000:.0f} ms")
+        lines.append(f"   heavy stacks: {', '.join(r['heavy']) or 'none'}")
+        for self_us, cum_us, name in r["top"][:args.top]:
+            lines.append(f"   {cum_us / 1000:9.1f} ms cum  {self_us / 1000:8.1f} ms self  {name.strip()}")
+
+    report = "\n".join(lines)
+    print(report)
+    if args.out:
+        Path(args.out).parent.mkdir(parents=True, exist_ok=True)
+        Path(args.out).write_text(report + "\n", encoding="utf-8")
+
+
+if __name__ == "__main__":
+    main()
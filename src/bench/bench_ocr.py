@@ -0,0 +1,98 @@
+# src/bench/bench_ocr.py
+"""
+Benchmark OCR na cropach tablic: pełny pipeline ("full") vs samo rozpoznawanie ("rec"),
+oraz read_best w pętli vs jedno read_batch.
+
+Cropy bierzemy z boxów CVAT (data/annotations.xml), więc YOLO nie jest potrzebne.
+
+Przykład:
+    python -m src.bench.bench_ocr --limit 50
+"""
+import argparse
+import os
+import time
+from pathlib import Path
+
+from src.config import Paths
+
+
+def load_plate_crops(images_dir: str, xml_path: str, limit: int | None, pad: int = 30):
+    """Cropy tablic po preprocessingu (RGB), tak jak trafiają do read_best."""
+    import cv2
+
+    from src.cvat.parser import load_cvat_boxes
+    from src.vision.preprocess import crop_with_padding, basic_preprocess
+
+    crops = []
+    for b in load_cvat_boxes(xml_path):
+        img_path = Path(images_dir) / b.image_name
+        if not img_path.exists():
+            continue
+        img = cv2.imread(str(img_path))
+        if img is None:
+            continue
+        plate_bgr = crop_with_padding(img, b.xtl, b.ytl, b.xbr, b.ybr, pad=pad)
+        plate_rgb = basic_preprocess(plate_bgr)
+        if plate_rgb is not None:
+            crops.append(plate_rgb)
+        if limit and len(crops) >= limit:
+            break
+    return crops
+
+
+def _time_mode(ocr, crops, repeat: int):
+    best = None
+    out = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        out = [ocr.read_best(c) for c in crops]
+        dt = time.perf_counter() - t0
+        best = dt if best is None else min(best, dt)
+    return best, out
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--images", default=Paths().images_dir)
+    ap.add_argument("--xml", default=Paths().cvat_xml)
+    ap.add_argument("--limit", type=int, default=30)
+    ap.add_argument("--repeat", type=int, default=2)
+    ap.add_argument("--rec-min-conf", type=float, default=0.80)
+    args = ap.parse_args()
+
+    os.environ["CUDA_VISIBLE_DEVICES"] = ""
+    from src.vision.ocr import PlateOCR
+
+    crops = load_plate_crops(args.images, args.xml, args.limit)
+    if not crops:
+        raise FileNotFoundError("Brak cropów (sprawdź data/images i XML).")
+
+    full = PlateOCR(mode="full")
+    rec = PlateOCR(mode="rec", rec_min_conf=args.rec_min_conf)
+    # rozgrzewka (również pipeline fallbacku w trybie rec)
+    full.read_best(crops[0])
+    rec._read_full([crops[0]])
+    rec.read_best(crops[0])
+    rec.rec_calls = rec.fallbacks = 0
+
+    t_full, res_full = _time_mode(full, crops, args.repeat)
+    t_rec, res_rec = _time_mode(rec, crops, args.repeat)
+    fallbacks, rec_calls = rec.fallbacks, rec.rec_calls
+
+    t0 = time.perf_counter()
+    res_batch = rec.read_batch(crops)
+    t_batch = time.perf_counter() - t0
+
+    n = len(crops)
+    same = sum(1 for a, b in zip(res_full, res_rec) if a[0] == b[0])
+    print(f"Plates:          {n} (repeat={args.repeat})")
+    print(f"full  read_best: {1000 * t_full / n:8.1f} ms/plate")
+    print(f"rec   read_best: {1000 * t_rec / n:8.1f} ms/plate  (x{t_full / t_rec:.2f})")
+    print(f"rec   read_batch:{1000 * t_batch / n:8.1f} ms/plate  (x{t_full / t_batch:.2f})")
+    print(f"rec fallbacks:   {fallbacks}/{rec_calls}")
+    print(f"Same text:       {same}/{n}")
+    print(f"Batch == single: {sum(1 for a, b in zip(res_rec, res_batch) if a == b)}/{n}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,163 @@
+# src/bench/bench_preprocess.py
+"""
+Benchmark preprocessu: dawna ścieżka per crop (kopia cropa + kolejne pełne bufory)
+vs crop jako widok + basic_preprocess z buforami wątku + preprocess_batch (opcjonalnie wątki).
+
+Raport (tracemalloc śledzi alokacje numpy / OpenCV):
+- cropy/s
+- szczyt pamięci dla całej paczki (wyniki trzymane do OCR)
+- średnia pamięć chwilowa na crop ponad sam wynik (kopie, bufory pośrednie)
+- zgodność wyników bit w bit z dawną ścieżką
+
+Przykład:
+    python -m src.bench.bench_preprocess --crops 256 --workers 1,4
+    python -m src.bench.bench_preprocess --images data/images    # cropy z prawdziwych zdjęć (boxy CVAT)
+"""
+import argparse
+import time
+import tracemalloc
+
+import cv2
+import numpy as np
+
+from src.vision.preprocess import crop_with_padding, basic_preprocess, preprocess_batch
+
+
+def _legacy_preprocess(plate_bgr):
+    """basic_preprocess sprzed zmian - punkt odniesienia."""
+    if plate_bgr is None or plate_bgr.size == 0:
+        return None
+    h, w = plate_bgr.shape[:2]
+    left_cut = int(w * 0.07)
+    if w - left_cut > w * 0.8:
+        plate_bgr = plate_bgr[:, left_cut:]
+    h2, w2 = plate_bgr.shape[:2]
+    top = int(h2 * 0.12)
+    bot = int(h2 * 0.12)
+    if (h2 - top - bot) > 10:
+        plate_bgr = plate_bgr[top:h2 - bot, :]
+    h3, w3 = plate_bgr.shape[:2]
+    plate = cv2.resize(plate_bgr, (w3 * 2, h3 * 2), interpolation=cv2.INTER_CUBIC)
+    blur = cv2.GaussianBlur(plate, (0, 0), 1.2)
+    sharp = cv2.addWeighted(plate, 1.6, blur, -0.6, 0)
+    return cv2.cvtColor(sharp, cv2.COLOR_BGR2RGB)
+
+
+def _synthetic(n: int, seed: int = 0):
+    """Klatki 1080p z losowymi boxami tablic kilku rozmiarów."""
+    rng = np.random.default_rng(seed)
+    frames = [rng.integers(0, 256, size=(1080, 1920, 3), dtype=np.uint8) for _ in range(4)]
+    items = []
+    for i in range(n):
+        h = int(rng.integers(30, 160))
+        w = int(h * rng.uniform(3.0, 4.8))
+        x1 = int(rng.integers(40, 1920 - w - 40))
+        y1 = int(rng.integers(40, 1080 - h - 40))
+        items.append((frames[i % len(frames)], (x1, y1, x1 + w, y1 + h)))
+    return items
+
+
+def _real(images_dir: str, xml_path: str, n: int):
+    """Klatki + boxy tablic z CVAT (jak w bench_ocr)."""
+    from pathlib import Path
+
+    from src.cvat.parser import load_cvat_boxes
+
+    frames = {}
+    items = []
+    for b in load_cvat_boxes(xml_path):
+        if b.image_name not in frames:
+            frames[b.image_name] = cv2.imread(str(Path(images_dir) / b.image_name))
+        img = frames[b.image_name]
+        if img is None:
+            continue
+        items.append((img, (b.xtl, b.ytl, b.xbr, b.ybr)))
+        if len(items) >= n:
+            break
+    return items
+
+
+def _run_legacy(items):
+    return [_legacy_preprocess(crop_with_padding(img, *box, pad=30)) for img, box in items]
+
+
+def _run_views(items):
+    return [basic_preprocess(crop_with_padding(img, *box, pad=30, copy=False)) for img, box in items]
+
+
+def _run_batch(items, workers: int):
+    crops = [crop_with_padding(img, *box, pad=30, copy=False) for img, box in items]
+    return preprocess_batch(crops, workers=workers)
+
+
+def _transient(one, items) -> float:
+    """Średni szczyt alokacji na crop ponad rozmiar wyniku (bajty); wynik od razu zwalniany."""
+    one(*items[0])  # bufory wątku już zaalokowane - jak w pracy ciągłej
+    extra = []
+    tracemalloc.start()
+    for img, box in items:
+        tracemalloc.reset_peak()
+        base, _ = tracemalloc.get_traced_memory()
+        out = one(img, box)
+        _, peak = tracemalloc.get_traced_memory()
+        extra.append(peak - base - (out.nbytes if out is not None else 0))
+        del out
+    tracemalloc.stop()
+    return sum(extra) / len(extra)
+
+
+def _measure(fn, repeat: int):
+    fn()  # rozgrzewka (bufory wątków, pula)
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t0)
+
+    tracemalloc.start()
+    out = fn()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return best, peak, out
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--crops", type=int, default=256)
+    ap.add_argument("--workers", default="1,4", help="wątki dla preprocess_batch")
+    ap.add_argument("--repeat", type=int, default=5)
+    ap.add_argument("--images", default=None, help="zamiast syntetycznych: cropy z CVAT (data/images)")
+    ap.add_argument("--xml", default="data/annotations.xml")
+    ap.add_argument("--cv-threads", type=int, default=None, help="cv2.setNumThreads")
+    args = ap.parse_args()
+
+    if args.cv_threads is not None:
+        cv2.setNumThreads(args.cv_threads)
+
+    items = _real(args.images, args.xml, args.crops) if args.images else _synthetic(args.crops)
+    n = len(items)
+
+    legacy_one = lambda img, box: _legacy_preprocess(crop_with_padding(img, *box, pad=30))  # noqa: E731
+    views_one = lambda img, box: basic_preprocess(crop_with_padding(img, *box, pad=30, copy=False))  # noqa: E731
+    variants = [
+        ("legacy (copy + per crop)", lambda: _run_legacy(items), legacy_one),
+        ("views + buffers", lambda: _run_views(items), views_one),
+    ]
+    for w in (int(x) for x in args.workers.split(",")):
+        variants.append((f"preprocess_batch w={w}", lambda w=w: _run_batch(items, w), None))
+
+    print(f"Crops: {n}, repeat={args.repeat}")
+    print(f"{'variant':>26} {'crops/s':>10} {'x':>6} {'peak MB':>9} {'temp KB/crop':>13} {'identical':>10}")
+    ref = None
+    base = None
+    for name, fn, one in variants:
+        t, peak, out = _measure(fn, args.repeat)
+        if ref is None:
+            ref, base = out, t
+        same = sum(1 for a, b in zip(ref, out) if np.array_equal(a, b))
+        temp = f"{_transient(one, items) / 1024:13.1f}" if one is not None else f"{'-':>13}"
+        print(f"{name:>26} {n / t:10.1f} {base / t:6.2f} {peak / 2**20:9.1f} {temp} {same:>5}/{n}")
+
+
+if __name__ == "__main__":
+    main()
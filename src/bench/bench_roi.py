@@ -0,0 +1,86 @@
+# src/bench/bench_roi.py
+"""
+Benchmark detekcji: pełna klatka vs ROI kamery (src/config.py: CAMERAS / Roi).
+
+Mierzy latencję detect_batch (pełny kadr i wycinek + przeliczenie ramek) oraz zgodność
+ramek po przeliczeniu na pełną klatkę (IoU z wynikiem na pełnym kadrze).
+
+Przykład:
+    python -m src.bench.bench_roi --camera gate_in --repeat 3
+    python -m src.bench.bench_roi --roi 0.1,0.4,0.9,1.0 --max-side 960
+"""
+import argparse
+import os
+import time
+
+from src.bench.bench_detect import _load_images
+from src.config import CAMERAS, Roi, camera_roi
+from src.timing import quantile
+
+
+def _time_per_image(fn, imgs, repeat: int) -> list[float]:
+    times = []
+    for _ in range(repeat):
+        for im in imgs:
+            t0 = time.perf_counter()
+            fn(im)
+            times.append(time.perf_counter() - t0)
+    return times
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--images", default="data/images")
+    ap.add_argument("--model", default="models/plate_detector.pt")
+    ap.add_argument("--limit", type=int, default=None)
+    ap.add_argument("--repeat", type=int, default=3)
+    ap.add_argument("--camera", choices=sorted(CAMERAS), default="gate_in")
+    ap.add_argument("--roi", default=None, help="x1,y1,x2,y2 jako ułamki kadru (nadpisuje --camera)")
+    ap.add_argument("--max-side", type=int, default=None, help="z --roi: maks. dłuższy bok wycinka")
+    ap.add_argument("--gpu", action="store_true", help="domyślnie wymuszamy CPU")
+    args = ap.parse_args()
+
+    if not args.gpu:
+        os.environ["CUDA_VISIBLE_DEVICES"] = ""
+
+    from src.vision.detector import PlateDetector
+    from src.vision.roi import detect_batch_roi
+    from src.vision.tracker import iou
+
+    if args.roi:
+        x1, y1, x2, y2 = (float(v) for v in args.roi.split(","))
+        roi = Roi(x1, y1, x2, y2, max_side=args.max_side)
+    else:
+        roi = camera_roi(args.camera)
+
+    imgs = _load_images(args.images, args.limit)
+    if not imgs:
+        raise FileNotFoundError(f"No .jpg found in {args.images}")
+
+    detector = PlateDetector(args.model)
+    detector.detect_batch(imgs[:1])  # rozgrzewka
+    detect_batch_roi(detector, imgs[:1], roi)
+
+    t_full = _time_per_image(lambda im: detector.detect_batch([im]), imgs, args.repeat)
+    t_roi = _time_per_image(lambda im: detect_batch_roi(detector, [im], roi), imgs, args.repeat)
+
+    full = detector.detect_batch(imgs)
+    cropped = detect_batch_roi(detector, imgs, roi)
+    both = [(a, b) for a, b in zip(full, cropped) if a is not None and b is not None]
+    ious = [iou(a, b) for a, b in both]
+    lost = sum(1 for a, b in zip(full, cropped) if a is not None and b is None)
+    gained = sum(1 for a, b in zip(full, cropped) if a is None and b is not None)
+
+    h, w = imgs[0].shape[:2]
+    print(f"Images:   {len(imgs)} ({w}x{h}), repeat={args.repeat}")
+    print(f"ROI:      {roi}")
+    for name, t in (("full", t_full), ("roi", t_roi)):
+        print(f"{name:5s}     p50 {1000 * quantile(t, 0.50):7.1f} ms  "
+              f"p95 {1000 * quantile(t, 0.95):7.1f} ms")
+    print(f"Speedup:  x{quantile(t_full, 0.50) / max(quantile(t_roi, 0.50), 1e-9):.2f} (p50)")
+    print(f"Boxes:    {len(both)} in both, mean IoU {sum(ious) / max(1, len(ious)):.3f}, "
+          f"lost {lost}, gained {gained}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,339 @@
+# src/bench/suite.py
+"""
+Powtarzalny zestaw benchmarków gorących ścieżek (offline, CPU).
+
+Grupy:
+- preprocess: crop_with_padding + basic_preprocess na syntetycznych cropach kilku rozmiarów
+- validate:   validate_and_fix / _score_plate_like na dużym zbiorze kandydatów
+- db:         register_entry / register_exit / list_open na bazach z N wierszami
+- e2e:        ParkingService.read_plate z atrapami modeli (albo --real: prawdziwe modele)
+
+Dane syntetyczne mają stały seed, wynik idzie do JSON. Tryb compare porównuje dwa pliki
+i zwraca kod 1, jeśli któryś pomiar zwolnił o więcej niż --threshold.
+
+Przykład:
+    python -m src.bench.suite run --out data/results/bench_base.json
+    python -m src.bench.suite run --only db --db-rows 10000,1000000 --out data/results/bench_new.json
+    python -m src.bench.suite compare data/results/bench_base.json data/results/bench_new.json
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import statistics
+import string
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+from src.timing import quantile
+
+GROUPS = ("preprocess", "validate", "db", "e2e")
+SEED = 1234
+
+
+def measure(fn, number: int = 1, repeat: int = 5, warmup: int = 1) -> dict:
+    """Czas jednego wywołania fn: mediana / min / p95 z `repeat` serii po `number` wywołań."""
+    for _ in range(warmup):
+        fn()
+    per_op = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        for _ in range(number):
+            fn()
+        per_op.append((time.perf_counter() - t0) / number)
+    per_op.sort()
+    return {
+        "median_us": round(1e6 * statistics.median(per_op), 3),
+        "min_us": round(1e6 * per_op[0], 3),
+        "p95_us": round(1e6 * quantile(per_op, 0.95, is_sorted=True), 3),
+        "number": number,
+        "repeat": repeat,
+    }
+
+
+# --- preprocess ---
+
+CROP_SIZES = ((40, 140), (80, 280), (160, 560))  # (h, w) cropa tablicy
+
+
+def bench_preprocess(quick: bool) -> dict:
+    import numpy as np
+
+    from src.vision.preprocess import crop_with_padding, basic_preprocess, preprocess_batch
+
+    rng = np.random.default_rng(SEED)
+    frame = rng.integers(0, 256, size=(1080, 1920, 3), dtype=np.uint8)
+    number = 20 if quick else 200
+
+    out = {}
+    for h, w in CROP_SIZES:
+        x1, y1 = 800, 500
+        out[f"crop_with_padding/{h}x{w}"] = measure(
+            lambda: crop_with_padding(frame, x1, y1, x1 + w, y1 + h, pad=30), number=number * 5)
+        crop = np.ascontiguousarray(frame[y1:y1 + h, x1:x1 + w])
+        out[f"basic_preprocess/{h}x{w}"] = measure(lambda: basic_preprocess(crop), number=number)
+
+    # paczka 32 cropów (widoki) jak w ParkingService.read_plates
+    boxes = [(100 + 50 * i, 100 + 25 * i, 100 + 50 * i + w, 100 + 25 * i + h)
+             for i, (h, w) in enumerate(CROP_SIZES * 11)][:32]
+    crops = [crop_with_padding(frame, *b, pad=30, copy=False) for b in boxes]
+    out["preprocess_batch/32"] = measure(lambda: preprocess_batch(crops), number=max(1, number // 10))
+    return out
+
+
+# --- validate ---
+
+def _candidates(n: int) -> list[tuple[str, float]]:
+    """Mieszanka: poprawne tablice, pomyłki OCR (O/0, I/1...), śmieci i puste odczyty."""
+    rnd = random.Random(SEED)
+    alnum = string.ascii_uppercase + string.digits
+    out = []
+    for _ in range(n):
+        kind = rnd.random()
+        if kind < 0.5:
+            text = "".join(rnd.choice(string.ascii_uppercase) for _ in range(rnd.randint(2, 3)))
+            text += "".join(rnd.choice(alnum) for _ in range(rnd.randint(4, 5)))
+        elif kind < 0.7:
+            text = "".join(rnd.choice("OISBZ0123456789") for _ in range(rnd.randint(5, 8)))
+        elif kind < 0.9:
+            text = "".join(rnd.choice(alnum + " -.|") for _ in range(rnd.randint(1, 14)))
+        else:
+            text = rnd.choice(["", "PL", "EU", "pl scz 26114"])
+        out.append((text, rnd.random()))
+    return out
+
+
+def bench_validate(quick: bool) -> dict:
+    from src.vision.ocr import _score_plate_like
+    from src.vision.validate import validate_and_fix
+
+    cands = _candidates(10_000 if quick else 100_000)
+    n = len(cands)
+
+    def run_validate():
+        for text, _ in cands:
+            validate_and_fix(text)
+
+    def run_score():
+        for text, conf in cands:
+            _score_plate_like(text, conf)
+
+    out = {}
+    for name, fn in (("validate_and_fix", run_validate), ("score_plate_like", run_score)):
+        r = measure(fn, repeat=3)
+        # czas na jednego kandydata
+        for k in ("median_us", "min_us", "p95_us"):
+            r[k] = round(r[k] / n, 4)
+        r["items"] = n
+        out[f"{name}/{n}"] = r
+    return out
+
+
+# --- db ---
+
+def _populate(conn, rows: int, open_rows: int):
+    """Historia OUT + open_rows aut na parkingu; executemany w paczkach."""
+    t0 = datetime(2024, 1, 1)
+    chunk = 50_000
+    conn.execute("BEGIN")
+    for start in range(0, rows, chunk):
+        batch = []
+        for i in range(start, min(rows, start + chunk)):
+            entry = t0 + timedelta(minutes=i)
+            if i >= rows - open_rows:
+                batch.append((f"OPN{i:07d}", entry.isoformat(timespec="seconds"), None, None, "IN"))
+            else:
+                exit_ = entry + timedelta(minutes=45)
+                batch.append((f"HIS{i % 20000:05d}", entry.isoformat(timespec="seconds"),
+                              exit_.isoformat(timespec="seconds"), 5, "OUT"))
+        conn.executemany(
+            "INSERT INTO parking_events(plate, entry_time, exit_time, fee_pln, status) "
+            "VALUES (?, ?, ?, ?, ?)", batch)
+    conn.execute("COMMIT")
+
+
+def bench_db(rows_list: list[int], quick: bool) -> dict:
+    from src.storage import db, repo
+
+    out = {}
+    orig_path = db.DB_PATH
+    try:
+        for rows in rows_list:
+            with tempfile.TemporaryDirectory() as tmp:
+                db.DB_PATH = Path(tmp) / f"bench_{rows}.db"
+                db.init_db()
+                conn = db.connect(db.DB_PATH)
+                conn.isolation_level = None
+                _populate(conn, rows, open_rows=min(200, rows // 100))
+                conn.execute("ANALYZE")
+                conn.close()
+
+                n = 200 if quick else 2000
+                when = datetime(2030, 1, 1)
+                plates = iter(f"NEW{i:06d}" for i in range(10 * n + 100))
+                entered: list[str] = []
+
+                def entry():
+                    p = next(plates)
+                    repo.register_entry(p, when)
+                    entered.append(p)
+
+                def exit_():
+                    repo.register_exit(entered.pop(), when + timedelta(hours=1))
+
+                out[f"register_entry/{rows}"] = measure(entry, number=n, repeat=3)
+                out[f"register_exit/{rows}"] = measure(exit_, number=n, repeat=3)
+                out[f"list_open/{rows}"] = measure(repo.list_open, number=max(10, n // 10), repeat=3)
+                db.close_conn()
+    finally:
+        db.DB_PATH = orig_path
+    return out
+
+
+# --- e2e ---
+
+def bench_e2e(real: bool, images_dir: str, quick: bool) -> dict:
+    import cv2
+    import numpy as np
+
+    from src.app_service import ParkingService
+    from src.storage import db
+
+    orig_path = db.DB_PATH
+    out = {}
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            db.DB_PATH = Path(tmp) / "e2e.db"
+            if real:
+                paths = sorted(Path(images_dir).glob("*.jpg"))[:5 if quick else 20]
+                if not paths:
+                    raise FileNotFoundError(f"No .jpg found in {images_dir}")
+                service = ParkingService(cache_size=0)
+                service.load_models()
+                label = "real"
+            else:
+                from src.vision.stubs import StubDetector, StubOCR
+
+                # zerowy koszt "modeli": mierzymy sam narzut serwisu (odczyt, dekodowanie, crop, preprocess)
+                service = ParkingService(detector=StubDetector(base_ms=0, per_item_ms=0),
+                                         ocr=StubOCR(base_ms=0, per_item_ms=0), cache_size=0)
+                rng = np.random.default_rng(SEED)
+                frame = rng.integers(0, 256, size=(720, 1280, 3), dtype=np.uint8)
+                paths = [Path(tmp) / "frame.jpg"]
+                cv2.imwrite(str(paths[0]), frame)
+                label = "stub"
+
+            it = iter(range(10**9))
+            out[f"read_plate/{label}"] = measure(
+                lambda: service.read_plate(str(paths[next(it) % len(paths)])),
+                number=len(paths) if real else (10 if quick else 50), repeat=3)
+            db.close_conn()
+    finally:
+        db.DB_PATH = orig_path
+    return out
+
+
+# --- run / compare ---
+
+def _meta() -> dict:
+    meta = {
+        "created": datetime.now().isoformat(timespec="seconds"),
+        "python": sys.version.split()[0],
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+        "cpu_count": os.cpu_count(),
+    }
+    for mod in ("numpy", "cv2"):
+        try:
+            meta[mod] = __import__(mod).__version__
+        except ImportError:
+            meta[mod] = None
+    return meta
+
+
+def run(args) -> int:
+    groups = args.only.split(",") if args.only else list(GROUPS)
+    unknown = set(groups) - set(GROUPS)
+    if unknown:
+        raise ValueError(f"Nieznane grupy: {', '.join(sorted(unknown))} (dostępne: {', '.join(GROUPS)})")
+    if not args.real:
+        os.environ["CUDA_VISIBLE_DEVICES"] = ""
+
+    results = {}
+    for g in groups:
+        t0 = time.perf_counter()
+        if g == "preprocess":
+            r = bench_preprocess(args.quick)
+        elif g == "validate":
+            r = bench_validate(args.quick)
+        elif g == "db":
+            r = bench_db([int(x) for x in args.db_rows.split(",")], args.quick)
+        else:
+            r = bench_e2e(args.real, args.images, args.quick)
+        for name, row in r.items():
+            results[f"{g}/{name}"] = row
+            print(f"{g + '/' + name:45s} median {row['median_us']:12.3f} us  min {row['min_us']:12.3f} us")
+        print(f"  [{g}: {time.perf_counter() - t0:.1f}s]")
+
+    out = Path(args.out)
+    out.parent.mkdir(parents=True, exist_ok=True)
+    out.write_text(json.dumps({"meta": _meta(), "results": results}, indent=2), encoding="utf-8")
+    print(f"Saved: {out}")
+    return 0
+
+
+def compare(base_path: str, new_path: str, threshold: float, metric: str = "median_us") -> int:
+    base = json.loads(Path(base_path).read_text(encoding="utf-8"))["results"]
+    new = json.loads(Path(new_path).read_text(encoding="utf-8"))["results"]
+
+    regressions = 0
+    print(f"{'benchmark':45s} {'base':>12} {'new':>12} {'change':>8}")
+    for name in sorted(set(base) | set(new)):
+        if name not in base or name not in new:
+            where = "new only" if name not in base else "base only"
+            print(f"{name:45s} {'':>12} {'':>12} {where:>8}")
+            continue
+        b, n = base[name][metric], new[name][metric]
+        change = (n - b) / b if b else 0.0
+        flag = ""
+        if change > threshold:
+            flag = "  REGRESSION"
+            regressions += 1
+        elif change < -threshold:
+            flag = "  faster"
+        print(f"{name:45s} {b:12.3f} {n:12.3f} {change:+8.1%}{flag}")
+
+    print(f"\n{regressions} regression(s) above {threshold:.0%} ({metric})")
+    return 1 if regressions else 0
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    sub = ap.add_subparsers(dest="cmd", required=True)
+
+    r = sub.add_parser("run", help="uruchom benchmarki i zapisz JSON")
+    r.add_argument("--out", default="data/results/bench.json")
+    r.add_argument("--only", default=None, help=f"grupy po przecinku: {','.join(GROUPS)}")
+    r.add_argument("--db-rows", default="10000,100000", help="rozmiary bazy (np. 10000,1000000,10000000)")
+    r.add_argument("--real", action="store_true", help="e2e na prawdziwych modelach (data/images)")
+    r.add_argument("--images", default="data/images")
+    r.add_argument("--quick", action="store_true", help="mniej powtórzeń (szybki dymny test)")
+
+    c = sub.add_parser("compare", help="porównaj dwa wyniki i oznacz regresje")
+    c.add_argument("base")
+    c.add_argument("new")
+    c.add_argument("--threshold", type=float, default=0.10, help="dopuszczalne spowolnienie (0.10 = 10%%)")
+    c.add_argument("--metric", choices=["median_us", "min_us", "p95_us"], default="median_us")
+
+    args = ap.parse_args()
+    if args.cmd == "run":
+        sys.exit(run(args))
+    sys.exit(compare(args.base, args.new, args.threshold, args.metric))
+
+
+if __name__ == "__main__":
+    main()
@@ -10,3 +10,84 @@ class Paths:
 class Thresholds:
     yolo_conf: float = 0.35
     ocr_conf: float = 0.55
+
+@dataclass(frozen=True)
+class DetectorBackend:
+    # "torch" (.pt przez ultralytics), "onnx" albo "openvino" (eksport: python -m src.vision.backends)
+    name: str = "torch"
+    # kwantyzacja int8 - tylko openvino, kalibracja na data/yolo/dataset.yaml
+    int8: bool = False
+    imgsz: int = 640
+
+    def __post_init__(self):
+        if self.name not in ("torch", "onnx", "openvino"):
+            raise ValueError(f"Nieznany backend detektora: {self.name}")
+        if self.int8 and self.name != "openvino":
+            raise ValueError("int8 obsługiwane tylko dla backendu openvino")
+
+    @property
+    def tag(self) -> str:
+        return f"{self.name}-int8" if self.int8 else self.name
+
+# backend używany domyślnie przez ParkingService / CLI (bramki: CPU -> openvino)
+DETECTOR_BACKEND = DetectorBackend()
+
+@dataclass(frozen=True)
+class Roi:
+    # obszar detekcji jako ułamki szerokości / wysokości klatki (0..1)
+    x1: float = 0.0
+    y1: float = 0.0
+    x2: float = 1.0
+    y2: float = 1.0
+    # dłuższy bok wycinka po zmniejszeniu (None = bez skalowania)
+    max_side: int | None = None
+
+    def __post_init__(self):
+        if not (0.0 <= self.x1 < self.x2 <= 1.0 and 0.0 <= self.y1 < self.y2 <= 1.0):
+            raise ValueError(f"Niepoprawny ROI: {self}")
+
+    @property
+    def is_full(self) -> bool:
+        return (self.x1, self.y1, self.x2, self.y2) == (0.0, 0.0, 1.0, 1.0) and not self.max_side
+
+@dataclass(frozen=True)
+class BoxFilter:
+    # filtr ramek dla detect_all (wiele tablic w kadrze)
+    nms_iou: float | None = 0.5   # dodatkowe NMS między tablicami (None = tylko NMS z YOLO)
+    min_area: int = 400           # px^2 w pełnej klatce
+    min_aspect: float = 1.5       # szerokość / wysokość
+    max_aspect: float = 8.0
+    max_det: int | None = 5
+
+@dataclass(frozen=True)
+class OcrCascade:
+    # kolejne warianty cropa dla OCR (src/vision/cascade.py: VARIANTS: sharp, raw, sharp3, clahe);
+    # następny wariant tylko dla tablic, których poprzedni nie dał pewnego odczytu
+    variants: tuple[str, ...] = ("sharp", "raw")
+    # odczyt pewny = poprawna tablica (validate_and_fix), co najmniej min_len znaków i conf >= accept_conf
+    accept_conf: float = 0.40
+    min_len: int = 6
+
+    def __post_init__(self):
+        if not self.variants:
+            raise ValueError("Kaskada OCR bez wariantów")
+        if len(set(self.variants)) != len(self.variants):
+            raise ValueError(f"Powtórzony wariant w kaskadzie OCR: {self.variants}")
+
+# kaskada używana domyślnie przez ParkingService / read_one / eval_all
+OCR_CASCADE = OcrCascade()
+
+# ROI per kamera (nazwa kamery -> obszar przy szlabanie); dopasuj do swoich ujęć
+CAMERAS: dict[str, Roi] = {
+    "default": Roi(),
+    "gate_in": Roi(x1=0.15, y1=0.35, x2=0.85, y2=1.0, max_side=1280),
+    "gate_out": Roi(x1=0.15, y1=0.35, x2=0.85, y2=1.0, max_side=1280),
+}
+
+def camera_roi(name: str | None) -> Roi:
+    if name is None:
+        return CAMERAS["default"]
+    try:
+        return CAMERAS[name]
+    except KeyError:
+        raise ValueError(f"Nieznana kamera: {name} (dostępne: {', '.join(CAMERAS)})") from None
@@ -1,17 +1,23 @@
 # src/eval_10.py
+import argparse
 import os
 import glob
 import csv
 import re
+import multiprocessing as mp
+from concurrent.futures import ProcessPoolExecutor, as_completed
 import xml.etree.ElementTree as ET
 from pathlib import Path
 
 import cv2
 
+from src.config import DETECTOR_BACKEND, OCR_CASCADE, DetectorBackend
+from src.vision import registry
+from src.vision.backends import resolve_weights
+from src.vision.cascade import CascadeReader, CascadeStats, parse_cascade
 from src.vision.detector import PlateDetector
-from src.vision.preprocess import crop_with_padding, basic_preprocess
+from src.vision.preprocess import crop_with_padding
 from src.vision.ocr import PlateOCR
-from src.vision.validate import validate_and_fix
 
 
 def norm_plate(s: str | None) -> str:
@@ -48,42 +54,164 @@ def load_cvat_gt(xml_path: str) -> dict[str, str]:
 
 
 def predict_plate(img_bgr, detector: PlateDetector, ocr: PlateOCR,
-                  yolo_conf_min: float = 0.35, ocr_min_conf: float = 0.40):
-    det = detector.detect_best(img_bgr)
-    if det is None:
-        return None, 0.0, "", 0.0
+                  yolo_conf_min: float = 0.35, cascade: CascadeReader | None = None):
+    return predict_plates([img_bgr], detector, ocr, yolo_conf_min, cascade)[0]
+
+
+def predict_plates(imgs_bgr, detector: PlateDetector, ocr: PlateOCR,
+                   yolo_conf_min: float = 0.35, cascade: CascadeReader | None = None):
+    """
+    Jak predict_plate, ale dla paczki obrazów: YOLO liczy wszystkie obrazy
+    jednym przebiegiem, a kaskada OCR czyta wszystkie cropy (jedno read_batch na wariant).
+    cascade: domyślnie CascadeReader() z src.config.OCR_CASCADE
+    """
+    cascade = cascade or CascadeReader()
+    dets = detector.detect_batch(imgs_bgr)
+
+    out = []
+    pending = []
+    crops = []
+    for img_bgr, det in zip(imgs_bgr, dets):
+        if det is None:
+            out.append((None, 0.0, "", 0.0))
+            continue
+
+        x1, y1, x2, y2, yconf = det
+        if yconf < yolo_conf_min:
+            out.append((None, yconf, "", 0.0))
+            continue
+
+        plate_bgr = crop_with_padding(img_bgr, x1, y1, x2, y2, pad=30, copy=False)
+        if plate_bgr is None or plate_bgr.size == 0:
+            out.append((None, yconf, "", 0.0))
+            continue
+
+        crops.append(plate_bgr)
+        pending.append((len(out), yconf))
+        out.append(None)
+
+    for (i, yconf), r in zip(pending, cascade.read(ocr, crops)):
+        out[i] = (r.plate, yconf, r.raw, r.conf)
+
+    return out
+
+
+def _iter_batches(img_paths: list[str], batch_size: int):
+    """Wczytuje obrazy paczkami: [(name, img), ...]; pomija nieczytelne pliki."""
+    batch = []
+    for p in img_paths:
+        img = cv2.imread(p)
+        if img is None:
+            continue
+        batch.append((Path(p).name, img))
+        if len(batch) >= batch_size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
 
-    x1, y1, x2, y2, yconf = det
-    if yconf < yolo_conf_min:
-        return None, yconf, "", 0.0
+# --- równoległa ewaluacja: każdy proces ma własne modele, ładowane raz ---
 
-    plate_bgr = crop_with_padding(img_bgr, x1, y1, x2, y2, pad=30)
-    if plate_bgr is None or plate_bgr.size == 0:
-        return None, yconf, "", 0.0
+FIELDS = ["image", "gt", "pred", "match", "yolo_conf", "ocr_raw", "ocr_conf"]
 
-    # try 1: preprocess
-    plate_rgb = basic_preprocess(plate_bgr)
-    raw, rconf = ocr.read_best(plate_rgb)
+_WORKER: dict = {}
 
-    # fallback: no preprocess
-    if (len(raw) < 6) or (rconf < ocr_min_conf):
-        plate_rgb2 = cv2.cvtColor(plate_bgr, cv2.COLOR_BGR2RGB)
-        raw2, conf2 = ocr.read_best(plate_rgb2)
-        if conf2 > rconf:
-            raw, rconf = raw2, conf2
 
-    fixed = validate_and_fix(raw)
-    return (fixed if fixed else None), yconf, raw, rconf
+def _set_threads(threads: int | None):
+    """Limit wątków w procesie (torch / OpenCV); Paddle dostaje cpu_threads w PlateOCR."""
+    if not threads:
+        return
+    cv2.setNumThreads(threads)
+    try:
+        import torch
+        torch.set_num_threads(threads)
+    except ImportError:
+        pass
+
+
+def _init_worker(model_path: str, ocr_mode: str, threads: int | None,
+                 yolo_conf_min: float, ocr_cascade, batch: int, backend=None):
+    os.environ["DISABLE_MODEL_SOURCE_CHECK"] = "True"
+    _set_threads(threads)
+    _WORKER["detector"] = registry.get_detector(model_path, 0.35, backend=backend)
+    _WORKER["ocr"] = registry.get_ocr(ocr_mode, cpu_threads=threads)
+    _WORKER["yolo_conf_min"] = yolo_conf_min
+    _WORKER["cascade"] = CascadeReader(ocr_cascade)
+    _WORKER["batch"] = batch
+
+
+def _eval_chunk(img_paths: list[str]) -> tuple[list[tuple], dict]:
+    """
+    Zadanie dla procesu: ([(name, pred, yconf, raw, rconf), ...], statystyki kaskady OCR)
+    dla paczki plików.
+    """
+    detector = _WORKER["detector"]
+    ocr = _WORKER["ocr"]
+    cascade = _WORKER["cascade"]
+    cascade.stats.reset()
+
+    out = []
+    for batch in _iter_batches(img_paths, _WORKER["batch"]):
+        names = [name for name, _ in batch]
+        preds = predict_plates([img for _, img in batch], detector, ocr,
+                               _WORKER["yolo_conf_min"], cascade)
+        out.extend((name, *pred) for name, pred in zip(names, preds))
+    return out, cascade.stats.snapshot()
+
+
+def _run_chunks(chunks: list[list[str]], workers: int, init_args: tuple):
+    """Generator wyników paczek w kolejności ukończenia."""
+    if workers <= 1:
+        _init_worker(*init_args)
+        for chunk in chunks:
+            yield _eval_chunk(chunk)
+        return
+
+    # spawn: świeże procesy (bez kopiowania stanu torch/paddle rodzica), też na Windows
+    ctx = mp.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=workers, mp_context=ctx,
+                             initializer=_init_worker, initargs=init_args) as ex:
+        futures = [ex.submit(_eval_chunk, chunk) for chunk in chunks]
+        for fut in as_completed(futures):
+            yield fut.result()
 
 
 def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--images", default="data/images")
+    ap.add_argument("--xml", default="data/annotations.xml")
+    ap.add_argument("--model", default="models/plate_detector.pt")
+    ap.add_argument("--out", default=None, help="domyślnie data/results/results_<limit|all>.csv")
+    ap.add_argument("--limit", type=int, default=None, help="tylko pierwsze N obrazów (sortowanie po nazwie)")
+    ap.add_argument("--workers", type=int, default=1, help="liczba procesów (1 = sekwencyjnie)")
+    ap.add_argument("--threads", type=int, default=None, help="wątki na proces (torch/OpenCV/Paddle)")
+    ap.add_argument("--chunk", type=int, default=32, help="ile obrazów w jednym zadaniu procesu")
+    ap.add_argument("--batch", type=int, default=8, help="ile obrazów na jeden przebieg YOLO")
+    ap.add_argument("--ocr-mode", choices=["full", "rec"], default="full")
+    ap.add_argument("--backend", choices=["torch", "onnx", "openvino"], default=DETECTOR_BACKEND.name)
+    ap.add_argument("--int8", action="store_true", help="z --backend openvino: model int8")
+    ap.add_argument("--cascade", default=",".join(OCR_CASCADE.variants),
+                    help="warianty cropa dla OCR po kolei: sharp, raw, sharp3, clahe")
+    ap.add_argument("--ocr-min-conf", type=float, default=OCR_CASCADE.accept_conf,
+                    help="conf, od którego poprawna tablica kończy kaskadę OCR")
+    args = ap.parse_args()
+    try:
+        ocr_cascade = parse_cascade(args.cascade, accept_conf=args.ocr_min_conf)
+    except ValueError as e:
+        ap.error(str(e))
+
     os.environ["DISABLE_MODEL_SOURCE_CHECK"] = "True"
+    if args.threads:
+        # dziedziczone przez procesy potomne przed importem torch/paddle
+        for var in ("OMP_NUM_THREADS", "MKL_NUM_THREADS", "OPENBLAS_NUM_THREADS"):
+            os.environ[var] = str(args.threads)
 
-    images_dir = Path("data/images")
-    xml_path = Path("data/annotations.xml")
-    model_path = Path("models/plate_detector.pt")
+    images_dir = Path(args.images)
+    xml_path = Path(args.xml)
+    model_path = Path(args.model)
 
-    out_csv = Path("data/results/results_10.csv")
+    out_csv = Path(args.out or f"data/results/results_{args.limit or 'all'}.csv")
     out_csv.parent.mkdir(parents=True, exist_ok=True)
 
     if not images_dir.exists():
@@ -93,54 +221,55 @@ def main():
 
     gt_map = load_cvat_gt(str(xml_path)) if xml_path.exists() else {}
 
-    detector = PlateDetector(str(model_path), conf=0.35)
-    ocr = PlateOCR()
-
-    img_paths = sorted(glob.glob(str(images_dir / "*.jpg")))[:10]
+    img_paths = sorted(glob.glob(str(images_dir / "*.jpg")))
+    if args.limit:
+        img_paths = img_paths[:args.limit]
     if not img_paths:
-        raise FileNotFoundError("No .jpg found in data/images")
+        raise FileNotFoundError(f"No .jpg found in {images_dir}")
 
-    results = []
-    with_gt = 0
-    correct = 0
-    unknown = 0
+    chunk = max(1, args.chunk)
+    chunks = [img_paths[i:i + chunk] for i in range(0, len(img_paths), chunk)]
+    backend = DetectorBackend(args.backend, int8=args.int8)
+    resolve_weights(str(model_path), backend)  # brak eksportu -> błąd od razu, nie w procesie roboczym
+    init_args = (str(model_path), args.ocr_mode, args.threads, 0.35, ocr_cascade,
+                 max(1, args.batch), backend)
 
-    for p in img_paths:
-        name = Path(p).name
-        img = cv2.imread(p)
-        if img is None:
-            continue
+    results = []
+    cascade_stats = CascadeStats(ocr_cascade.variants)
 
-        pred, yconf, raw, rconf = predict_plate(img, detector, ocr)
-
-        gt = gt_map.get(name, "")
-        match = ""
-        if gt:
-            with_gt += 1
-            match = "1" if norm_plate(pred) == gt else "0"
-            if match == "1":
-                correct += 1
-
-        if pred is None:
-            unknown += 1
-
-        results.append({
-            "image": name,
-            "gt": gt,
-            "pred": pred or "",
-            "match": match,
-            "yolo_conf": f"{yconf:.3f}",
-            "ocr_raw": raw,
-            "ocr_conf": f"{rconf:.3f}",
-        })
-
-    # write CSV
+    # CSV zapisywany na bieżąco, w kolejności ukończenia paczek
     with out_csv.open("w", newline="", encoding="utf-8") as f:
-        w = csv.DictWriter(f, fieldnames=list(results[0].keys()))
+        w = csv.DictWriter(f, fieldnames=FIELDS)
         w.writeheader()
-        w.writerows(results)
 
-    print("\n===== EVAL (10 IMAGES) =====")
+        for rows, chunk_stats in _run_chunks(chunks, args.workers, init_args):
+            cascade_stats.merge(chunk_stats)
+            for name, pred, yconf, raw, rconf in rows:
+                gt = gt_map.get(name, "")
+                match = ""
+                if gt:
+                    match = "1" if norm_plate(pred) == gt else "0"
+
+                r = {
+                    "image": name,
+                    "gt": gt,
+                    "pred": pred or "",
+                    "match": match,
+                    "yolo_conf": f"{yconf:.3f}",
+                    "ocr_raw": raw,
+                    "ocr_conf": f"{rconf:.3f}",
+                }
+                w.writerow(r)
+                results.append(r)
+            f.flush()
+
+    # podsumowanie w kolejności plików - identyczne jak przy przebiegu sekwencyjnym
+    results.sort(key=lambda r: r["image"])
+    with_gt = sum(1 for r in results if r["gt"])
+    correct = sum(1 for r in results if r["match"] == "1")
+    unknown = sum(1 for r in results if not r["pred"])
+
+    print(f"\n===== EVAL ({len(results)} IMAGES) =====")
     print(f"Saved CSV: {out_csv.resolve()}")
     print(f"Images:    {len(results)}")
     print(f"UNKNOWN:   {unknown}")
@@ -150,6 +279,8 @@ def main():
         print(f"Accuracy:  {correct/with_gt:.3%}")
     else:
         print("No GT found in XML for these files (check XML / attribute name).")
+    print(f"\nOCR cascade: {','.join(ocr_cascade.variants)} (accept_conf={ocr_cascade.accept_conf})")
+    print(cascade_stats.format_table())
 
     wrong = [r for r in results if r["match"] == "0"]
     if wrong:
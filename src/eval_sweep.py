@@ -0,0 +1,241 @@
+# src/eval_sweep.py
+"""
+Przegląd parametrów (sweep) bez ponownego uruchamiania modeli.
+
+1) Wypełnia cache (src/vision/cache.py):
+   - detekcje YOLO liczone raz przy niskim progu --floor
+   - OCR dla każdego paddingu i wariantu cropa ("pre" = basic_preprocess, "raw" = bez preprocessu)
+2) Liczy accuracy dla całej siatki: yolo_conf x pad x ocr_min_conf x fallback x ocr_conf
+   wyłącznie z cache. fallback=1 to kaskada OCR sharp -> raw (src/vision/cascade.py)
+   z progiem akceptacji ocr_min_conf; kolumna ocr_calls = średnio wywołań OCR na tablicę.
+
+Uwaga: najlepszy box przy progu floor jest tym samym boxem, który detect_best zwróciłby
+przy wyższym progu, o ile jego conf >= yolo_conf (próg tylko odfiltrowuje słabsze boxy).
+
+Przykład:
+    python -m src.eval_sweep --yolo-conf 0.25,0.35,0.5 --pad 12,30 --ocr-conf 0,0.55
+"""
+import argparse
+import csv
+import glob
+import itertools
+import os
+import time
+from pathlib import Path
+
+import cv2
+
+from src.config import OcrCascade
+from src.eval_all import load_cvat_gt, norm_plate
+from src.vision.cache import InferenceCache, file_sha1
+from src.vision.cascade import pick
+from src.vision.preprocess import crop_with_padding, basic_preprocess
+
+
+VARIANTS = {
+    "pre": basic_preprocess,
+    "raw": lambda plate_bgr: cv2.cvtColor(plate_bgr, cv2.COLOR_BGR2RGB),
+}
+
+
+def _floats(s: str) -> list[float]:
+    return [float(x) for x in s.split(",") if x.strip()]
+
+
+def _ints(s: str) -> list[int]:
+    return [int(x) for x in s.split(",") if x.strip()]
+
+
+def fill_cache(cache: InferenceCache, img_paths: list[str], model_path: str, floor: float,
+               pads: list[int], ocr_mode: str, batch: int):
+    """
+    Uzupełnia brakujące detekcje i odczyty OCR. Modele ładowane tylko, gdy czegoś brakuje.
+    Zwraca ({path: image_hash}, dets, reads, liczba detekcji YOLO, liczba cropów OCR).
+    """
+    model_hash = file_sha1(model_path)
+    ocr_id = ocr_mode
+    hashes = {p: file_sha1(p) for p in img_paths}
+
+    dets = cache.load_detections(model_hash, floor)
+    reads = cache.load_reads(model_hash, floor, ocr_id)
+
+    def missing(p):
+        h = hashes[p]
+        if h not in dets:
+            return True
+        if dets[h] is None:
+            return False
+        return any((h, pad, v) not in reads for pad in pads for v in VARIANTS)
+
+    todo = [p for p in img_paths if missing(p)]
+    detector = ocr = None
+    n_det = n_ocr = 0
+
+    for i in range(0, len(todo), batch):
+        chunk = []
+        for p in todo[i:i + batch]:
+            img = cv2.imread(p)
+            if img is not None:
+                chunk.append((hashes[p], img))
+        if not chunk:
+            continue
+
+        need_det = [(h, img) for h, img in chunk if h not in dets]
+        if need_det:
+            if detector is None:
+                from src.vision.detector import PlateDetector
+                detector = PlateDetector(model_path, conf=floor)
+            new_dets = dict(zip(
+                [h for h, _ in need_det],
+                detector.detect_batch([img for _, img in need_det])
+            ))
+            n_det += len(need_det)
+            cache.save_detections(model_hash, floor, new_dets)
+            dets.update(new_dets)
+
+        keys = []
+        crops = []
+        for h, img in chunk:
+            det = dets[h]
+            if det is None:
+                continue
+            x1, y1, x2, y2, _ = det
+            for pad in pads:
+                plate_bgr = crop_with_padding(img, x1, y1, x2, y2, pad=pad)
+                for v, fn in VARIANTS.items():
+                    if (h, pad, v) in reads:
+                        continue
+                    keys.append((h, pad, v))
+                    ok = plate_bgr is not None and plate_bgr.size > 0
+                    crops.append(fn(plate_bgr) if ok else None)
+
+        if keys:
+            if ocr is None:
+                from src.vision.ocr import PlateOCR
+                ocr = PlateOCR(mode=ocr_mode)
+            new_reads = dict(zip(keys, ocr.read_batch(crops)))
+            n_ocr += len(keys)
+            cache.save_reads(model_hash, floor, ocr_id, new_reads)
+            reads.update(new_reads)
+
+    return hashes, dets, reads, n_det, n_ocr
+
+
+def evaluate_point(names_hashes, gt_map, dets, reads, yolo_conf: float, pad: int,
+                   ocr_min_conf: float, fallback: bool, ocr_conf: float) -> dict:
+    """Accuracy jednego punktu siatki (tylko z cache)."""
+    # "pre" w cache = wariant "sharp" kaskady
+    cascade = OcrCascade(("sharp", "raw") if fallback else ("sharp",), accept_conf=ocr_min_conf)
+    with_gt = correct = unknown = plates = calls = 0
+    for name, h in names_hashes:
+        pred = None
+        det = dets.get(h)
+        if det is not None and det[4] >= yolo_conf:
+            r = pick(cascade, {
+                "sharp": reads.get((h, pad, "pre"), ("", 0.0)),
+                "raw": reads.get((h, pad, "raw"), ("", 0.0)),
+            })
+            plates += 1
+            calls += r.calls
+            if r.plate and r.conf >= ocr_conf:
+                pred = r.plate
+
+        if pred is None:
+            unknown += 1
+        gt = gt_map.get(name, "")
+        if gt:
+            with_gt += 1
+            if norm_plate(pred) == gt:
+                correct += 1
+
+    return {
+        "yolo_conf": yolo_conf,
+        "pad": pad,
+        "ocr_min_conf": ocr_min_conf,
+        "fallback": int(fallback),
+        "ocr_conf": ocr_conf,
+        "images": len(names_hashes),
+        "unknown": unknown,
+        "ocr_calls": round(calls / plates, 3) if plates else 0.0,
+        "gt": with_gt,
+        "correct": correct,
+        "accuracy": (correct / with_gt) if with_gt else 0.0,
+    }
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--images", default="data/images")
+    ap.add_argument("--xml", default="data/annotations.xml")
+    ap.add_argument("--model", default="models/plate_detector.pt")
+    ap.add_argument("--cache", default="data/cache/eval_cache.db")
+    ap.add_argument("--out", default="data/results/sweep.csv")
+    ap.add_argument("--limit", type=int, default=None)
+    ap.add_argument("--batch", type=int, default=8)
+    ap.add_argument("--ocr-mode", choices=["full", "rec"], default="full")
+    ap.add_argument("--floor", type=float, default=0.05, help="próg YOLO zapisywany w cache")
+    ap.add_argument("--yolo-conf", default="0.25,0.35,0.5")
+    ap.add_argument("--pad", default="12,30")
+    ap.add_argument("--ocr-min-conf", default="0.40", help="conf, od którego kaskada kończy się na sharp")
+    ap.add_argument("--ocr-conf", default="0,0.55", help="minimalny conf OCR, by przyjąć wynik")
+    ap.add_argument("--fallback", choices=["on", "off", "both"], default="both")
+    ap.add_argument("--top", type=int, default=10)
+    args = ap.parse_args()
+
+    os.environ["DISABLE_MODEL_SOURCE_CHECK"] = "True"
+
+    yolo_confs = _floats(args.yolo_conf)
+    if min(yolo_confs) < args.floor:
+        ap.error("--yolo-conf nie może być niższy niż --floor")
+
+    pads = _ints(args.pad)
+    fallbacks = {"on": [True], "off": [False], "both": [False, True]}[args.fallback]
+
+    img_paths = sorted(glob.glob(str(Path(args.images) / "*.jpg")))
+    if args.limit:
+        img_paths = img_paths[:args.limit]
+    if not img_paths:
+        raise FileNotFoundError(f"No .jpg found in {args.images}")
+
+    gt_map = load_cvat_gt(args.xml) if Path(args.xml).exists() else {}
+
+    cache = InferenceCache(args.cache)
+    t0 = time.perf_counter()
+    hashes, dets, reads, n_det, n_ocr = fill_cache(
+        cache, img_paths, args.model, args.floor, pads, args.ocr_mode, max(1, args.batch)
+    )
+    t_fill = time.perf_counter() - t0
+    cache.close()
+
+    names_hashes = [(Path(p).name, hashes[p]) for p in img_paths]
+
+    t0 = time.perf_counter()
+    grid = list(itertools.product(
+        yolo_confs, pads, _floats(args.ocr_min_conf), fallbacks, _floats(args.ocr_conf)
+    ))
+    rows = [evaluate_point(names_hashes, gt_map, dets, reads, *point) for point in grid]
+    t_sweep = time.perf_counter() - t0
+
+    out_csv = Path(args.out)
+    out_csv.parent.mkdir(parents=True, exist_ok=True)
+    with out_csv.open("w", newline="", encoding="utf-8") as f:
+        w = csv.DictWriter(f, fieldnames=list(rows[0].keys()))
+        w.writeheader()
+        w.writerows(rows)
+
+    print("\n===== SWEEP =====")
+    print(f"Images:     {len(img_paths)}")
+    print(f"Cache fill: {t_fill:.2f}s (YOLO runs: {n_det}, OCR crops: {n_ocr})")
+    print(f"Grid:       {len(rows)} points in {t_sweep:.3f}s")
+    print(f"Saved CSV:  {out_csv.resolve()}")
+    print("\nBest points:")
+    for r in sorted(rows, key=lambda r: (-r["accuracy"], r["unknown"]))[:args.top]:
+        print(f"- acc={r['accuracy']:.3%} correct={r['correct']}/{r['gt']} unknown={r['unknown']} "
+              f"ocr_calls={r['ocr_calls']:.2f}  "
+              f"yolo={r['yolo_conf']} pad={r['pad']} fallback={r['fallback']} "
+              f"ocr_min={r['ocr_min_conf']} ocr_conf={r['ocr_conf']}")
+    print("")
+
+
+if __name__ == "__main__":
+    main()
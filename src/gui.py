@@ -6,6 +6,7 @@ import pandas as pd
 import streamlit as st
 
 from src.app_service import ParkingService
+from src.vision import registry
 
 os.environ["DISABLE_MODEL_SOURCE_CHECK"] = "True"
 
@@ -28,13 +29,30 @@ load_css()
 
 st.title("System kontroli obsługi parkingu")
 
-service = ParkingService(model_path="models/plate_detector.pt", yolo_conf=0.35)
+@st.cache_resource
+def get_service() -> ParkingService:
+    # jeden serwis (modele + init_db) na proces, współdzielony przez sesje i reruny
+    service = ParkingService(model_path="models/plate_detector.pt", yolo_conf=0.35)
+    service.load_models()
+    return service
+
+
+service = get_service()
 
 col1, col2 = st.columns([2, 1])
 
 with col1:
     st.subheader("Wejście: podaj ścieżkę do zdjęcia")
     img_path = st.text_input("Ścieżka do zdjęcia", value="data/images/1.jpg")
+    uploaded = st.file_uploader("albo wgraj zdjęcie", type=["jpg", "jpeg", "png"])
+
+    # wgrane zdjęcie czytamy z pamięci (bez zapisu na dysk)
+    if uploaded is not None:
+        frame = uploaded.getvalue()
+        read, entry, exit_ = service.read_frame, service.entry_from_frame, service.exit_from_frame
+    else:
+        frame = img_path
+        read, entry, exit_ = service.read_plate, service.entry_from_image, service.exit_from_image
 
     btn1, btn2, btn3 = st.columns(3)
     with btn1:
@@ -45,11 +63,11 @@ with col1:
         do_read = st.button(" Odczyt ")
 
     if do_read:
-        res = service.read_plate(img_path)
+        res = read(frame)
         st.write(res)
 
     if do_entry:
-        res = service.entry_from_image(img_path)
+        res = entry(frame)
         if res["ok"]:
             st.success(f"Wjazd OK: {res['plate']} (id={res['event_id']})")
             st.json(res["read"])
@@ -58,7 +76,7 @@ with col1:
             st.json(res.get("read", {}))
 
     if do_exit:
-        res = service.exit_from_image(img_path)
+        res = exit_(frame)
         if res["ok"]:
             ex = res["exit"]
             st.success(
@@ -71,6 +89,9 @@ with col1:
             st.json(res.get("read", {}))
 
 with col2:
+    with st.expander("Modele"):
+        st.dataframe(pd.DataFrame(registry.load_report()), use_container_width=True)
+
     st.subheader("Stan parkingu")
     if st.button(" Pokaż auta na parkingu "):
         rows = service.open_cars()
@@ -83,9 +104,11 @@ with col2:
         st.dataframe(pd.DataFrame(rows), use_container_width=True)
 
     st.subheader("Eksport CSV")
-    out_csv = st.text_input("Plik CSV", value="data/parking_export.csv")
+    out_csv = st.text_input("Plik CSV (lub .parquet)", value="data/parking_export.csv")
+    incremental = st.checkbox("Tylko zmiany od ostatniego eksportu", value=False)
     if st.button(" Export CSV "):
-        rows = service.export_all(out_csv)
-        Path(out_csv).parent.mkdir(parents=True, exist_ok=True)
-        pd.DataFrame(rows).to_csv(out_csv, index=False)
-        st.success(f"Zapisano: {out_csv} ({len(rows)} rekordów)")
+        try:
+            n = service.export_all(out_csv, incremental=incremental)
+            st.success(f"Zapisano: {out_csv} ({n} rekordów)")
+        except (RuntimeError, ValueError) as e:
+            st.error(str(e))
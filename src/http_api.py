@@ -0,0 +1,252 @@
+# src/http_api.py
+"""
+Lekkie API HTTP dla bramek (stdlib, bez dodatkowych zależności).
+
+Endpointy (ciało żądania = bajty zdjęcia, np. JPEG):
+- POST /read   -> odczyt tablicy (bez zapisu)
+- POST /entry  -> wjazd
+- POST /exit   -> wyjazd
+- GET  /health -> {"ok": true}
+- GET  /stats  -> liczniki żądań + cache odczytów + kaskada OCR
+- GET  /metrics      -> czasy etapów potoku + kaskada OCR (Prometheus, text/plain)
+- GET  /metrics.json -> to samo jako JSON (p50/p95/p99 na etap)
+
+Jeden ParkingService na proces. Limity:
+- max_workers: ile żądań liczy się równolegle (reszta czeka w kolejce do queue_timeout -> 503)
+- timeout:     maksymalny czas obsługi żądania -> 504 dla /read, 202 {"pending": true}
+               dla /entry i /exit
+
+Timeout NIE przerywa pracy: wątek liczy dalej, a /entry i /exit zapisują zdarzenie w bazie
+po odpowiedzi. Dlatego dla nich 202 (w toku) zamiast błędu - klient nie powinien ponawiać
+wjazdu / wyjazdu (drugi wjazd zostałby odrzucony, drugi wyjazd zapisany jako BLOCKED).
+
+Przykład:
+    python -m src.http_api --port 8080
+    python -m src.http_api --port 8080 --stub --db /tmp/load.db   # atrapy modeli (pomiar narzutu)
+"""
+import argparse
+import json
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeout
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+MAX_BODY = 20 * 2**20  # 20 MB
+
+
+class GateApi:
+    def __init__(self, service, max_workers: int = 4, timeout: float = 10.0,
+                 queue_timeout: float = 2.0):
+        self.service = service
+        self.timeout = timeout
+        self.queue_timeout = queue_timeout
+        self._slots = threading.BoundedSemaphore(max_workers)
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="gate")
+        self._stats_lock = threading.Lock()
+        self.stats = {"requests": 0, "ok": 0, "rejected": 0, "timeouts": 0, "pending": 0, "errors": 0}
+
+        # bajty zdjęcia idą prosto do dekodera (bez pliku tymczasowego)
+        self.actions = {
+            "/read": service.read_frame,
+            "/entry": service.entry_from_frame,
+            "/exit": service.exit_from_frame,
+        }
+        # zapisują do bazy - po timeoucie zapis i tak nastąpi
+        self.writes = {"/entry", "/exit"}
+
+    def _count(self, key: str):
+        with self._stats_lock:
+            self.stats[key] += 1
+
+    def handle(self, path: str, body: bytes) -> tuple[int, dict]:
+        action = self.actions.get(path)
+        if action is None:
+            return 404, {"ok": False, "error": f"Nieznany endpoint: {path}"}
+        if not body:
+            return 400, {"ok": False, "error": "Puste ciało żądania (oczekiwane bajty zdjęcia)"}
+
+        self._count("requests")
+        if not self._slots.acquire(timeout=self.queue_timeout):
+            self._count("rejected")
+            return 503, {"ok": False, "error": "Serwer zajęty"}
+
+        fut = None
+        try:
+            fut = self._executor.submit(action, body)
+            res = fut.result(timeout=self.timeout)
+        except FutureTimeout:
+            if path in self.writes:
+                self._count("pending")
+                return 202, {"ok": None, "pending": True,
+                             "error": f"Przekroczony czas ({self.timeout}s) - odczyt trwa i zdarzenie "
+                                      "może jeszcze zostać zapisane - nie ponawiaj"}
+            self._count("timeouts")
+            return 504, {"ok": False, "error": f"Przekroczony czas ({self.timeout}s)"}
+        except Exception as e:
+            self._count("errors")
+            return 500, {"ok": False, "error": repr(e)}
+        finally:
+            # slot zwalniamy dopiero po zakończeniu pracy, także po timeoucie
+            if fut is not None and not fut.done():
+                fut.add_done_callback(lambda _: self._slots.release())
+            else:
+                self._slots.release()
+
+        self._count("ok")
+        return 200, res
+
+    def metrics(self) -> str:
+        """Czasy etapów ParkingService + liczniki żądań w formacie Prometheus."""
+        snap = self.snapshot()
+        lines = ["# TYPE alpr_http_requests_total counter"]
+        for key in ("requests", "ok", "rejected", "timeouts", "pending", "errors"):
+            lines.append(f'alpr_http_requests_total{{result="{key}"}} {snap[key]}')
+        text = "\n".join(lines) + "\n"
+        timer = getattr(self.service, "timer", None)
+        if timer is not None:
+            text += timer.to_prometheus()
+        cascade = snap.get("cascade")
+        if cascade:
+            text += _cascade_prometheus(cascade)
+        return text
+
+    def snapshot(self) -> dict:
+        with self._stats_lock:
+            out = dict(self.stats)
+        cache_stats = getattr(self.service, "cache_stats", None)
+        out["cache"] = cache_stats() if cache_stats else None
+        cascade_stats = getattr(self.service, "cascade_stats", None)
+        out["cascade"] = cascade_stats() if cascade_stats else None
+        return out
+
+
+def _cascade_prometheus(snap: dict, metric: str = "alpr_ocr_cascade") -> str:
+    """CascadeStats.snapshot() -> liczniki Prometheus (tablice, wywołania OCR, etapy)."""
+    lines = [
+        f"# TYPE {metric}_plates_total counter",
+        f"{metric}_plates_total {snap['plates']}",
+        f"# TYPE {metric}_calls_total counter",
+        f"{metric}_calls_total {snap['ocr_calls']}",
+        f"# TYPE {metric}_stage_total counter",
+    ]
+    for name, r in snap["stages"].items():
+        for key in ("reached", "accepted"):
+            lines.append(f'{metric}_stage_total{{variant="{name}",result="{key}"}} {r[key]}')
+    return "\n".join(lines) + "\n"
+
+
+def make_handler(api: GateApi):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def _send(self, status: int, payload: dict):
+            data = json.dumps(payload, default=str, ensure_ascii=False).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json; charset=utf-8")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def _send_text(self, status: int, text: str):
+            data = text.encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def do_GET(self):
+            if self.path == "/health":
+                self._send(200, {"ok": True})
+            elif self.path == "/stats":
+                self._send(200, api.snapshot())
+            elif self.path == "/metrics":
+                self._send_text(200, api.metrics())
+            elif self.path == "/metrics.json":
+                timer = getattr(api.service, "timer", None)
+                self._send(200, timer.snapshot() if timer is not None else {})
+            else:
+                self._send(404, {"ok": False, "error": f"Nieznany endpoint: {self.path}"})
+
+        def do_POST(self):
+            length = int(self.headers.get("Content-Length") or 0)
+            if length > MAX_BODY:
+                self._send(413, {"ok": False, "error": "Za duże zdjęcie"})
+                return
+            body = self.rfile.read(length) if length else b""
+            status, payload = api.handle(self.path, body)
+            self._send(status, payload)
+
+        def log_message(self, format, *args):
+            pass
+
+    return Handler
+
+
+def make_server(service, host: str = "127.0.0.1", port: int = 8080, max_workers: int = 4,
+                timeout: float = 10.0, queue_timeout: float = 2.0) -> ThreadingHTTPServer:
+    api = GateApi(service, max_workers=max_workers, timeout=timeout, queue_timeout=queue_timeout)
+    server = ThreadingHTTPServer((host, port), make_handler(api))
+    server.daemon_threads = True
+    server.api = api
+    return server
+
+
+def make_stub_service(timings: bool = False):
+    """ParkingService z atrapami modeli - do pomiaru narzutu samego serwisu."""
+    from src.app_service import ParkingService
+    from src.vision.stubs import StubDetector, StubOCR
+
+    return ParkingService(detector=StubDetector(), ocr=StubOCR(), cache_size=0, timings=timings)
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--host", default="127.0.0.1")
+    ap.add_argument("--port", type=int, default=8080)
+    ap.add_argument("--model", default="models/plate_detector.pt")
+    ap.add_argument("--yolo-conf", type=float, default=0.35)
+    ap.add_argument("--workers", type=int, default=4, help="równoległe żądania")
+    ap.add_argument("--timeout", type=float, default=10.0, help="limit czasu żądania [s]")
+    ap.add_argument("--queue-timeout", type=float, default=2.0, help="ile czekać na wolny slot [s]")
+    ap.add_argument("--backend", choices=["torch", "onnx", "openvino"], default=None,
+                    help="runtime detektora (domyślnie src.config.DETECTOR_BACKEND)")
+    ap.add_argument("--int8", action="store_true", help="z --backend openvino: model int8")
+    ap.add_argument("--camera", default=None, help="ROI kamery z src/config.py (CAMERAS)")
+    ap.add_argument("--multi-plate", action="store_true",
+                    help="OCR wszystkich tablic w kadrze; odpowiedź zawiera ranking kandydatów")
+    ap.add_argument("--stub", action="store_true", help="atrapy modeli zamiast YOLO/OCR")
+    ap.add_argument("--no-timings", action="store_true", help="bez histogramów etapów (/metrics pusty)")
+    ap.add_argument("--db", default=None, help="inna baza SQLite (np. do testów obciążeniowych)")
+    args = ap.parse_args()
+
+    os.environ["DISABLE_MODEL_SOURCE_CHECK"] = "True"
+    if args.db:
+        from src.storage import db
+        db.DB_PATH = Path(args.db)
+
+    if args.stub:
+        service = make_stub_service(timings=not args.no_timings)
+    else:
+        from src.app_service import ParkingService
+        from src.config import DetectorBackend
+
+        backend = DetectorBackend(args.backend, int8=args.int8) if args.backend else None
+        service = ParkingService(model_path=args.model, yolo_conf=args.yolo_conf,
+                                 camera=args.camera, multi_plate=args.multi_plate, backend=backend,
+                                 timings=not args.no_timings)
+        service.load_models()
+
+    server = make_server(service, args.host, args.port, args.workers, args.timeout, args.queue_timeout)
+    print(f"Gate API: http://{args.host}:{args.port} (workers={args.workers}, timeout={args.timeout}s)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
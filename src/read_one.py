@@ -3,10 +3,12 @@ import argparse
 import cv2
 from pathlib import Path
 
-from src.vision.detector import PlateDetector
-from src.vision.preprocess import crop_with_padding, basic_preprocess
+from src.config import OCR_CASCADE
+from src.timing import StageTimer
+from src.vision import registry
+from src.vision.cascade import CascadeReader, parse_cascade
+from src.vision.preprocess import crop_with_padding
 from src.vision.ocr import PlateOCR
-from src.vision.validate import validate_and_fix
 
 
 def resolve_image_path(img_arg: str | None, img_id: int | None) -> Path:
@@ -19,67 +21,108 @@ def resolve_image_path(img_arg: str | None, img_id: int | None) -> Path:
     return Path("data/images") / f"{img_id}.jpg"
 
 
+def read_detected(imgs, dets, ocr: PlateOCR, cascade: CascadeReader, timer: StageTimer | None = None):
+    """
+    Crop + kaskada OCR dla gotowych detekcji (każdy wariant jednym read_batch,
+    kolejny tylko dla niepewnych odczytów).
+    Zwraca listę (plate_bgr, CascadeRead); plate_bgr=None gdy brak cropa.
+    timer: opcjonalny pomiar etapów (crop / preprocess / ocr / ocr_<wariant> / ocr_fallback)
+    """
+    timer = timer or StageTimer(enabled=False)
+    crops = []
+    for img, det in zip(imgs, dets):
+        plate_bgr = None
+        if det is not None:
+            x1, y1, x2, y2, _ = det
+            with timer.stage("crop"):
+                plate_bgr = crop_with_padding(img, x1, y1, x2, y2, pad=30)
+        crops.append(plate_bgr if plate_bgr is not None and plate_bgr.size > 0 else None)
+
+    return list(zip(crops, cascade.read(ocr, crops, timer)))
+
+
 def main():
     ap = argparse.ArgumentParser()
-    ap.add_argument("--id", type=int, help="np. 5 (wczyta data/images/5.jpg)")
-    ap.add_argument("--img", type=str, help="np. data/images/5.jpg")
+    ap.add_argument("--id", type=int, nargs="+", help="np. 5 (wczyta data/images/5.jpg); można podać kilka")
+    ap.add_argument("--img", type=str, nargs="+", help="np. data/images/5.jpg; można podać kilka")
     ap.add_argument("--model", type=str, default="models/plate_detector.pt")
     ap.add_argument("--yolo-conf", type=float, default=0.35)
-    ap.add_argument("--ocr-min-conf", type=float, default=0.40)
+    ap.add_argument("--ocr-min-conf", type=float, default=OCR_CASCADE.accept_conf,
+                    help="conf, od którego poprawna tablica kończy kaskadę OCR")
+    ap.add_argument("--cascade", default=",".join(OCR_CASCADE.variants),
+                    help="warianty cropa dla OCR po kolei: sharp, raw, sharp3, clahe")
+    ap.add_argument("--ocr-mode", choices=["full", "rec"], default="full",
+                    help="rec = samo rozpoznawanie na cropie (fallback do full przy słabym wyniku)")
     ap.add_argument("--show", action="store_true")
+    ap.add_argument("--timings", action="store_true", help="czasy etapów (wczytanie, YOLO, crop, OCR...)")
+    ap.add_argument("--timings-json", type=str, default=None, help="zapisz czasy etapów do pliku JSON")
     args = ap.parse_args()
+    try:
+        cascade = CascadeReader(parse_cascade(args.cascade, accept_conf=args.ocr_min_conf))
+    except ValueError as e:
+        ap.error(str(e))
+    timer = StageTimer(enabled=args.timings or bool(args.timings_json))
 
     if args.img is None and args.id is None:
         ap.error("Podaj --id albo --img.")
 
-    img_path = resolve_image_path(args.img, args.id)
-    if not img_path.exists():
-        raise FileNotFoundError(f"Nie ma pliku: {img_path}")
-
-    img = cv2.imread(str(img_path))
-    if img is None:
-        raise RuntimeError(f"Nie mogę wczytać obrazu: {img_path}")
-
-    detector = PlateDetector(args.model, conf=args.yolo_conf)
-    ocr = PlateOCR()
+    if args.img:
+        img_paths = [resolve_image_path(p, None) for p in args.img]
+    else:
+        img_paths = [resolve_image_path(None, i) for i in args.id]
+
+    imgs = []
+    for img_path in img_paths:
+        if not img_path.exists():
+            raise FileNotFoundError(f"Nie ma pliku: {img_path}")
+
+        with timer.stage("imread"):
+            img = cv2.imread(str(img_path))
+        if img is None:
+            raise RuntimeError(f"Nie mogę wczytać obrazu: {img_path}")
+        imgs.append(img)
+
+    # jednorazowy odczyt: bez rozgrzewki
+    with timer.stage("load_models"):
+        detector = registry.get_detector(args.model, args.yolo_conf, warmup=False)
+        ocr = registry.get_ocr(args.ocr_mode, warmup=False)
+
+    # wszystkie obrazy jednym przebiegiem YOLO, wszystkie cropy jednym OCR
+    with timer.stage("detect"):
+        dets = detector.detect_batch(imgs)
+    reads = read_detected(imgs, dets, ocr, cascade, timer)
+
+    for img_path, det, (plate_bgr, r) in zip(img_paths, dets, reads):
+        if det is None:
+            print(f"IMAGE:     {img_path.name}")
+            print("Brak detekcji tablicy (YOLO nic nie znalazł).")
+            continue
+
+        yconf = det[4]
+        if plate_bgr is None:
+            print(f"IMAGE:     {img_path.name}")
+            print("Nie udało się wyciąć tablicy (crop pusty).")
+            continue
+
+        final_plate = r.plate or "UNKNOWN"
 
-    det = detector.detect_best(img)
-    if det is None:
         print(f"IMAGE:     {img_path.name}")
-        print("Brak detekcji tablicy (YOLO nic nie znalazł).")
-        return
-
-    x1, y1, x2, y2, yconf = det
-    plate_bgr = crop_with_padding(img, x1, y1, x2, y2, pad=30)
-    if plate_bgr is None or plate_bgr.size == 0:
-        print("Nie udało się wyciąć tablicy (crop pusty).")
-        return
-
-    # preprocess (Twoja wersja usuwa pasek UE ostrożnie itp.)
-    plate_rgb = basic_preprocess(plate_bgr)
-
-    # OCR próba 1
-    raw_text, ocr_conf = ocr.read_best(plate_rgb)
-
-    # fallback: jeśli wynik podejrzanie krótki albo bardzo słaby, spróbuj bez preprocessu
-    if (len(raw_text) < 6) or (ocr_conf < args.ocr_min_conf):
-        plate_rgb2 = cv2.cvtColor(plate_bgr, cv2.COLOR_BGR2RGB)
-        raw2, conf2 = ocr.read_best(plate_rgb2)
-        if conf2 > ocr_conf:
-            raw_text, ocr_conf = raw2, conf2
-
-    fixed = validate_and_fix(raw_text)
-    final_plate = fixed if fixed else "UNKNOWN"
-
-    print(f"IMAGE:     {img_path.name}")
-    print(f"YOLO conf: {yconf:.3f}")
-    print(f"OCR raw:   '{raw_text}' (conf {ocr_conf:.3f})")
-    print(f"PL final:  {final_plate}")
-
-    if args.show:
-        cv2.imshow("Plate crop", plate_bgr)
-        cv2.waitKey(0)
-        cv2.destroyAllWindows()
+        print(f"YOLO conf: {yconf:.3f}")
+        print(f"OCR raw:   '{r.raw}' (conf {r.conf:.3f}, variant {r.variant}, OCR calls {r.calls})")
+        print(f"PL final:  {final_plate}")
+
+        if args.show:
+            cv2.imshow("Plate crop", plate_bgr)
+            cv2.waitKey(0)
+            cv2.destroyAllWindows()
+
+    if args.timings:
+        print()
+        print(timer.format_table())
+        print()
+        print(cascade.stats.format_table())
+    if args.timings_json:
+        Path(args.timings_json).write_text(timer.to_json(), encoding="utf-8")
 
 
 if __name__ == "__main__":
@@ -0,0 +1,98 @@
+# src/read_stream.py
+"""
+Odczyt tablic ze strumienia: plik wideo, kamera (numer urządzenia) albo katalog klatek.
+
+Przykład:
+    python -m src.read_stream --source data/lane1.mp4 --stride 5
+    python -m src.read_stream --source data/images --stride 1 --stub
+    python -m src.read_stream --source data/lane1.mp4 --stride 2 --track   # jeden wynik na pojazd
+    python -m src.read_stream --source 0 --stride 2 --track --motion        # pusty pas ~ bez YOLO
+"""
+import argparse
+import os
+
+from src.config import CAMERAS, DETECTOR_BACKEND, DetectorBackend, camera_roi
+from src.timing import StageTimer
+from src.vision import registry
+from src.vision.motion import MotionGate
+from src.vision.stream import StreamProcessor
+from src.vision.tracker import PlateTracker
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--source", required=True, help="plik wideo, numer kamery albo katalog z klatkami")
+    ap.add_argument("--stride", type=int, default=5, help="analizuj co N-tą klatkę")
+    ap.add_argument("--queue", type=int, default=8, help="rozmiar kolejki zdekodowanych klatek")
+    ap.add_argument("--batch", type=int, default=4, help="klatek na jeden przebieg YOLO/OCR")
+    ap.add_argument("--limit", type=int, default=None, help="maks. liczba próbkowanych klatek")
+    ap.add_argument("--model", type=str, default="models/plate_detector.pt")
+    ap.add_argument("--yolo-conf", type=float, default=0.35)
+    ap.add_argument("--ocr-mode", choices=["full", "rec"], default="full")
+    ap.add_argument("--backend", choices=["torch", "onnx", "openvino"], default=DETECTOR_BACKEND.name)
+    ap.add_argument("--int8", action="store_true", help="z --backend openvino: model int8")
+    ap.add_argument("--camera", choices=sorted(CAMERAS), default=None, help="ROI kamery z src/config.py")
+    ap.add_argument("--timings", action="store_true", help="czasy etapów (p50/p95/p99) na końcu")
+    ap.add_argument("--stub", action="store_true", help="atrapy modeli (pomiar dekodowania / narzutu)")
+    ap.add_argument("--track", action="store_true",
+                    help="śledzenie + głosowanie: jeden wynik na przejazd, OCR do pewnego konsensusu")
+    ap.add_argument("--max-age", type=int, default=5, help="ile próbkowanych klatek bez detekcji zamyka ślad")
+    ap.add_argument("--max-reads", type=int, default=6, help="maks. odczytów OCR na ślad")
+    ap.add_argument("--lock-conf", type=float, default=0.8, help="zgodność głosów kończąca OCR śladu")
+    ap.add_argument("--motion", action="store_true", help="bramka ruchu: klatki statyczne bez YOLO")
+    ap.add_argument("--motion-sens", type=float, default=0.01,
+                    help="ułamek zmienionych pikseli otwierający bramkę (mniej = czulej)")
+    ap.add_argument("--motion-thr", type=int, default=25, help="próg różnicy jasności piksela [0..255]")
+    ap.add_argument("--cooldown", type=int, default=10, help="ile klatek przepuszczać po ostatnim ruchu")
+    args = ap.parse_args()
+
+    os.environ["DISABLE_MODEL_SOURCE_CHECK"] = "True"
+
+    if args.stub:
+        from src.vision.stubs import StubDetector, StubOCR
+        detector, ocr = StubDetector(), StubOCR()
+    else:
+        detector = registry.get_detector(args.model, args.yolo_conf,
+                                         backend=DetectorBackend(args.backend, int8=args.int8))
+        ocr = registry.get_ocr(args.ocr_mode)
+
+    tracker = None
+    if args.track:
+        tracker = PlateTracker(max_age=args.max_age, max_reads=args.max_reads, lock_conf=args.lock_conf)
+
+    motion = None
+    if args.motion:
+        motion = MotionGate(pixel_thr=args.motion_thr, min_fraction=args.motion_sens,
+                            cooldown=args.cooldown)
+
+    proc = StreamProcessor(detector, ocr, batch=args.batch, tracker=tracker, motion=motion,
+                           roi=camera_roi(args.camera), timer=StageTimer(enabled=args.timings))
+    for ev in proc.process(args.source, stride=args.stride, queue_size=args.queue, limit=args.limit):
+        if tracker is not None:
+            print(f"vehicle {ev.track_id:4d} frames {ev.first_frame}-{ev.last_frame}  "
+                  f"{ev.plate or '?':10s} (votes {ev.conf:.2f}, OCR {ev.ocr_calls}/{ev.frames}, "
+                  f"saved {ev.ocr_saved})")
+            continue
+        ts = f"{ev.timestamp:8.2f}s" if ev.timestamp is not None else "       -"
+        print(f"frame {ev.frame_index:6d} {ts}  {ev.plate:10s} "
+              f"(ocr {ev.ocr_conf:.3f}, yolo {ev.yolo_conf:.3f}, raw={ev.raw!r})")
+
+    r = proc.stats.report()
+    print("\n===== STREAM =====")
+    print(f"Frames:     {r['frames_read']} read, {r['frames_sampled']} sampled, "
+          f"{r['frames_processed']} processed (stride={args.stride})")
+    if motion is not None:
+        print(f"Motion:     {r['motion_skipped']} skipped, {r['frames_processed']} to YOLO "
+              f"({motion.stats()['skip_rate']:.0%} idle)")
+    print(f"Detections: {r['detections']}, OCR calls: {r['ocr_calls']}, events: {r['events']}")
+    if tracker is not None and r["vehicles"]:
+        print(f"Vehicles:   {r['vehicles']}, OCR skipped: {r['ocr_skipped']} "
+              f"({r['ocr_skipped'] / r['vehicles']:.1f} saved per vehicle)")
+    if args.timings:
+        print(proc.timer.format_table())
+    print(f"Throughput: {r['source_fps']} source fps, {r['processed_fps']} processed fps "
+          f"({r['elapsed_s']}s)")
+
+
+if __name__ == "__main__":
+    main()
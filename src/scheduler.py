@@ -0,0 +1,182 @@
+# src/scheduler.py
+"""
+Asynchroniczny front-end z mikro-batchowaniem dla wielu bramek naraz.
+
+Żądania trafiają do kolejki; kolektor składa je w paczki ograniczone przez:
+- max_batch:   maksymalny rozmiar paczki
+- max_wait_ms: jak długo czekać na dobranie kolejnych żądań po pierwszym
+Paczka idzie do funkcji batchowej (np. ParkingService.read_plates) w executorze,
+a każdy wywołujący dostaje swój wynik przez własny future.
+
+Kompromis latencja / przepustowość: większe max_batch i max_wait_ms = lepsze
+wykorzystanie batchowania YOLO/OCR kosztem czasu oczekiwania.
+
+Backpressure: kolejka ma limit max_queue - submit() czeka na miejsce,
+submit_nowait() od razu rzuca asyncio.QueueFull.
+
+Przykład:
+    async with plate_batcher(service, max_batch=8, max_wait_ms=15) as batcher:
+        res = await batcher.submit("data/images/1.jpg")
+"""
+import asyncio
+from concurrent.futures import Executor, ThreadPoolExecutor
+
+_STOP = object()
+
+
+class MicroBatcher:
+    def __init__(self, batch_fn, max_batch: int = 8, max_wait_ms: float = 10.0,
+                 max_queue: int = 256, max_inflight: int = 1, executor: Executor | None = None):
+        """
+        batch_fn:     funkcja list[item] -> list[result] (ta sama długość i kolejność)
+        max_inflight: ile paczek może liczyć się równolegle
+        executor:     gdzie liczyć paczki (domyślnie własna pula max_inflight wątków)
+        """
+        if max_batch < 1:
+            raise ValueError("max_batch musi być >= 1")
+
+        self.batch_fn = batch_fn
+        self.max_batch = max_batch
+        self.max_wait = max_wait_ms / 1000
+        self.max_queue = max_queue
+        self.max_inflight = max_inflight
+        self._executor = executor
+        self._own_executor = executor is None
+
+        self._queue: asyncio.Queue | None = None
+        self._collector: asyncio.Task | None = None
+        self._inflight: asyncio.Semaphore | None = None
+        self._tasks: set[asyncio.Task] = set()
+
+        self.batches = 0
+        self.items = 0
+        self.rejected = 0
+
+    async def start(self):
+        if self._collector is not None:
+            return
+        if self._own_executor:
+            self._executor = ThreadPoolExecutor(max_workers=self.max_inflight,
+                                                thread_name_prefix="batcher")
+        self._queue = asyncio.Queue(maxsize=self.max_queue)
+        self._inflight = asyncio.Semaphore(self.max_inflight)
+        self._collector = asyncio.create_task(self._collect())
+
+    async def stop(self):
+        """Dokańcza wszystko, co już jest w kolejce, i zatrzymuje kolektor."""
+        if self._collector is None:
+            return
+        await self._queue.put((_STOP, None))
+        await self._collector
+        if self._tasks:
+            await asyncio.gather(*self._tasks)
+        self._collector = None
+        if self._own_executor:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+
+    async def __aenter__(self):
+        await self.start()
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.stop()
+
+    async def submit(self, item):
+        """Dodaje żądanie (czeka, gdy kolejka pełna) i zwraca jego wynik."""
+        fut = asyncio.get_running_loop().create_future()
+        await self._queue.put((item, fut))
+        return await fut
+
+    def submit_nowait(self, item) -> asyncio.Future:
+        """Jak submit, ale przy pełnej kolejce od razu asyncio.QueueFull."""
+        fut = asyncio.get_running_loop().create_future()
+        try:
+            self._queue.put_nowait((item, fut))
+        except asyncio.QueueFull:
+            self.rejected += 1
+            raise
+        return fut
+
+    def qsize(self) -> int:
+        return self._queue.qsize() if self._queue is not None else 0
+
+    def stats(self) -> dict:
+        return {
+            "batches": self.batches,
+            "items": self.items,
+            "avg_batch": (self.items / self.batches) if self.batches else 0.0,
+            "rejected": self.rejected,
+            "queued": self.qsize(),
+        }
+
+    async def _collect(self):
+        loop = asyncio.get_running_loop()
+        stopping = False
+        while not stopping:
+            item, fut = await self._queue.get()
+            if item is _STOP:
+                break
+
+            batch = [(item, fut)]
+            deadline = loop.time() + self.max_wait
+            while len(batch) < self.max_batch:
+                # najpierw to, co już czeka - bez oczekiwania
+                try:
+                    nxt = self._queue.get_nowait()
+                except asyncio.QueueEmpty:
+                    timeout = deadline - loop.time()
+                    if timeout <= 0:
+                        break
+                    try:
+                        nxt = await asyncio.wait_for(self._queue.get(), timeout)
+                    except asyncio.TimeoutError:
+                        break
+                if nxt[0] is _STOP:
+                    stopping = True
+                    break
+                batch.append(nxt)
+
+            await self._inflight.acquire()
+            task = asyncio.create_task(self._run_batch(batch))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _run_batch(self, batch):
+        try:
+            # wywołujący, którzy zrezygnowali (timeout / cancel), nie zajmują miejsca w paczce
+            batch = [(item, fut) for item, fut in batch if not fut.cancelled()]
+            if not batch:
+                return
+
+            loop = asyncio.get_running_loop()
+            try:
+                results = await loop.run_in_executor(
+                    self._executor, self.batch_fn, [item for item, _ in batch]
+                )
+            except Exception as e:
+                for _, fut in batch:
+                    if not fut.done():
+                        fut.set_exception(e)
+                return
+
+            results = list(results)
+            if len(results) != len(batch):
+                e = RuntimeError(f"batch_fn zwróciło {len(results)} wyników dla {len(batch)} wejść")
+                for _, fut in batch:
+                    if not fut.done():
+                        fut.set_exception(e)
+                return
+
+            self.batches += 1
+            self.items += len(batch)
+            for (_, fut), res in zip(batch, results):
+                if not fut.done():
+                    fut.set_result(res)
+        finally:
+            self._inflight.release()
+
+
+def plate_batcher(service, **kwargs) -> MicroBatcher:
+    """MicroBatcher nad ParkingService.read_plates: await batcher.submit(img_path) -> dict."""
+    return MicroBatcher(service.read_plates, **kwargs)
@@ -34,20 +34,72 @@ ZASADY:
 - Historia zostaje w bazie jako audyt.
 """
 
+import os
 import sqlite3
+import threading
+from datetime import datetime
 from pathlib import Path
 
-DB_PATH = Path("data/parking.db")
+from src.billing.pricing import fee_for
 
+DB_PATH = Path("data/parking.db")
 
-def get_conn():
-    DB_PATH.parent.mkdir(parents=True, exist_ok=True)
-    conn = sqlite3.connect(DB_PATH)
+# Połączenia trzymane per wątek (i per proces - po fork nie współdzielimy połączenia)
+_local = threading.local()
+
+
+def connect(db_path: str | Path | None = None, tuned: bool = True) -> sqlite3.Connection:
+    """
+    Nowe połączenie do bazy.
+    tuned=True:
+    - WAL: odczyty (np. długi eksport) nie blokują zapisów bramek
+    - synchronous=NORMAL: w WAL bezpieczne przy awarii aplikacji, mniej fsync
+    - większy cache stron, tabele tymczasowe w pamięci
+    """
+    path = Path(db_path or DB_PATH)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    conn = sqlite3.connect(path, timeout=5.0, cached_statements=256)
     conn.row_factory = sqlite3.Row
     conn.execute("PRAGMA foreign_keys = ON;")
+    conn.create_function("fee_for", 2, _sql_fee_for, deterministic=True)
+    if tuned:
+        conn.execute("PRAGMA journal_mode = WAL;")
+        conn.execute("PRAGMA synchronous = NORMAL;")
+        conn.execute("PRAGMA cache_size = -16000;")  # ~16 MB
+        conn.execute("PRAGMA temp_store = MEMORY;")
     return conn
 
 
+def _sql_fee_for(entry_iso: str, exit_iso: str) -> int:
+    """billing.pricing.fee_for dostępne w SQL (ISO8601 -> PLN)."""
+    return fee_for(datetime.fromisoformat(entry_iso), datetime.fromisoformat(exit_iso))
+
+
+def get_conn():
+    """
+    Długo żyjące połączenie bieżącego wątku (otwierane przy pierwszym użyciu).
+    Użycie jak dotąd: `with get_conn() as conn:` -> commit / rollback transakcji.
+    Przygotowane zapytania są cache'owane przez sqlite3 w obrębie połączenia.
+    """
+    conns = getattr(_local, "conns", None)
+    if conns is None:
+        conns = _local.conns = {}
+
+    key = (os.getpid(), str(DB_PATH))
+    conn = conns.get(key)
+    if conn is None:
+        conn = conns[key] = connect(DB_PATH)
+    return conn
+
+
+def close_conn():
+    """Zamyka połączenia bieżącego wątku (np. przy wyłączaniu aplikacji)."""
+    conns = getattr(_local, "conns", None) or {}
+    for conn in conns.values():
+        conn.close()
+    conns.clear()
+
+
 def init_db():
     with get_conn() as conn:
         conn.execute("""
@@ -0,0 +1,139 @@
+# src/storage/export.py
+"""
+Eksport historii parking_events do CSV / Parquet - strumieniowo, paczkami z kursora,
+więc pamięć nie rośnie razem z tabelą (rekordów nie kasujemy).
+
+Tryby:
+- pełny:        cała tabela (opcjonalnie zakres dat entry_time)
+- przyrostowy:  tylko zmiany od poprzedniego eksportu do tego samego pliku;
+                stan w pliku obok: <out>.state.json
+                - nowe rekordy (id > ostatnie wyeksportowane id)
+                - rekordy wyeksportowane jako IN, które od tego czasu się zamknęły
+                  (dopisywane ponownie z aktualnym stanem - po id ostatni wiersz jest aktualny)
+
+CSV w trybie przyrostowym jest dopisywany; brak pliku (albo pusty plik) = pełny eksport,
+niezależnie od stanu. Pełny eksport też zapisuje stan (nadpisany plik = nowy punkt startu).
+Parquet tylko pełny (plik nie da się dopisać - przyrost nadpisałby historię).
+Parquet wymaga pyarrow (opcjonalna zależność).
+"""
+import csv
+import json
+from datetime import datetime
+from pathlib import Path
+
+from src.storage.repo import EVENT_COLUMNS, iter_events
+
+# ile id "otwartych" rekordów sprawdzać jednym zapytaniem
+_IDS_CHUNK = 500
+
+
+def _state_path(out_path: Path) -> Path:
+    return out_path.with_name(out_path.name + ".state.json")
+
+
+def _load_state(out_path: Path) -> dict:
+    p = _state_path(out_path)
+    if not p.exists():
+        return {"last_id": 0, "open_ids": []}
+    return json.loads(p.read_text(encoding="utf-8"))
+
+
+def _iter_chunks(date_from, date_to, incremental: bool, state: dict, chunk_size: int):
+    if incremental:
+        # zamknięte od poprzedniego eksportu (IN -> OUT)
+        open_ids = state.get("open_ids", [])
+        for i in range(0, len(open_ids), _IDS_CHUNK):
+            yield from iter_events(ids=open_ids[i:i + _IDS_CHUNK], chunk_size=chunk_size)
+        since_id = state.get("last_id", 0)
+    else:
+        since_id = None
+
+    yield from iter_events(date_from, date_to, since_id=since_id, chunk_size=chunk_size)
+
+
+def _csv_writer(out_path: Path, append: bool):
+    new_file = not append or not out_path.exists() or out_path.stat().st_size == 0
+    f = out_path.open("a" if not new_file else "w", newline="", encoding="utf-8")
+    w = csv.DictWriter(f, fieldnames=EVENT_COLUMNS)
+    if new_file:
+        w.writeheader()
+    return f, w.writerows
+
+
+def _parquet_writer(out_path: Path):
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError as e:
+        raise RuntimeError("Eksport Parquet wymaga pakietu pyarrow (pip install pyarrow).") from e
+
+    schema = pa.schema([
+        ("id", pa.int64()),
+        ("plate", pa.string()),
+        ("entry_time", pa.string()),
+        ("exit_time", pa.string()),
+        ("fee_pln", pa.int64()),
+        ("status", pa.string()),
+    ])
+    writer = pq.ParquetWriter(str(out_path), schema)
+
+    def write(rows):
+        writer.write_table(pa.Table.from_pylist(rows, schema=schema))
+
+    return writer, write
+
+
+def export_events(out_path: str, fmt: str | None = None,
+                  date_from: datetime | None = None, date_to: datetime | None = None,
+                  incremental: bool = False, chunk_size: int = 5000) -> int:
+    """
+    Zapisuje rekordy do out_path (CSV albo Parquet - wg fmt lub rozszerzenia pliku).
+    Zwraca liczbę zapisanych wierszy.
+    """
+    out = Path(out_path)
+    out.parent.mkdir(parents=True, exist_ok=True)
+    fmt = (fmt or out.suffix.lstrip(".") or "csv").lower()
+    if fmt not in {"csv", "parquet"}:
+        raise ValueError(f"Nieznany format eksportu: {fmt}")
+
+    if incremental and fmt == "parquet":
+        raise ValueError("Eksport przyrostowy obsługiwany tylko dla CSV (Parquet: eksport pełny).")
+    # plik usunięty / pusty: stary stan pominąłby całą wcześniejszą historię
+    if incremental and (not out.exists() or out.stat().st_size == 0):
+        incremental = False
+
+    state = _load_state(out) if incremental else {"last_id": 0, "open_ids": []}
+    last_id = state.get("last_id", 0)
+    prev_open = set(state.get("open_ids", []))
+    still_open: set[int] = set()
+    n = 0
+
+    if fmt == "csv":
+        handle, write = _csv_writer(out, append=incremental)
+    else:
+        handle, write = _parquet_writer(out)
+
+    try:
+        for rows in _iter_chunks(date_from, date_to, incremental, state, chunk_size):
+            batch = []
+            for r in rows:
+                if r["status"] == "IN":
+                    still_open.add(r["id"])
+                    # wciąż IN od poprzedniego eksportu -> nic nowego do zapisania
+                    if r["id"] in prev_open:
+                        continue
+                last_id = max(last_id, r["id"])
+                batch.append(r)
+            if batch:
+                write(batch)
+                n += len(batch)
+    finally:
+        handle.close()
+
+    # także po pełnym eksporcie - inaczej stary stan dopisałby wiersze, które plik już ma
+    _state_path(out).write_text(
+        json.dumps({"last_id": last_id, "open_ids": sorted(still_open),
+                    "exported_at": datetime.now().isoformat(timespec="seconds")}),
+        encoding="utf-8"
+    )
+    return n
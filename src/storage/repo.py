@@ -1,36 +1,44 @@
 # src/storage/repo.py
+import sqlite3
 from datetime import datetime
 
-from src.storage.db import get_conn
-from src.billing.pricing import fee_for
+from src.storage.db import get_conn, connect
 
 
 def register_entry(plate: str, when: datetime | None = None) -> int:
     """
     Wjazd:
     - jeśli auto już jest na parkingu (status IN) -> błąd (nie tworzymy nowego wpisu)
+
+    Jedno zapytanie (INSERT ... ON CONFLICT DO NOTHING RETURNING): o tym, czy auto
+    już jest na parkingu, decyduje indeks uniq_open_plate atomowo, także przy wielu bramkach.
     """
     when = when or datetime.now()
 
     with get_conn() as conn:
-        row = conn.execute(
-            "SELECT id, entry_time FROM parking_events WHERE plate=? AND status='IN' ORDER BY id DESC LIMIT 1",
-            (plate,)
-        ).fetchone()
-
-        if row:
-            existing_id = int(row["id"])
-            existing_entry = row["entry_time"]
-            raise ValueError(
-                f"Pojazd {plate} już jest na parkingu (IN). "
-                f"Aktywny wjazd id={existing_id}, entry_time={existing_entry}."
-            )
-
-        cur = conn.execute(
-            "INSERT INTO parking_events(plate, entry_time, status) VALUES (?, ?, 'IN')",
-            (plate, when.isoformat(timespec="seconds"))
-        )
-        return int(cur.lastrowid)
+        return _entry(conn, plate, when)
+
+
+def _entry(conn, plate: str, when: datetime) -> int:
+    row = conn.execute(
+        "INSERT INTO parking_events(plate, entry_time, status) VALUES (?, ?, 'IN') "
+        "ON CONFLICT(plate) WHERE status='IN' DO NOTHING RETURNING id",
+        (plate, when.isoformat(timespec="seconds"))
+    ).fetchone()
+    if row:
+        return int(row["id"])
+
+    # tylko ścieżka błędu: szczegóły aktywnego wjazdu do komunikatu
+    row = conn.execute(
+        "SELECT id, entry_time FROM parking_events WHERE plate=? AND status='IN' ORDER BY id DESC LIMIT 1",
+        (plate,)
+    ).fetchone()
+    existing_id = int(row["id"]) if row else None
+    existing_entry = row["entry_time"] if row else None
+    raise ValueError(
+        f"Pojazd {plate} już jest na parkingu (IN). "
+        f"Aktywny wjazd id={existing_id}, entry_time={existing_entry}."
+    )
 
 
 def register_exit(plate: str, when: datetime | None = None) -> dict | None:
@@ -38,40 +46,41 @@ def register_exit(plate: str, when: datetime | None = None) -> dict | None:
     Wyjazd:
     - jeśli brak aktywnego IN -> zapisujemy BLOCKED i zwracamy None
     - jeśli jest IN -> ustawiamy OUT + exit_time + fee_pln
+
+    Zamknięcie pobytu to jedno UPDATE ... RETURNING (opłata liczona w SQL przez fee_for),
+    więc dwie bramki nie zamkną tego samego wjazdu dwa razy.
     """
     when = when or datetime.now()
 
     with get_conn() as conn:
-        row = conn.execute(
-            "SELECT id, entry_time FROM parking_events WHERE plate=? AND status='IN' ORDER BY id DESC LIMIT 1",
-            (plate,)
-        ).fetchone()
-
-        if not row:
-            # audyt próby wyjazdu bez biletu
-            conn.execute(
-                "INSERT INTO parking_events(plate, entry_time, status) VALUES (?, ?, 'BLOCKED')",
-                (plate, when.isoformat(timespec="seconds"))
-            )
-            return None
-
-        event_id = int(row["id"])
-        entry_time = datetime.fromisoformat(row["entry_time"])
-        fee = fee_for(entry_time, when)
+        return _exit(conn, plate, when)
+
 
+def _exit(conn, plate: str, when: datetime) -> dict | None:
+    exit_iso = when.isoformat(timespec="seconds")
+    row = conn.execute(
+        "UPDATE parking_events SET exit_time=?, fee_pln=fee_for(entry_time, ?), status='OUT' "
+        "WHERE id=(SELECT id FROM parking_events WHERE plate=? AND status='IN' ORDER BY id DESC LIMIT 1) "
+        "RETURNING id, entry_time, fee_pln",
+        (exit_iso, exit_iso, plate)
+    ).fetchone()
+
+    if not row:
+        # audyt próby wyjazdu bez biletu
         conn.execute(
-            "UPDATE parking_events SET exit_time=?, fee_pln=?, status='OUT' WHERE id=?",
-            (when.isoformat(timespec="seconds"), fee, event_id)
+            "INSERT INTO parking_events(plate, entry_time, status) VALUES (?, ?, 'BLOCKED')",
+            (plate, exit_iso)
         )
+        return None
 
-        return {
-            "id": event_id,
-            "plate": plate,
-            "entry_time": entry_time.isoformat(timespec="seconds"),
-            "exit_time": when.isoformat(timespec="seconds"),
-            "fee_pln": fee,
-            "status": "OUT",
-        }
+    return {
+        "id": int(row["id"]),
+        "plate": plate,
+        "entry_time": datetime.fromisoformat(row["entry_time"]).isoformat(timespec="seconds"),
+        "exit_time": exit_iso,
+        "fee_pln": int(row["fee_pln"]),
+        "status": "OUT",
+    }
 
 
 def manual_exit(plate: str) -> int:
@@ -80,11 +89,80 @@ def manual_exit(plate: str) -> int:
     """
     when = datetime.now()
     with get_conn() as conn:
-        cur = conn.execute(
-            "INSERT INTO parking_events(plate, entry_time, exit_time, status) VALUES (?, ?, ?, 'MANUAL_EXIT')",
-            (plate, when.isoformat(timespec="seconds"), when.isoformat(timespec="seconds"))
-        )
-        return int(cur.lastrowid)
+        return _manual_exit(conn, plate, when)
+
+
+def _manual_exit(conn, plate: str, when: datetime) -> int:
+    cur = conn.execute(
+        "INSERT INTO parking_events(plate, entry_time, exit_time, status) VALUES (?, ?, ?, 'MANUAL_EXIT')",
+        (plate, when.isoformat(timespec="seconds"), when.isoformat(timespec="seconds"))
+    )
+    return int(cur.lastrowid)
+
+
+def _event_time(when) -> datetime:
+    """Czas zdarzenia z apply_events: None -> teraz; datetime / ISO8601 bez strefy (jak w bazie)."""
+    if when is None:
+        return datetime.now()
+    if isinstance(when, str):
+        try:
+            when = datetime.fromisoformat(when)
+        except ValueError:
+            raise ValueError(f"Niepoprawny czas zdarzenia: {when!r}") from None
+    elif not isinstance(when, datetime):
+        raise ValueError(f"Czas zdarzenia musi być datetime albo ISO8601, jest {type(when).__name__}")
+    if when.tzinfo is not None:
+        raise ValueError(f"Czas zdarzenia ze strefą czasową nie jest obsługiwany: {when.isoformat()}")
+    return when
+
+
+def apply_events(events: list[dict]) -> list[dict]:
+    """
+    Hurtowe wgranie zdarzeń z bramki (np. bufor kontrolera po zerwanym połączeniu).
+
+    Zdarzenie: {"kind": "entry" | "exit" | "manual_exit", "plate": "...", "when": datetime | ISO | None}
+    Zdarzenia są stosowane po kolei, w jednej transakcji (BEGIN IMMEDIATE), każde w swoim
+    SAVEPOINT - błędne zdarzenie (zły czas, błąd SQL) cofa tylko siebie.
+    Zasady jak w register_entry / register_exit / manual_exit:
+    - drugi wjazd auta, które jest IN -> odrzucony
+    - wyjazd bez aktywnego IN -> zapis BLOCKED
+    - opłata z billing.pricing.fee_for
+
+    Zwraca wynik dla każdego zdarzenia (w kolejności wejścia):
+    {"index", "kind", "plate", "ok", + "event_id" | "exit" | "error"}
+    """
+    out = []
+    conn = get_conn()
+    with conn:
+        conn.execute("BEGIN IMMEDIATE")
+        for i, ev in enumerate(events):
+            kind = ev.get("kind")
+            plate = ev.get("plate")
+            res = {"index": i, "kind": kind, "plate": plate}
+            conn.execute("SAVEPOINT apply_event")
+            try:
+                when = _event_time(ev.get("when"))
+                if not plate:
+                    raise ValueError("Brak tablicy w zdarzeniu")
+
+                if kind == "entry":
+                    res.update(ok=True, event_id=_entry(conn, plate, when))
+                elif kind == "exit":
+                    ex = _exit(conn, plate, when)
+                    if ex is None:
+                        res.update(ok=False, error=f"BLOCKED: brak aktywnego wjazdu dla {plate}")
+                    else:
+                        res.update(ok=True, exit=ex)
+                elif kind == "manual_exit":
+                    res.update(ok=True, event_id=_manual_exit(conn, plate, when))
+                else:
+                    raise ValueError(f"Nieznany typ zdarzenia: {kind}")
+            except (ValueError, sqlite3.Error) as e:
+                conn.execute("ROLLBACK TO apply_event")
+                res.update(ok=False, error=str(e))
+            conn.execute("RELEASE apply_event")
+            out.append(res)
+    return out
 
 
 def list_open() -> list[dict]:
@@ -116,3 +194,53 @@ def list_all() -> list[dict]:
             "FROM parking_events ORDER BY id ASC"
         ).fetchall()
         return [dict(r) for r in rows]
+
+
+EVENT_COLUMNS = ["id", "plate", "entry_time", "exit_time", "fee_pln", "status"]
+
+
+def iter_events(date_from: datetime | None = None, date_to: datetime | None = None,
+                since_id: int | None = None, ids: list[int] | None = None,
+                chunk_size: int = 1000):
+    """
+    Strumieniowo: paczki (listy dict) rekordów po chunk_size, rosnąco po id.
+    Pamięć stała niezależnie od rozmiaru tabeli (kursor + fetchmany).
+
+    Filtry (łączone AND):
+    - date_from / date_to: entry_time w [date_from, date_to)
+    - since_id: tylko id > since_id
+    - ids: tylko podane id
+    Osobne połączenie: w WAL długi odczyt nie blokuje zapisów bramek.
+    """
+    where = []
+    params: list = []
+    if date_from is not None:
+        where.append("entry_time >= ?")
+        params.append(date_from.isoformat(timespec="seconds"))
+    if date_to is not None:
+        where.append("entry_time < ?")
+        params.append(date_to.isoformat(timespec="seconds"))
+    if since_id is not None:
+        where.append("id > ?")
+        params.append(int(since_id))
+    if ids is not None:
+        if not ids:
+            return
+        where.append(f"id IN ({','.join('?' * len(ids))})")
+        params.extend(int(i) for i in ids)
+
+    sql = f"SELECT {', '.join(EVENT_COLUMNS)} FROM parking_events"
+    if where:
+        sql += " WHERE " + " AND ".join(where)
+    sql += " ORDER BY id ASC"
+
+    conn = connect()
+    try:
+        cur = conn.execute(sql, params)
+        while True:
+            rows = cur.fetchmany(chunk_size)
+            if not rows:
+                break
+            yield [dict(r) for r in rows]
+    finally:
+        conn.close()
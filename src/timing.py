@@ -0,0 +1,135 @@
+# src/timing.py
+"""
+Pomiar czasu etapów potoku (dekodowanie, YOLO, crop, preprocess, OCR, fallback OCR, SQLite).
+
+- StageTimer.stage(name): context manager; wyłączony timer zwraca wspólny nullcontext,
+  więc narzut to jedno wywołanie metody
+- kroczące okno próbek na etap -> p50 / p95 / p99
+- eksport: tekst w formacie Prometheus (summary) i JSON
+
+Przykład:
+    timer = StageTimer()
+    with timer.stage("detect"):
+        ...
+    print(timer.to_prometheus())
+"""
+import contextlib
+import json
+import threading
+import time
+from collections import deque
+
+_NULL = contextlib.nullcontext()
+
+QUANTILES = (0.5, 0.95, 0.99)
+
+
+def quantile(values, q: float, is_sorted: bool = False) -> float:
+    """
+    Kwantyl q (0..1) metodą najbliższej rangi - jedna definicja dla timerów i benchmarków.
+    is_sorted=True: values już posortowane rosnąco (bez kopii). Puste -> 0.0.
+    """
+    vals = values if is_sorted else sorted(values)
+    if not vals:
+        return 0.0
+    k = min(len(vals) - 1, max(0, int(round(q * (len(vals) - 1)))))
+    return vals[k]
+
+
+class _Span:
+    __slots__ = ("timer", "name", "acc", "t0")
+
+    def __init__(self, timer, name: str, acc: dict | None):
+        self.timer = timer
+        self.name = name
+        self.acc = acc
+
+    def __enter__(self):
+        self.t0 = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        dt = time.perf_counter() - self.t0
+        if self.timer is not None:
+            self.timer.record(self.name, dt)
+        if self.acc is not None:
+            self.acc[self.name] = self.acc.get(self.name, 0.0) + dt
+        return False
+
+
+class StageTimer:
+    def __init__(self, enabled: bool = True, window: int = 2048):
+        """
+        enabled: zbieranie histogramów w procesie (False = prawie zerowy narzut)
+        window:  ile ostatnich próbek na etap trzymać do percentyli
+        """
+        self.enabled = enabled
+        self.window = window
+        self._lock = threading.Lock()
+        self._samples: dict[str, deque] = {}
+        self._count: dict[str, int] = {}
+        self._sum: dict[str, float] = {}
+
+    def stage(self, name: str, acc: dict | None = None):
+        """
+        Mierzy blok kodu jako etap `name`.
+        acc: słownik na czasy jednego żądania (sekundy, sumowane po etapie) - działa
+             także przy wyłączonym timerze (wynik z timings=True).
+        """
+        if not self.enabled and acc is None:
+            return _NULL
+        return _Span(self if self.enabled else None, name, acc)
+
+    def record(self, name: str, seconds: float):
+        with self._lock:
+            buf = self._samples.get(name)
+            if buf is None:
+                buf = self._samples[name] = deque(maxlen=self.window)
+                self._count[name] = 0
+                self._sum[name] = 0.0
+            buf.append(seconds)
+            self._count[name] += 1
+            self._sum[name] += seconds
+
+    def reset(self):
+        with self._lock:
+            self._samples.clear()
+            self._count.clear()
+            self._sum.clear()
+
+    def snapshot(self) -> dict:
+        """{etap: {count, sum_s, p50_ms, p95_ms, p99_ms}}"""
+        with self._lock:
+            items = [(k, sorted(v), self._count[k], self._sum[k]) for k, v in self._samples.items()]
+        out = {}
+        for name, vals, count, total in items:
+            row = {"count": count, "sum_s": round(total, 6)}
+            for q in QUANTILES:
+                row[f"p{int(q * 100)}_ms"] = round(1000 * quantile(vals, q, is_sorted=True), 3)
+            out[name] = row
+        return out
+
+    def to_json(self) -> str:
+        return json.dumps(self.snapshot(), indent=2)
+
+    def to_prometheus(self, metric: str = "alpr_stage_seconds") -> str:
+        lines = [
+            f"# HELP {metric} Czas etapu potoku rozpoznawania tablic.",
+            f"# TYPE {metric} summary",
+        ]
+        with self._lock:
+            items = [(k, sorted(v), self._count[k], self._sum[k]) for k, v in self._samples.items()]
+        for name, vals, count, total in sorted(items):
+            for q in QUANTILES:
+                lines.append(f'{metric}{{stage="{name}",quantile="{q}"}} {quantile(vals, q, is_sorted=True):.6f}')
+            lines.append(f'{metric}_sum{{stage="{name}"}} {total:.6f}')
+            lines.append(f'{metric}_count{{stage="{name}"}} {count}')
+        return "\n".join(lines) + "\n"
+
+    def format_table(self) -> str:
+        snap = self.snapshot()
+        lines = [f"{'stage':>14} {'count':>7} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9}"]
+        for name, r in snap.items():
+            lines.append(f"{name:>14} {r['count']:7d} {r['p50_ms']:9.2f} {r['p95_ms']:9.2f} "
+                         f"{r['p99_ms']:9.2f}")
+        return "\n".join(lines)
@@ -0,0 +1,94 @@
+# src/vision/backends.py
+"""
+Backendy detektora na CPU: eksport models/plate_detector.pt do ONNX / OpenVINO
+(opcjonalnie int8) i wybór wag dla PlateDetector.
+
+Wyeksportowany model ładuje ten sam ultralytics.YOLO, więc detect_best / detect_batch /
+detect_all działają bez zmian. Nazwy plików obok .pt:
+- onnx:          plate_detector.onnx
+- openvino:      plate_detector_openvino_model/
+- openvino int8: plate_detector_int8_openvino_model/
+
+Przykład:
+    python -m src.vision.backends --backend openvino --int8
+"""
+import shutil
+from pathlib import Path
+
+from src.config import DetectorBackend
+
+CALIB_DATA = "data/yolo/dataset.yaml"
+
+
+def exported_path(model_path: str, backend: DetectorBackend) -> Path:
+    p = Path(model_path)
+    if backend.name == "onnx":
+        return p.with_suffix(".onnx")
+    if backend.name == "openvino":
+        suffix = "_int8_openvino_model" if backend.int8 else "_openvino_model"
+        return p.with_name(p.stem + suffix)
+    return p
+
+
+def export_detector(model_path: str, backend: DetectorBackend, data: str = CALIB_DATA) -> Path:
+    """Eksport .pt -> backend; zwraca ścieżkę modelu do YOLO(...)."""
+    if backend.name == "torch":
+        return Path(model_path)
+    if backend.int8 and not Path(data).exists():
+        raise FileNotFoundError(f"Brak danych kalibracyjnych int8: {data}")
+
+    from ultralytics import YOLO
+
+    kwargs = {"format": backend.name, "imgsz": backend.imgsz, "dynamic": True}
+    if backend.int8:
+        kwargs.update(int8=True, data=data)
+    out = Path(YOLO(model_path).export(**kwargs))
+
+    # ultralytics nazywa wynik różnie zależnie od wersji - trzymamy stałą nazwę
+    target = exported_path(model_path, backend)
+    if out.resolve() != target.resolve():
+        if target.is_dir():
+            shutil.rmtree(target)
+        elif target.exists():
+            target.unlink()
+        shutil.move(str(out), str(target))
+    return target
+
+
+def resolve_weights(model_path: str, backend: DetectorBackend, auto_export: bool = False) -> str:
+    """Ścieżka wag dla backendu; bez eksportu (auto_export=False) brak pliku to błąd."""
+    target = exported_path(model_path, backend)
+    if target.exists():
+        return str(target)
+    if backend.name == "torch":
+        # wagi .pt nie powstają z eksportu - nie ma czego uruchomić
+        raise FileNotFoundError(f"Brak pliku wag: {target}")
+    if auto_export:
+        return str(export_detector(model_path, backend))
+    raise FileNotFoundError(
+        f"Brak modelu {backend.tag}: {target} "
+        f"(uruchom: python -m src.vision.backends --backend {backend.name}"
+        f"{' --int8' if backend.int8 else ''})"
+    )
+
+
+def main():
+    import argparse
+
+    from src.config import Paths
+
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--model", default=Paths().model_path)
+    ap.add_argument("--backend", choices=["onnx", "openvino"], default="openvino")
+    ap.add_argument("--int8", action="store_true", help="kwantyzacja int8 (openvino)")
+    ap.add_argument("--imgsz", type=int, default=640)
+    ap.add_argument("--data", default=CALIB_DATA, help="dataset YOLO do kalibracji int8")
+    args = ap.parse_args()
+
+    backend = DetectorBackend(args.backend, int8=args.int8, imgsz=args.imgsz)
+    out = export_detector(args.model, backend, data=args.data)
+    print(f"Exported {args.model} -> {out} ({backend.tag})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,207 @@
+# src/vision/cache.py
+"""
+Cache wyników modeli, kluczowany hashem obrazu i tożsamością modelu.
+
+InferenceCache (SQLite, dla eval_sweep):
+- detections: najlepszy box YOLO liczony przy niskim progu (floor)
+- ocr_reads:  wynik OCR dla cropa (pad) i wariantu preprocessingu
+Dzięki temu przegląd progów / paddingów nie uruchamia modeli ponownie.
+
+RecognitionCache (LRU w pamięci + opcjonalnie SQLite, dla ParkingService):
+- gotowy wynik read_plate dla tego samego zdjęcia (np. "Odczyt" a potem "Wjazd")
+"""
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+
+
+def bytes_sha1(data) -> str:
+    return hashlib.sha1(data).hexdigest()
+
+
+def file_sha1(path: str, chunk_size: int = 1 << 20) -> str:
+    h = hashlib.sha1()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+class InferenceCache:
+    def __init__(self, db_path: str = "data/cache/eval_cache.db"):
+        Path(db_path).parent.mkdir(parents=True, exist_ok=True)
+        self.conn = sqlite3.connect(db_path)
+        self.conn.execute("""
+        CREATE TABLE IF NOT EXISTS detections (
+            image_hash TEXT NOT NULL,
+            model_hash TEXT NOT NULL,
+            floor REAL NOT NULL,
+            x1 INTEGER, y1 INTEGER, x2 INTEGER, y2 INTEGER, conf REAL,
+            PRIMARY KEY (image_hash, model_hash, floor)
+        );
+        """)
+        self.conn.execute("""
+        CREATE TABLE IF NOT EXISTS ocr_reads (
+            image_hash TEXT NOT NULL,
+            model_hash TEXT NOT NULL,
+            floor REAL NOT NULL,
+            ocr_id TEXT NOT NULL,
+            pad INTEGER NOT NULL,
+            variant TEXT NOT NULL,
+            text TEXT NOT NULL,
+            conf REAL NOT NULL,
+            PRIMARY KEY (image_hash, model_hash, floor, ocr_id, pad, variant)
+        );
+        """)
+        self.conn.commit()
+
+    def close(self):
+        self.conn.close()
+
+    def load_detections(self, model_hash: str, floor: float) -> dict:
+        """{image_hash: (x1,y1,x2,y2,conf) albo None}; brak klucza = nie policzone."""
+        rows = self.conn.execute(
+            "SELECT image_hash, x1, y1, x2, y2, conf FROM detections "
+            "WHERE model_hash=? AND floor=?",
+            (model_hash, floor)
+        ).fetchall()
+        return {
+            r[0]: (None if r[5] is None else (r[1], r[2], r[3], r[4], r[5]))
+            for r in rows
+        }
+
+    def save_detections(self, model_hash: str, floor: float, items: dict):
+        """items: {image_hash: det albo None}"""
+        with self.conn:
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO detections VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                [
+                    (h, model_hash, floor, *(det if det is not None else (None,) * 5))
+                    for h, det in items.items()
+                ]
+            )
+
+    def load_reads(self, model_hash: str, floor: float, ocr_id: str) -> dict:
+        """{(image_hash, pad, variant): (text, conf)}"""
+        rows = self.conn.execute(
+            "SELECT image_hash, pad, variant, text, conf FROM ocr_reads "
+            "WHERE model_hash=? AND floor=? AND ocr_id=?",
+            (model_hash, floor, ocr_id)
+        ).fetchall()
+        return {(r[0], r[1], r[2]): (r[3], r[4]) for r in rows}
+
+    def save_reads(self, model_hash: str, floor: float, ocr_id: str, items: dict):
+        """items: {(image_hash, pad, variant): (text, conf)}"""
+        with self.conn:
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO ocr_reads VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                [
+                    (h, model_hash, floor, ocr_id, pad, variant, text, float(conf))
+                    for (h, pad, variant), (text, conf) in items.items()
+                ]
+            )
+
+
+class RecognitionCache:
+    def __init__(self, max_items: int = 128, db_path: str | None = None,
+                 db_max_items: int = 10000):
+        """
+        max_items:    rozmiar LRU w pamięci
+        db_path:      opcjonalny plik SQLite (przetrwa restart aplikacji)
+        db_max_items: limit wpisów w SQLite (najdawniej używane są usuwane)
+        """
+        self.max_items = max_items
+        self.db_max_items = db_max_items
+        self._items: OrderedDict[str, dict] = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.db_evictions = 0
+
+        self.conn = None
+        if db_path:
+            Path(db_path).parent.mkdir(parents=True, exist_ok=True)
+            self.conn = sqlite3.connect(db_path, check_same_thread=False)
+            self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS recognitions (
+                key TEXT PRIMARY KEY,
+                result TEXT NOT NULL,
+                used_at REAL NOT NULL
+            );
+            """)
+            self.conn.commit()
+
+    def get(self, key: str) -> dict | None:
+        with self._lock:
+            res = self._items.get(key)
+            if res is not None:
+                self._items.move_to_end(key)
+            elif self.conn is not None:
+                row = self.conn.execute(
+                    "SELECT result FROM recognitions WHERE key=?", (key,)
+                ).fetchone()
+                if row:
+                    res = json.loads(row[0])
+                    with self.conn:
+                        self.conn.execute(
+                            "UPDATE recognitions SET used_at=? WHERE key=?", (time.time(), key)
+                        )
+                    self._put_memory(key, res)
+
+            if res is None:
+                self.misses += 1
+                return None
+
+            self.hits += 1
+            return dict(res)
+
+    def put(self, key: str, result: dict):
+        with self._lock:
+            self._put_memory(key, dict(result))
+            if self.conn is None:
+                return
+
+            with self.conn:
+                self.conn.execute(
+                    "INSERT OR REPLACE INTO recognitions VALUES (?, ?, ?)",
+                    (key, json.dumps(result), time.time())
+                )
+                n = self.conn.execute("SELECT COUNT(*) FROM recognitions").fetchone()[0]
+                if n > self.db_max_items:
+                    self.conn.execute(
+                        "DELETE FROM recognitions WHERE key IN ("
+                        "SELECT key FROM recognitions ORDER BY used_at ASC LIMIT ?)",
+                        (n - self.db_max_items,)
+                    )
+                    self.db_evictions += n - self.db_max_items
+
+    def _put_memory(self, key: str, result: dict):
+        self._items[key] = result
+        self._items.move_to_end(key)
+        while len(self._items) > self.max_items:
+            self._items.popitem(last=False)
+            self.evictions += 1
+
+    def stats(self) -> dict:
+        total = self.hits + self.misses
+        return {
+            "size": len(self._items),
+            "max_items": self.max_items,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "db_evictions": self.db_evictions,
+            "hit_rate": (self.hits / total) if total else 0.0,
+        }
+
+    def clear(self):
+        with self._lock:
+            self._items.clear()
+            if self.conn is not None:
+                with self.conn:
+                    self.conn.execute("DELETE FROM recognitions")
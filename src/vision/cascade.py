@@ -0,0 +1,218 @@
+# src/vision/cascade.py
+"""
+Kaskada OCR: kolejne warianty cropa tylko dla tablic, których poprzedni wariant
+nie dał pewnego odczytu (poprawna tablica + conf >= accept_conf, patrz src.config.OcrCascade).
+
+- każdy etap kaskady: preprocess wariantu + jedno read_batch dla wszystkich niepewnych cropów
+- wynik: najlepszy odczyt ze wszystkich prób (najpierw pewny / poprawny, potem conf)
+- CascadeStats: ile tablic dotarło do każdego etapu, ile zostało na nim przyjętych,
+  średnia liczba wywołań OCR na tablicę
+
+Przykład:
+    reader = CascadeReader(OcrCascade(("sharp", "raw", "clahe"), accept_conf=0.6))
+    reads = reader.read(ocr, crops_bgr)
+    print(reader.stats.format_table())
+"""
+import threading
+from dataclasses import dataclass
+
+import cv2
+
+from src.config import OCR_CASCADE, OcrCascade
+from src.timing import StageTimer
+from src.vision.preprocess import basic_preprocess, clahe_preprocess, preprocess_batch
+from src.vision.validate import validate_and_fix
+
+
+def _raw(plate_bgr):
+    if plate_bgr is None or plate_bgr.size == 0:
+        return None
+    return cv2.cvtColor(plate_bgr, cv2.COLOR_BGR2RGB)
+
+
+# nazwa wariantu -> fn(crop_bgr) -> RGB dla OCR; None = basic_preprocess przez preprocess_batch (bufory)
+VARIANTS = {
+    "sharp": None,
+    "raw": _raw,
+    "sharp3": lambda plate_bgr: basic_preprocess(plate_bgr, scale=3),
+    "clahe": clahe_preprocess,
+}
+
+_OFF = StageTimer(enabled=False)
+
+
+def parse_cascade(spec: str, accept_conf: float = OCR_CASCADE.accept_conf,
+                  min_len: int = OCR_CASCADE.min_len) -> OcrCascade:
+    """Lista wariantów z CLI ("sharp,raw,clahe") -> OcrCascade."""
+    variants = tuple(v.strip() for v in spec.split(",") if v.strip())
+    unknown = [v for v in variants if v not in VARIANTS]
+    if unknown:
+        raise ValueError(f"Nieznany wariant kaskady OCR: {', '.join(unknown)} "
+                         f"(dostępne: {', '.join(VARIANTS)})")
+    return OcrCascade(variants, accept_conf=accept_conf, min_len=min_len)
+
+
+@dataclass(frozen=True)
+class CascadeRead:
+    raw: str
+    conf: float
+    plate: str | None    # validate_and_fix(raw)
+    variant: str | None  # wariant, z którego pochodzi wynik (None = brak cropa)
+    calls: int           # ile razy ten crop przeszedł przez OCR
+
+
+def _make_read(text: str, conf: float, variant: str | None, calls: int) -> CascadeRead:
+    return CascadeRead(text, float(conf), validate_and_fix(text) or None, variant, calls)
+
+
+def accepts(cascade: OcrCascade, read: CascadeRead) -> bool:
+    """Czy odczyt kończy kaskadę dla tego cropa."""
+    return (read.plate is not None and len(read.plate) >= cascade.min_len
+            and read.conf >= cascade.accept_conf)
+
+
+def _rank(cascade: OcrCascade, read: CascadeRead):
+    return accepts(cascade, read), read.plate is not None, read.conf
+
+
+def pick(cascade: OcrCascade, reads: dict[str, tuple[str, float]]) -> CascadeRead:
+    """
+    Wynik kaskady z gotowych odczytów {wariant: (text, conf)} - np. z cache w eval_sweep.
+    Brakujące warianty są pomijane (liczą się tylko wywołania, które by się odbyły).
+    """
+    best = _make_read("", 0.0, None, 0)
+    calls = 0
+    for name in cascade.variants:
+        if name not in reads:
+            continue
+        calls += 1
+        cur = _make_read(*reads[name], name, calls)
+        if best.variant is None or _rank(cascade, cur) > _rank(cascade, best):
+            best = cur
+        if accepts(cascade, cur):
+            break
+    return CascadeRead(best.raw, best.conf, best.plate, best.variant, calls)
+
+
+class CascadeStats:
+    def __init__(self, variants: tuple[str, ...]):
+        self.variants = tuple(variants)
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.plates = 0
+            self.ocr_calls = 0
+            self.reached = dict.fromkeys(self.variants, 0)
+            self.accepted = dict.fromkeys(self.variants, 0)
+
+    def record(self, variant: str, reached: int, accepted: int):
+        with self._lock:
+            self.reached[variant] += reached
+            self.accepted[variant] += accepted
+            self.ocr_calls += reached
+
+    def add_plates(self, n: int):
+        with self._lock:
+            self.plates += n
+
+    def merge(self, snap: dict):
+        """Dodaje snapshot() z innego procesu (eval_all --workers)."""
+        with self._lock:
+            self.plates += snap["plates"]
+            self.ocr_calls += snap["ocr_calls"]
+            for name, row in snap["stages"].items():
+                self.reached[name] = self.reached.get(name, 0) + row["reached"]
+                self.accepted[name] = self.accepted.get(name, 0) + row["accepted"]
+
+    def snapshot(self) -> dict:
+        """{plates, ocr_calls, calls_per_plate, unresolved, stages: {wariant: {reached, accepted}}}"""
+        with self._lock:
+            stages = {v: {"reached": self.reached[v], "accepted": self.accepted[v]} for v in self.reached}
+            plates, calls = self.plates, self.ocr_calls
+        return {
+            "plates": plates,
+            "ocr_calls": calls,
+            "calls_per_plate": round(calls / plates, 3) if plates else 0.0,
+            "unresolved": plates - sum(r["accepted"] for r in stages.values()),
+            "stages": stages,
+        }
+
+    def format_table(self) -> str:
+        snap = self.snapshot()
+        plates = snap["plates"] or 1
+        lines = [f"{'variant':>10} {'reached':>8} {'%':>7} {'accepted':>9}"]
+        for name, r in snap["stages"].items():
+            lines.append(f"{name:>10} {r['reached']:8d} {100 * r['reached'] / plates:6.1f}% {r['accepted']:9d}")
+        lines.append(f"plates: {snap['plates']}, OCR calls: {snap['ocr_calls']} "
+                     f"({snap['calls_per_plate']:.2f} / plate), unresolved: {snap['unresolved']}")
+        return "\n".join(lines)
+
+
+class CascadeReader:
+    def __init__(self, cascade: OcrCascade | None = None, workers: int = 1):
+        """
+        cascade: warianty i próg akceptacji (domyślnie src.config.OCR_CASCADE)
+        workers: wątki preprocessu paczki (jak preprocess_batch)
+        """
+        self.cascade = cascade or OCR_CASCADE
+        unknown = [v for v in self.cascade.variants if v not in VARIANTS]
+        if unknown:
+            raise ValueError(f"Nieznany wariant kaskady OCR: {', '.join(unknown)}")
+        self.workers = workers
+        self.stats = CascadeStats(self.cascade.variants)
+
+    def read(self, ocr, crops_bgr, timer: StageTimer | None = None,
+             acc: dict | None = None) -> list[CascadeRead]:
+        """
+        Odczyt listy cropów BGR (widoki wystarczą) - wynik na tej samej pozycji.
+        None / pusty crop -> CascadeRead("", 0.0, None, None, 0).
+
+        timer / acc: etapy "preprocess" i "ocr" dla pierwszego wariantu,
+        "preprocess_<wariant>" / "ocr_<wariant>" dla kolejnych, "ocr_fallback" z PlateOCR (tryb rec).
+        """
+        timer = timer or _OFF
+        crops = list(crops_bgr)
+        out = [_make_read("", 0.0, None, 0)] * len(crops)
+        todo = [i for i, c in enumerate(crops) if c is not None and c.size > 0]
+        self.stats.add_plates(len(todo))
+
+        for k, name in enumerate(self.cascade.variants):
+            if not todo:
+                break
+            suffix = "" if k == 0 else f"_{name}"
+            with timer.stage("preprocess" + suffix, acc):
+                plates = preprocess_batch([crops[i] for i in todo], workers=self.workers,
+                                          fn=VARIANTS[name])
+            reads = self._ocr(ocr, plates, "ocr" + suffix, timer, acc)
+
+            left = []
+            for i, (text, conf) in zip(todo, reads):
+                prev = out[i]
+                cur = _make_read(text, conf, name, prev.calls + 1)
+                if prev.variant is not None and _rank(self.cascade, prev) >= _rank(self.cascade, cur):
+                    cur = CascadeRead(prev.raw, prev.conf, prev.plate, prev.variant, cur.calls)
+                out[i] = cur
+                if not accepts(self.cascade, cur):
+                    left.append(i)
+            self.stats.record(name, len(todo), len(todo) - len(left))
+            todo = left
+
+        return out
+
+    @staticmethod
+    def _ocr(ocr, plates, stage: str, timer: StageTimer, acc: dict | None):
+        if not timer.enabled and acc is None:
+            return ocr.read_batch(plates)
+
+        ocr_times: dict = {}
+        with timer.stage(stage, acc):
+            reads = ocr.read_batch(plates, timings=ocr_times)
+        fallback = ocr_times.get("ocr_fallback")
+        if fallback is not None:
+            if timer.enabled:
+                timer.record("ocr_fallback", fallback)
+            if acc is not None:
+                acc["ocr_fallback"] = acc.get("ocr_fallback", 0.0) + fallback
+        return reads
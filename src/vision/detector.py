@@ -1,22 +1,117 @@
+import threading
+
 import numpy as np
-from ultralytics import YOLO
+
+from src.vision.tracker import iou
 
 class PlateDetector:
     def __init__(self, model_path: str, conf: float = 0.35):
-        self.model = YOLO(model_path)
+        # ultralytics (torch) ładowane dopiero przy tworzeniu detektora;
+        # model_path może też wskazywać eksport ONNX / OpenVINO (src/vision/backends.py)
+        from ultralytics import YOLO
+
+        self.model = YOLO(model_path, task="detect")
         self.conf = conf
+        # jedna instancja bywa współdzielona między wątkami (rejestr modeli)
+        self._lock = threading.Lock()
 
     def detect_best(self, image_bgr):
         """
         Returns:
             (x1,y1,x2,y2,conf) as ints/floats or None
         """
-        res = self.model.predict(source=image_bgr, conf=self.conf, verbose=False)[0]
-        if res.boxes is None or len(res.boxes) == 0:
-            return None
-
-        xyxy = res.boxes.xyxy.cpu().numpy()
-        confs = res.boxes.conf.cpu().numpy()
-        i = int(np.argmax(confs))
-        x1, y1, x2, y2 = xyxy[i].tolist()
-        return int(x1), int(y1), int(x2), int(y2), float(confs[i])
+        return self.detect_batch([image_bgr])[0]
+
+    def detect_batch(self, images_bgr, batch_size: int | None = None):
+        """
+        Detekcja na liście klatek BGR w jednym przebiegu YOLO.
+
+        Returns:
+            lista (x1,y1,x2,y2,conf) albo None - po jednym elemencie na obraz,
+            w tej samej kolejności co wejście.
+        """
+        images = list(images_bgr)
+        if not images:
+            return []
+
+        batch_size = batch_size or len(images)
+        out = []
+        for i in range(0, len(images), batch_size):
+            chunk = images[i:i + batch_size]
+            # lista ndarray -> ultralytics składa ją w jeden batch
+            with self._lock:
+                results = self.model.predict(source=chunk, conf=self.conf, verbose=False)
+            out.extend(_best_box(r) for r in results)
+        return out
+
+    def detect_all(self, image_bgr, box_filter=None):
+        """Wszystkie tablice na obrazie - patrz detect_all_batch."""
+        return self.detect_all_batch([image_bgr], box_filter=box_filter)[0]
+
+    def detect_all_batch(self, images_bgr, batch_size: int | None = None, box_filter=None):
+        """
+        Jak detect_batch, ale zwraca wszystkie ramki powyżej progu conf (np. dwa auta w kolejce,
+        tablica na przyczepie).
+
+        box_filter: src.config.BoxFilter - NMS + filtr rozmiaru / proporcji (None = bez filtra)
+
+        Returns:
+            lista list (x1,y1,x2,y2,conf) posortowanych malejąco po conf - po jednej na obraz.
+        """
+        images = list(images_bgr)
+        if not images:
+            return []
+
+        batch_size = batch_size or len(images)
+        out = []
+        for i in range(0, len(images), batch_size):
+            chunk = images[i:i + batch_size]
+            with self._lock:
+                results = self.model.predict(source=chunk, conf=self.conf, verbose=False)
+            out.extend(_all_boxes(r) for r in results)
+        if box_filter is not None:
+            out = [filter_boxes(boxes, box_filter) for boxes in out]
+        return out
+
+
+def _all_boxes(res):
+    if res.boxes is None or len(res.boxes) == 0:
+        return []
+
+    data = res.boxes.data.cpu().numpy()
+    data = data[np.argsort(-data[:, 4])]
+    return [(int(x1), int(y1), int(x2), int(y2), float(conf))
+            for x1, y1, x2, y2, conf in data[:, :5].tolist()]
+
+
+def filter_boxes(boxes, box_filter):
+    """
+    Filtr rozmiaru i proporcji, potem zachłanne NMS (ramki malejąco po conf).
+    Ramek jest kilka na klatkę, więc zwykła pętla wystarcza.
+    """
+    f = box_filter
+    kept = []
+    for b in sorted(boxes, key=lambda b: b[4], reverse=True):
+        w, h = b[2] - b[0], b[3] - b[1]
+        if w <= 0 or h <= 0 or w * h < f.min_area:
+            continue
+        if not (f.min_aspect <= w / h <= f.max_aspect):
+            continue
+        if f.nms_iou is not None and any(iou(b, k) > f.nms_iou for k in kept):
+            continue
+        kept.append(b)
+        if f.max_det and len(kept) >= f.max_det:
+            break
+    return kept
+
+
+def _best_box(res):
+    """Najlepszy box z wyniku YOLO; jeden transfer tensora zamiast dwóch."""
+    if res.boxes is None or len(res.boxes) == 0:
+        return None
+
+    # data: [x1, y1, x2, y2, conf, cls]
+    data = res.boxes.data.cpu().numpy()
+    i = int(np.argmax(data[:, 4]))
+    x1, y1, x2, y2, conf = data[i, :5].tolist()
+    return int(x1), int(y1), int(x2), int(y2), float(conf)
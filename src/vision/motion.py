@@ -0,0 +1,78 @@
+# src/vision/motion.py
+"""
+Bramka ruchu: tania różnica klatek (zmniejszona, szara) przed YOLO.
+
+Klatka jest próbkowana co k-ty piksel (bez interpolacji), porównywana z tłem
+(średnia krocząca) i przepuszczana do detekcji tylko, gdy zmienił się
+wystarczający ułamek pikseli. Po wykryciu ruchu bramka pozostaje otwarta
+przez `cooldown` klatek, żeby nie zgubić wolno podjeżdżającego auta.
+"""
+import cv2
+import numpy as np
+
+
+class MotionGate:
+    def __init__(self, width: int = 160, pixel_thr: int = 25, min_fraction: float = 0.01,
+                 cooldown: int = 10, alpha: float = 0.05):
+        """
+        width:        docelowa szerokość obrazu do porównań (próbkowanie co k-ty piksel)
+        pixel_thr:    różnica jasności [0..255], od której piksel liczy się jako zmieniony
+        min_fraction: czułość - ułamek zmienionych pikseli, który otwiera bramkę
+        cooldown:     ile kolejnych klatek przepuścić po ostatnim ruchu
+        alpha:        tempo adaptacji tła (zmiany oświetlenia, cienie)
+        """
+        self.width = width
+        self.pixel_thr = pixel_thr
+        self.min_fraction = min_fraction
+        self.cooldown = cooldown
+        self.alpha = alpha
+
+        self._bg = None
+        self._hold = 0
+        self.processed = 0
+        self.skipped = 0
+        self.last_fraction = 0.0
+
+    def _small_gray(self, frame_bgr):
+        step = max(1, frame_bgr.shape[1] // self.width)
+        small = np.ascontiguousarray(frame_bgr[::step, ::step])
+        gray = cv2.cvtColor(small, cv2.COLOR_BGR2GRAY) if small.ndim == 3 else small
+        return cv2.GaussianBlur(gray, (5, 5), 0)
+
+    def check(self, frame_bgr) -> bool:
+        """True, jeśli klatka powinna iść do detekcji."""
+        gray = self._small_gray(frame_bgr)
+
+        if self._bg is None or self._bg.shape != gray.shape:
+            self._bg = gray.astype(np.float32)
+            self._hold = self.cooldown
+            self.processed += 1
+            return True
+
+        diff = cv2.absdiff(gray, cv2.convertScaleAbs(self._bg))
+        self.last_fraction = float(np.count_nonzero(diff > self.pixel_thr)) / diff.size
+        cv2.accumulateWeighted(gray, self._bg, self.alpha)
+
+        if self.last_fraction >= self.min_fraction:
+            self._hold = self.cooldown
+        elif self._hold > 0:
+            self._hold -= 1
+        else:
+            self.skipped += 1
+            return False
+
+        self.processed += 1
+        return True
+
+    def reset(self):
+        self._bg = None
+        self._hold = 0
+
+    def stats(self) -> dict:
+        total = self.processed + self.skipped
+        return {
+            "processed": self.processed,
+            "skipped": self.skipped,
+            "skip_rate": (self.skipped / total) if total else 0.0,
+            "last_fraction": self.last_fraction,
+        }
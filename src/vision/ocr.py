@@ -3,7 +3,8 @@ import os
 os.environ["DISABLE_MODEL_SOURCE_CHECK"] = "True"
 
 import re
-from paddleocr import PaddleOCR
+import threading
+import time
 
 
 # Preferujemy ciąg jak tablica: litery/cyfry, 5-9 znaków
@@ -46,50 +47,148 @@ def _score_plate_like(text: str, conf: float) -> float:
     return s
 
 
+# Model samego rozpoznawania linii tekstu (ten sam, którego używa pipeline dla lang="en")
+REC_MODEL_NAME = "en_PP-OCRv4_mobile_rec"
+REC_BATCH_SIZE = 32
+
+# Śmieci z paska UE, których nie traktujemy jako tablicy
+_NOISE = {"PL", "POL", "EU"}
+
+
+def _pick_best(pairs) -> tuple[str, float]:
+    """
+    Z par (tekst, conf) wybiera najbardziej "tablicowy" wynik.
+    Jeśli nic sensownego: ("", 0.0)
+    """
+    candidates = []
+    for t, sc in pairs:
+        t2 = _normalize(t)
+        if not t2:
+            continue
+
+        # filtruj typowe śmieci z paska UE
+        if t2 in _NOISE:
+            continue
+
+        candidates.append((t2, float(sc)))
+
+    if not candidates:
+        return "", 0.0
+
+    # wybierz najbardziej "tablicowy" wynik
+    best_text, best_conf = max(
+        candidates,
+        key=lambda x: _score_plate_like(x[0], x[1])
+    )
+    return best_text, float(best_conf)
+
+
 class PlateOCR:
-    def __init__(self):
-        # PaddleOCR 3.x / PaddleX pipeline
-        self.ocr = PaddleOCR(lang="en")
+    def __init__(self, mode: str = "full", rec_min_conf: float = 0.80,
+                 rec_model_name: str = REC_MODEL_NAME, cpu_threads: int | None = None):
+        """
+        mode:
+        - "full": detekcja tekstu + rozpoznawanie (pełny PaddleOCR)
+        - "rec":  tylko rozpoznawanie na cropie tablicy (crop = jedna linia tekstu);
+                  gdy wynik słaby (conf < rec_min_conf albo nie wygląda jak tablica)
+                  -> fallback do pełnego pipeline
+        cpu_threads: limit wątków Paddle na CPU (None = domyślny)
+        """
+        if mode not in {"full", "rec"}:
+            raise ValueError(f"Nieznany tryb OCR: {mode}")
+
+        self.mode = mode
+        self.rec_min_conf = rec_min_conf
+        self.rec = None
+        self.ocr = None
+        self.rec_calls = 0
+        self.fallbacks = 0
+        # jedna instancja bywa współdzielona między wątkami (rejestr modeli)
+        self._lock = threading.Lock()
+        self._kwargs = {"cpu_threads": cpu_threads} if cpu_threads else {}
+
+        # paddleocr ładowany dopiero przy tworzeniu modelu
+        if mode == "rec":
+            from paddleocr import TextRecognition
+            self.rec = TextRecognition(model_name=rec_model_name, **self._kwargs)
+        else:
+            self.ocr = self._full_pipeline()
 
     def read_best(self, plate_rgb):
         """
         Zwraca (text, confidence).
         Jeśli nie znajdzie sensownego wyniku: ("", 0.0)
         """
-        if plate_rgb is None:
-            return "", 0.0
+        return self.read_batch([plate_rgb])[0]
 
-        res = self.ocr.ocr(plate_rgb)
+    def read_batch(self, plates_rgb, timings: dict | None = None) -> list[tuple[str, float]]:
+        """
+        OCR wielu cropów jednym wywołaniem modelu (np. kilka pasów albo
+        kilka wariantów preprocessingu tego samego cropa).
+        Zwraca listę (text, confidence) w kolejności wejścia - tak jak read_best.
+
+        timings: opcjonalny słownik - dopisuje czas pełnego pipeline'u użytego
+                 jako fallback w trybie rec ("ocr_fallback", sekundy)
+        """
+        with self._lock:
+            return self._read_batch(list(plates_rgb), timings)
+
+    def _read_batch(self, plates, timings: dict | None = None) -> list[tuple[str, float]]:
+        out = [("", 0.0)] * len(plates)
+        idx = [i for i, p in enumerate(plates) if p is not None]
+        if not idx:
+            return out
+
+        if self.mode == "full":
+            for i, r in zip(idx, self._read_full([plates[i] for i in idx])):
+                out[i] = r
+            return out
+
+        self.rec_calls += len(idx)
+        weak = []
+        for i, (text, conf) in zip(idx, self._read_rec([plates[i] for i in idx])):
+            out[i] = (text, conf)
+            if conf < self.rec_min_conf or not PLATE_LIKE_RE.match(text):
+                weak.append(i)
+
+        if weak:
+            # recognizer niepewny -> pełny pipeline (jednym wywołaniem), wybierz lepszy z obu
+            self.fallbacks += len(weak)
+            t0 = time.perf_counter()
+            for i, full in zip(weak, self._read_full([plates[i] for i in weak])):
+                out[i] = _pick_best([out[i], full])
+            if timings is not None:
+                timings["ocr_fallback"] = timings.get("ocr_fallback", 0.0) + time.perf_counter() - t0
+
+        return out
+
+    def _read_rec(self, plates_rgb) -> list[tuple[str, float]]:
+        res = self.rec.predict(input=plates_rgb, batch_size=min(len(plates_rgb), REC_BATCH_SIZE))
+        return [_pick_best([(r["rec_text"], r["rec_score"])]) for r in res]
+
+    def _full_pipeline(self):
+        # PaddleOCR 3.x / PaddleX pipeline
+        from paddleocr import PaddleOCR
+        return PaddleOCR(lang="en", **self._kwargs)
+
+    def _read_full(self, plates_rgb) -> list[tuple[str, float]]:
+        if self.ocr is None:
+            self.ocr = self._full_pipeline()
+
+        res = self.ocr.ocr(plates_rgb)
         if not res:
-            return "", 0.0
+            return [("", 0.0)] * len(plates_rgb)
 
         # W Twojej wersji: res = [ { ... 'rec_texts': [...], 'rec_scores': [...] ... } ]
-        if isinstance(res, list) and len(res) > 0 and isinstance(res[0], dict):
-            d = res[0]
-            texts = d.get("rec_texts", []) or []
-            scores = d.get("rec_scores", []) or []
-
-            candidates = []
-            for t, sc in zip(texts, scores):
-                t2 = _normalize(t)
-                if not t2:
-                    continue
-
-                # filtruj typowe śmieci z paska UE
-                if t2 in {"PL", "POL", "EU"}:
-                    continue
-
-                candidates.append((t2, float(sc)))
-
-            if not candidates:
-                return "", 0.0
-
-            # wybierz najbardziej "tablicowy" wynik
-            best_text, best_conf = max(
-                candidates,
-                key=lambda x: _score_plate_like(x[0], x[1])
-            )
-            return best_text, float(best_conf)
-
-        # Fallback (gdyby kiedyś format był inny)
-        return "", 0.0
+        # - jeden dict na każdy obraz z listy
+        out = []
+        for d in res:
+            if isinstance(d, dict):
+                texts = d.get("rec_texts", []) or []
+                scores = d.get("rec_scores", []) or []
+                out.append(_pick_best(zip(texts, scores)))
+            else:
+                # Fallback (gdyby kiedyś format był inny)
+                out.append(("", 0.0))
+        return out
+
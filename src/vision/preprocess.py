@@ -1,10 +1,21 @@
 # src/vision/preprocess.py
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
 import cv2
+import numpy as np
+
+# bufory pośrednie (RGB, powiększenie, rozmycie) - osobne na wątek, rosną do największego cropa
+_scratch = threading.local()
+_pools: dict[int, ThreadPoolExecutor] = {}
+_pools_lock = threading.Lock()
 
 
-def crop_with_padding(img, x1, y1, x2, y2, pad=30):
+def crop_with_padding(img, x1, y1, x2, y2, pad=30, copy=True):
     """
     Crop bbox + padding w pikselach.
+    copy=False zwraca widok na img (bez kopiowania) - wystarcza, gdy crop idzie od razu
+    do preprocessu, a klatka żyje dłużej niż crop.
     """
     h, w = img.shape[:2]
     x1 = max(0, int(x1) - pad)
@@ -15,21 +26,22 @@ def crop_with_padding(img, x1, y1, x2, y2, pad=30):
     if x2 <= x1 or y2 <= y1:
         return None
 
-    return img[y1:y2, x1:x2].copy()
+    view = img[y1:y2, x1:x2]
+    return view.copy() if copy else view
 
 
-def basic_preprocess(plate_bgr):
-    """
-    Preprocessing pod tablice rejestracyjne:
-    - lekko przycina elementy przeszkadzające (pasek UE, ramki)
-    - powiększa
-    - delikatnie wyostrza
-    - zwraca RGB (PaddleOCR)
-    """
-    if plate_bgr is None or plate_bgr.size == 0:
-        return None
+def _scratch_buf(name: str, shape: tuple):
+    """Ciągły bufor uint8 o danym kształcie, wielokrotnego użytku w obrębie wątku."""
+    size = int(np.prod(shape))
+    bufs = _scratch.__dict__.setdefault("bufs", {})
+    flat = bufs.get(name)
+    if flat is None or flat.size < size:
+        flat = bufs[name] = np.empty(size, np.uint8)
+    return flat[:size].reshape(shape)
 
-    # --- 1) Usuń pasek UE (lewy fragment) + lekko góra/dół (ramki) ---
+
+def _trim(plate_bgr):
+    """Przycięcie paska UE i ramek - same widoki, bez kopii."""
     h, w = plate_bgr.shape[:2]
 
     # usuń ok. 12% z lewej (pasek UE + "PL")
@@ -43,20 +55,91 @@ def basic_preprocess(plate_bgr):
     bot = int(h2 * 0.12)
     if (h2 - top - bot) > 10:
         plate_bgr = plate_bgr[top:h2 - bot, :]
+    return plate_bgr
+
+
+def basic_preprocess(plate_bgr, out=None, scale: int = 2):
+    """
+    Preprocessing pod tablice rejestracyjne:
+    - lekko przycina elementy przeszkadzające (pasek UE, ramki)
+    - powiększa (scale razy; 3 pomaga przy małych tablicach)
+    - delikatnie wyostrza
+    - zwraca RGB (PaddleOCR)
 
-    # --- 2) Powiększenie ---
+    BGR -> RGB robimy na małym cropie przed powiększeniem: resize / blur / addWeighted
+    działają per kanał, więc wynik jest identyczny, a konwersja dotyczy 4x mniej pikseli.
+    Pośrednie obrazy trafiają do buforów wątku; nowy jest tylko wynik
+    (albo `out`, jeśli ma właściwy kształt (2h, 2w, 3) i typ uint8).
+    """
+    if plate_bgr is None or plate_bgr.size == 0:
+        return None
+
+    # --- 1) Usuń pasek UE (lewy fragment) + lekko góra/dół (ramki) ---
+    plate_bgr = _trim(plate_bgr)
+
+    # --- 2) BGR -> RGB dla PaddleOCR (na małym obrazie) ---
     h3, w3 = plate_bgr.shape[:2]
-    scale = 2  # możesz dać 3 jeśli tablice są małe
+    rgb = cv2.cvtColor(plate_bgr, cv2.COLOR_BGR2RGB, dst=_scratch_buf("rgb", (h3, w3, 3)))
+
+    # --- 3) Powiększenie ---
+    shape = (h3 * scale, w3 * scale, 3)
     plate = cv2.resize(
-        plate_bgr,
+        rgb,
         (w3 * scale, h3 * scale),
+        dst=_scratch_buf("big", shape),
         interpolation=cv2.INTER_CUBIC
     )
 
-    # --- 3) Delikatne wyostrzenie (bez binarizacji) ---
-    blur = cv2.GaussianBlur(plate, (0, 0), 1.2)
-    sharp = cv2.addWeighted(plate, 1.6, blur, -0.6, 0)
+    # --- 4) Delikatne wyostrzenie (bez binarizacji) ---
+    blur = cv2.GaussianBlur(plate, (0, 0), 1.2, dst=_scratch_buf("blur", shape))
+    if out is None or out.shape != shape or out.dtype != np.uint8:
+        out = np.empty(shape, np.uint8)
+    return cv2.addWeighted(plate, 1.6, blur, -0.6, 0, dst=out)
+
+
+def clahe_preprocess(plate_bgr, scale: int = 2):
+    """
+    Wariant dla tablic w cieniu / pod światło: przycięcie jak w basic_preprocess,
+    wyrównanie kontrastu (CLAHE na jasności L w LAB), powiększenie, RGB.
+    """
+    if plate_bgr is None or plate_bgr.size == 0:
+        return None
+
+    plate_bgr = _trim(plate_bgr)
+    lab = cv2.cvtColor(plate_bgr, cv2.COLOR_BGR2LAB)
+    l, a, b = cv2.split(lab)
+    # obiekt CLAHE nie jest bezpieczny wątkowo - tani, więc tworzony na wywołanie
+    l = cv2.createCLAHE(clipLimit=2.0, tileGridSize=(4, 4)).apply(l)
+    rgb = cv2.cvtColor(cv2.merge((l, a, b)), cv2.COLOR_LAB2RGB)
+
+    h, w = rgb.shape[:2]
+    return cv2.resize(rgb, (w * scale, h * scale), interpolation=cv2.INTER_CUBIC)
+
+
+def _pool(workers: int) -> ThreadPoolExecutor:
+    with _pools_lock:
+        pool = _pools.get(workers)
+        if pool is None:
+            pool = _pools[workers] = ThreadPoolExecutor(workers, thread_name_prefix="preprocess")
+        return pool
+
+
+def preprocess_batch(crops_bgr, workers: int = 1, outs=None, fn=None) -> list:
+    """
+    basic_preprocess dla listy cropów (widoki z crop_with_padding(copy=False) wystarczą).
+    None / puste cropy dają None na tej samej pozycji.
+
+    workers > 1: wspólna pula wątków (OpenCV zwalnia GIL), bufory pośrednie są per wątek.
+    outs: opcjonalna lista buforów wyjściowych (np. z poprzedniej paczki tych samych rozmiarów).
+    fn:   inny wariant preprocessu fn(crop) (np. z kaskady OCR); wtedy outs jest ignorowane.
+    """
+    crops = list(crops_bgr)
+    if fn is not None:
+        if workers <= 1 or len(crops) < 2:
+            return [fn(c) for c in crops]
+        return list(_pool(workers).map(fn, crops))
 
-    # --- 4) BGR -> RGB dla PaddleOCR ---
-    rgb = cv2.cvtColor(sharp, cv2.COLOR_BGR2RGB)
-    return rgb
+    outs = list(outs) if outs is not None else [None] * len(crops)
+    if workers <= 1 or len(crops) < 2:
+        return [basic_preprocess(c, o) for c, o in zip(crops, outs)]
+    return list(_pool(workers).map(basic_preprocess, crops, outs))
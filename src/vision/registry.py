@@ -0,0 +1,140 @@
+# src/vision/registry.py
+"""
+Rejestr modeli na proces: PlateDetector / PlateOCR ładowane raz i współdzielone
+(sesje Streamlit, CLI, procesy ewaluacji).
+
+- rozgrzewka (pierwsza inferencja) przy ładowaniu, żeby pierwszy odczyt nie był wolny
+- raport: czas ładowania, czas rozgrzewki, przyrost pamięci procesu (RSS)
+
+Przykład (sam pomiar ładowania):
+    python -m src.vision.registry
+"""
+import os
+import threading
+import time
+
+_lock = threading.Lock()
+_models: dict[tuple, object] = {}
+_report: list[dict] = []
+
+
+def _rss_mb() -> float | None:
+    """Aktualna pamięć procesu (RSS) w MB; None jeśli nie da się odczytać."""
+    try:
+        import psutil
+        return psutil.Process().memory_info().rss / 2**20
+    except ImportError:
+        pass
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 2**20
+    except (OSError, ValueError, AttributeError):
+        return None
+
+
+def _load(key: tuple, name: str, factory, warmup):
+    with _lock:
+        model = _models.get(key)
+        if model is not None:
+            return model
+
+        rss0 = _rss_mb()
+        t0 = time.perf_counter()
+        model = factory()
+        t_load = time.perf_counter() - t0
+
+        t_warm = 0.0
+        if warmup is not None:
+            t0 = time.perf_counter()
+            warmup(model)
+            t_warm = time.perf_counter() - t0
+
+        rss1 = _rss_mb()
+        _report.append({
+            "model": name,
+            "load_s": round(t_load, 3),
+            "warmup_s": round(t_warm, 3),
+            "rss_mb": round(rss1, 1) if rss1 is not None else None,
+            "rss_delta_mb": round(rss1 - rss0, 1) if rss0 is not None and rss1 is not None else None,
+        })
+        _models[key] = model
+        return model
+
+
+def _warmup_detector(detector):
+    import numpy as np
+    detector.detect_batch([np.zeros((640, 640, 3), dtype=np.uint8)])
+
+
+def _warmup_ocr(ocr):
+    """
+    Rozgrzewka na narysowanej tablicy, bez fallbacku: w trybie rec tylko recognizer -
+    pełny pipeline ładuje się dopiero przy pierwszym słabym odczycie (albo wcale).
+    """
+    import cv2
+    import numpy as np
+
+    plate = np.full((48, 160, 3), 255, dtype=np.uint8)
+    cv2.putText(plate, "SCZ26114", (6, 35), cv2.FONT_HERSHEY_SIMPLEX, 0.9, (0, 0, 0), 2, cv2.LINE_AA)
+    if ocr.mode == "rec":
+        ocr._read_rec([plate])
+    else:
+        ocr._read_full([plate])
+    # liczniki mają opisywać prawdziwe odczyty
+    ocr.rec_calls = 0
+    ocr.fallbacks = 0
+
+
+def get_detector(model_path: str, conf: float = 0.35, warmup: bool = True, backend=None):
+    """backend: src.config.DetectorBackend (domyślnie src.config.DETECTOR_BACKEND)."""
+    from src.config import DETECTOR_BACKEND
+    from src.vision.backends import resolve_weights
+    from src.vision.detector import PlateDetector
+
+    weights = resolve_weights(model_path, backend or DETECTOR_BACKEND)
+    return _load(
+        ("detector", weights, conf),
+        f"PlateDetector({weights}, conf={conf})",
+        lambda: PlateDetector(weights, conf=conf),
+        _warmup_detector if warmup else None,
+    )
+
+
+def get_ocr(mode: str = "full", cpu_threads: int | None = None, warmup: bool = True):
+    from src.vision.ocr import PlateOCR
+    return _load(
+        ("ocr", mode, cpu_threads),
+        f"PlateOCR(mode={mode})",
+        lambda: PlateOCR(mode=mode, cpu_threads=cpu_threads),
+        _warmup_ocr if warmup else None,
+    )
+
+
+def load_report() -> list[dict]:
+    """Co i jak długo było ładowane w tym procesie."""
+    return [dict(r) for r in _report]
+
+
+def main():
+    import argparse
+
+    from src.config import DETECTOR_BACKEND, DetectorBackend, Paths, Thresholds
+
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--model", default=Paths().model_path)
+    ap.add_argument("--yolo-conf", type=float, default=Thresholds().yolo_conf)
+    ap.add_argument("--ocr-mode", choices=["full", "rec"], default="full")
+    ap.add_argument("--backend", choices=["torch", "onnx", "openvino"], default=DETECTOR_BACKEND.name)
+    ap.add_argument("--int8", action="store_true")
+    args = ap.parse_args()
+
+    os.environ["DISABLE_MODEL_SOURCE_CHECK"] = "True"
+    get_detector(args.model, args.yolo_conf, backend=DetectorBackend(args.backend, int8=args.int8))
+    get_ocr(args.ocr_mode)
+    for r in load_report():
+        print(f"{r['model']:50s} load {r['load_s']:6.2f}s  warmup {r['warmup_s']:6.2f}s  "
+              f"RSS {r['rss_mb']} MB (+{r['rss_delta_mb']} MB)")
+
+
+if __name__ == "__main__":
+    main()
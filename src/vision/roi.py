@@ -0,0 +1,75 @@
+# src/vision/roi.py
+"""
+Obszar zainteresowania (ROI) kamery przed detekcją.
+
+Wycinek to widok numpy (bez kopii); jeśli jest większy niż roi.max_side, jest
+zmniejszany (INTER_AREA). Ramki z detektora przeliczamy z powrotem na
+współrzędne pełnej klatki, więc crop_with_padding działa bez zmian.
+"""
+import cv2
+
+from src.config import BoxFilter, Roi
+from src.vision.detector import filter_boxes
+
+
+def apply_roi(frame_bgr, roi: Roi):
+    """Zwraca (obraz do detekcji, (ox, oy, scale)); scale = rozmiar wycinka / rozmiar po skalowaniu."""
+    h, w = frame_bgr.shape[:2]
+    x1, y1 = int(roi.x1 * w), int(roi.y1 * h)
+    x2, y2 = int(round(roi.x2 * w)), int(round(roi.y2 * h))
+    view = frame_bgr[y1:y2, x1:x2]
+
+    scale = 1.0
+    if roi.max_side:
+        side = max(view.shape[:2])
+        if side > roi.max_side:
+            scale = side / roi.max_side
+            size = (max(1, round(view.shape[1] / scale)), max(1, round(view.shape[0] / scale)))
+            view = cv2.resize(view, size, interpolation=cv2.INTER_AREA)
+    return view, (x1, y1, scale)
+
+
+def map_box(det, transform, frame_shape):
+    """Ramka (x1,y1,x2,y2,conf) z wycinka -> współrzędne pełnej klatki (przycięte do kadru)."""
+    if det is None:
+        return None
+    ox, oy, scale = transform
+    h, w = frame_shape[:2]
+    x1, y1, x2, y2, conf = det
+    return (
+        min(w, max(0, int(ox + x1 * scale))),
+        min(h, max(0, int(oy + y1 * scale))),
+        min(w, max(0, int(ox + x2 * scale))),
+        min(h, max(0, int(oy + y2 * scale))),
+        conf,
+    )
+
+
+def detect_batch_roi(detector, frames_bgr, roi: Roi | None, batch_size: int | None = None):
+    """detector.detect_batch na wycinkach ROI; wynik w układzie pełnych klatek."""
+    frames = list(frames_bgr)
+    if roi is None or roi.is_full:
+        return detector.detect_batch(frames, batch_size=batch_size)
+
+    prepared = [apply_roi(f, roi) for f in frames]
+    dets = detector.detect_batch([v for v, _ in prepared], batch_size=batch_size)
+    return [map_box(d, t, f.shape) for d, (_, t), f in zip(dets, prepared, frames)]
+
+
+def detect_all_batch_roi(detector, frames_bgr, roi: Roi | None, box_filter: BoxFilter | None = None,
+                         batch_size: int | None = None):
+    """
+    detector.detect_all_batch na wycinkach ROI; ramki w układzie pełnych klatek.
+    Filtr (rozmiar w px pełnej klatki, NMS) stosujemy dopiero po przeliczeniu.
+    """
+    frames = list(frames_bgr)
+    if roi is None or roi.is_full:
+        return detector.detect_all_batch(frames, batch_size=batch_size, box_filter=box_filter)
+
+    prepared = [apply_roi(f, roi) for f in frames]
+    per_frame = detector.detect_all_batch([v for v, _ in prepared], batch_size=batch_size)
+    out = []
+    for boxes, (_, t), f in zip(per_frame, prepared, frames):
+        mapped = [map_box(b, t, f.shape) for b in boxes]
+        out.append(filter_boxes(mapped, box_filter) if box_filter is not None else mapped)
+    return out
@@ -0,0 +1,296 @@
+# src/vision/stream.py
+"""
+Tryb strumieniowy: plik wideo, kamera albo katalog klatek.
+
+- iter_frames: generator klatek z dekodowaniem w wątku tła i ograniczoną kolejką;
+  klatki pomijane przez stride nie są dekodowane (VideoCapture.grab)
+- StreamProcessor: detekcja + OCR tylko na próbkowanych klatkach (paczkami),
+  wynik jako zdarzenia PlateEvent; z trackerem (src/vision/tracker.py) - jeden
+  VehiclePassage na przejazd, a OCR tylko do czasu pewnego konsensusu;
+  z bramką ruchu (src/vision/motion.py) statyczne klatki omijają YOLO
+"""
+import queue
+import threading
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+
+import cv2
+
+from src.timing import StageTimer
+from src.vision.preprocess import crop_with_padding, preprocess_batch
+from src.vision.roi import detect_batch_roi
+from src.vision.validate import validate_and_fix
+
+IMAGE_EXT = {".jpg", ".jpeg", ".png", ".bmp"}
+
+_END = object()
+
+
+@dataclass(frozen=True)
+class PlateEvent:
+    frame_index: int
+    timestamp: float | None  # sekundy od początku nagrania (jeśli znamy FPS)
+    plate: str
+    raw: str
+    ocr_conf: float
+    yolo_conf: float
+    box: tuple[int, int, int, int]
+
+
+@dataclass
+class StreamStats:
+    # liczone po stronie konsumenta - klatki zdekodowane "na zapas" (kolejka) się nie liczą
+    frames_read: int = 0       # klatki źródła do ostatniej pobranej (także pominięte bez dekodowania)
+    frames_sampled: int = 0    # klatki po stride, pobrane z kolejki
+    frames_processed: int = 0  # klatki, które przeszły przez detekcję
+    motion_skipped: int = 0    # klatki odrzucone przez bramkę ruchu (bez YOLO)
+    detections: int = 0
+    ocr_calls: int = 0
+    ocr_skipped: int = 0       # detekcje bez OCR, bo ślad ma już pewny konsensus
+    events: int = 0
+    vehicles: int = 0
+    started: float = field(default_factory=time.perf_counter)
+
+    def elapsed(self) -> float:
+        return time.perf_counter() - self.started
+
+    def report(self) -> dict:
+        dt = max(self.elapsed(), 1e-9)
+        return {
+            "frames_read": self.frames_read,
+            "frames_sampled": self.frames_sampled,
+            "frames_processed": self.frames_processed,
+            "motion_skipped": self.motion_skipped,
+            "detections": self.detections,
+            "ocr_calls": self.ocr_calls,
+            "ocr_skipped": self.ocr_skipped,
+            "events": self.events,
+            "vehicles": self.vehicles,
+            "elapsed_s": round(dt, 3),
+            "source_fps": round(self.frames_read / dt, 1),
+            "processed_fps": round(self.frames_processed / dt, 1),
+        }
+
+
+def _open_source(source):
+    """(kind, obj, fps): 'dir' -> lista plików, 'video' -> cv2.VideoCapture."""
+    if isinstance(source, int) or (isinstance(source, str) and source.isdigit()):
+        cap = cv2.VideoCapture(int(source))
+    else:
+        p = Path(source)
+        if p.is_dir():
+            files = sorted(f for f in p.iterdir() if f.suffix.lower() in IMAGE_EXT)
+            return "dir", files, None
+        if not p.exists():
+            raise FileNotFoundError(f"Brak źródła: {source}")
+        cap = cv2.VideoCapture(str(p))
+
+    if not cap.isOpened():
+        raise RuntimeError(f"Nie mogę otworzyć strumienia: {source}")
+    fps = cap.get(cv2.CAP_PROP_FPS) or None
+    return "video", cap, fps
+
+
+def iter_frames(source, stride: int = 1, queue_size: int = 8, stats: StreamStats | None = None):
+    """
+    Generator (frame_index, timestamp, frame_bgr) co stride klatek.
+    Dekodowanie w wątku tła; kolejka queue_size ogranicza pamięć (wolny konsument
+    wstrzymuje dekoder zamiast gromadzić klatki). Zamknięcie generatora zatrzymuje dekoder.
+    stats: liczniki tylko dla klatek faktycznie pobranych z kolejki.
+    """
+    stride = max(1, int(stride))
+    kind, src, fps = _open_source(source)
+    q: queue.Queue = queue.Queue(maxsize=queue_size)
+    stop = threading.Event()
+    stats = stats or StreamStats()
+    total = [0]  # klatki przeczytane przez dekoder; do stats dopiero po dojściu do końca źródła
+
+    def put(item) -> bool:
+        while not stop.is_set():
+            try:
+                q.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def decode():
+        try:
+            if kind == "dir":
+                for i, f in enumerate(src):
+                    total[0] += 1
+                    if i % stride:
+                        continue
+                    frame = cv2.imread(str(f))
+                    if frame is None:
+                        continue
+                    if not put((i, None, frame)):
+                        return
+            else:
+                i = 0
+                while not stop.is_set():
+                    if i % stride:
+                        # grab bez dekodowania pikseli
+                        ok = src.grab()
+                        frame = None
+                    else:
+                        ok, frame = src.read()
+                    if not ok:
+                        break
+                    total[0] += 1
+                    if frame is not None:
+                        ts = (i / fps) if fps else None
+                        if not put((i, ts, frame)):
+                            return
+                    i += 1
+        finally:
+            if kind == "video":
+                src.release()
+            put(_END)
+
+    t = threading.Thread(target=decode, name="frame-decoder", daemon=True)
+    t.start()
+    try:
+        while True:
+            item = q.get()
+            if item is _END:
+                stats.frames_read = total[0]
+                break
+            stats.frames_read = item[0] + 1
+            stats.frames_sampled += 1
+            yield item
+    finally:
+        stop.set()
+        t.join(timeout=1.0)
+
+
+class StreamProcessor:
+    def __init__(self, detector, ocr, batch: int = 4, pad: int = 30, tracker=None, motion=None,
+                 roi=None, timer: StageTimer | None = None):
+        """
+        detector / ocr: jak w ParkingService (PlateDetector / PlateOCR albo atrapy)
+        batch: ile próbkowanych klatek idzie razem przez detect_batch / read_batch
+        tracker: PlateTracker - zamiast PlateEvent na klatkę, VehiclePassage na pojazd
+        motion: MotionGate - klatki bez ruchu nie idą do detekcji
+        roi: src.config.Roi - YOLO widzi tylko wycinek kadru
+        timer: StageTimer - czasy etapów (motion / detect / crop / preprocess / ocr)
+        """
+        self.detector = detector
+        self.ocr = ocr
+        self.batch = max(1, batch)
+        self.pad = pad
+        self.tracker = tracker
+        self.motion = motion
+        self.roi = roi
+        self.timer = timer or StageTimer(enabled=False)
+        self.stats = StreamStats()
+
+    def process(self, source, stride: int = 5, queue_size: int = 8, limit: int | None = None):
+        """
+        Generator zdarzeń dla źródła (wideo / kamera / katalog):
+        PlateEvent bez trackera, VehiclePassage z trackerem.
+        limit: ile klatek (po stride) obsłużyć - liczone tu, bo wątek dekodujący wyprzedza konsumenta
+        """
+        self.stats = StreamStats()
+        pending = []
+        consumed = 0
+        if self.motion is not None:
+            self.motion.reset()
+        frames = iter_frames(source, stride, queue_size, self.stats)
+        try:
+            for item in frames:
+                i, ts, frame = item
+                consumed += 1
+                moving = True
+                if self.motion is not None:
+                    with self.timer.stage("motion"):
+                        moving = self.motion.check(frame)
+                if not moving:
+                    self.stats.motion_skipped += 1
+                    if self.tracker is not None:
+                        # pusta klatka też starzeje ślady - najpierw dokończ zaległą paczkę
+                        if pending:
+                            yield from self._process_batch(pending)
+                            pending = []
+                        self.tracker.update(i, [], ts)
+                        yield from self._passages(self.tracker.expire())
+                else:
+                    pending.append(item)
+                    if len(pending) >= self.batch:
+                        yield from self._process_batch(pending)
+                        pending = []
+                if limit and consumed >= limit:
+                    break
+        finally:
+            # także po limit: dekoder staje od razu, nie dekoduje klatek na zapas
+            frames.close()
+        if pending:
+            yield from self._process_batch(pending)
+        if self.tracker is not None:
+            yield from self._passages(self.tracker.flush())
+
+    def _passages(self, passages):
+        for p in passages:
+            self.stats.vehicles += 1
+            yield p
+
+    def _process_batch(self, items):
+        frames = [frame for _, _, frame in items]
+        with self.timer.stage("detect"):
+            dets = detect_batch_roi(self.detector, frames, self.roi)
+        self.stats.frames_processed += len(frames)
+
+        found = []
+        crops = []
+        in_batch: dict[int, int] = {}  # odczyty zlecone w tej paczce na ślad
+        for (i, ts, frame), det in zip(items, dets):
+            track = None
+            if self.tracker is not None:
+                tracks = self.tracker.update(i, [det] if det is not None else [], ts)
+                track = tracks[0] if tracks else None
+            if det is None:
+                continue
+            self.stats.detections += 1
+
+            if track is not None:
+                n = in_batch.get(track.track_id, 0)
+                if not self.tracker.needs_ocr(track) or track.ocr_calls + n >= self.tracker.max_reads:
+                    self.stats.ocr_skipped += 1
+                    continue
+                in_batch[track.track_id] = n + 1
+
+            x1, y1, x2, y2, yconf = det
+            with self.timer.stage("crop"):
+                plate_bgr = crop_with_padding(frame, x1, y1, x2, y2, pad=self.pad, copy=False)
+            if plate_bgr is None or plate_bgr.size == 0:
+                continue
+            found.append((i, ts, det, track))
+            crops.append(plate_bgr)
+
+        if crops:
+            with self.timer.stage("preprocess"):
+                plates_rgb = preprocess_batch(crops)
+            self.stats.ocr_calls += len(plates_rgb)
+            with self.timer.stage("ocr"):
+                reads = self.ocr.read_batch(plates_rgb)
+            for (i, ts, det, track), (raw, rconf) in zip(found, reads):
+                if track is not None:
+                    self.tracker.add_read(track, raw, rconf)
+                    continue
+                plate = validate_and_fix(raw)
+                if not plate:
+                    continue
+                self.stats.events += 1
+                yield PlateEvent(
+                    frame_index=i,
+                    timestamp=ts,
+                    plate=plate,
+                    raw=raw,
+                    ocr_conf=float(rconf),
+                    yolo_conf=float(det[4]),
+                    box=tuple(int(v) for v in det[:4]),
+                )
+
+        if self.tracker is not None:
+            yield from self._passages(self.tracker.expire())
@@ -0,0 +1,78 @@
+# src/vision/stubs.py
+"""
+Atrapy modeli do benchmarków narzutu (scheduler, HTTP, suite) - bez torch / paddle.
+
+Koszt wywołania modeluje batch: base_ms (stały narzut przebiegu) + per_item_ms * n.
+Interfejs jak PlateDetector / PlateOCR, więc można je podać do ParkingService(detector=..., ocr=...).
+"""
+import threading
+import time
+
+
+class StubDetector:
+    def __init__(self, base_ms: float = 20.0, per_item_ms: float = 5.0, conf: float = 0.9):
+        self.base_ms = base_ms
+        self.per_item_ms = per_item_ms
+        self.conf = conf
+        self.calls = 0
+        # jak prawdziwy model: jedna inferencja naraz
+        self._lock = threading.Lock()
+
+    def detect_best(self, image_bgr):
+        return self.detect_batch([image_bgr])[0]
+
+    def detect_batch(self, images_bgr, batch_size: int | None = None):
+        images = list(images_bgr)
+        if not images:
+            return []
+
+        with self._lock:
+            self.calls += 1
+            time.sleep((self.base_ms + self.per_item_ms * len(images)) / 1000)
+
+        out = []
+        for img in images:
+            shape = getattr(img, "shape", None)
+            if shape is None:
+                out.append((10, 10, 110, 40, self.conf))
+                continue
+            # box na środku kadru (1/3 szerokości, 1/8 wysokości)
+            h, w = shape[:2]
+            out.append((w // 3, h * 7 // 16, w * 2 // 3, h * 9 // 16, self.conf))
+        return out
+
+    def detect_all(self, image_bgr, box_filter=None):
+        return self.detect_all_batch([image_bgr], box_filter=box_filter)[0]
+
+    def detect_all_batch(self, images_bgr, batch_size: int | None = None, box_filter=None):
+        from src.vision.detector import filter_boxes
+
+        out = [[d] for d in self.detect_batch(images_bgr, batch_size)]
+        if box_filter is not None:
+            out = [filter_boxes(boxes, box_filter) for boxes in out]
+        return out
+
+
+class StubOCR:
+    def __init__(self, base_ms: float = 5.0, per_item_ms: float = 8.0,
+                 text: str = "SCZ26114", conf: float = 0.95):
+        self.base_ms = base_ms
+        self.per_item_ms = per_item_ms
+        self.text = text
+        self.conf = conf
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    def read_best(self, plate_rgb):
+        return self.read_batch([plate_rgb])[0]
+
+    def read_batch(self, plates_rgb, timings: dict | None = None) -> list[tuple[str, float]]:
+        plates = list(plates_rgb)
+        if not plates:
+            return []
+
+        with self._lock:
+            self.calls += 1
+            time.sleep((self.base_ms + self.per_item_ms * len(plates)) / 1000)
+
+        return [(self.text, self.conf) if p is not None else ("", 0.0) for p in plates]
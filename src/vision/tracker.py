@@ -0,0 +1,200 @@
+# src/vision/tracker.py
+"""
+Śledzenie tablic między klatkami strumienia + głosowanie po znakach.
+
+- Ramki z detektora łączone są z istniejącymi śladami po IoU, a gdy ramka
+  przesunęła się za daleko (duży stride) - po odległości środków.
+- Każdy odczyt OCR głosuje na długość tekstu i na znak na każdej pozycji,
+  z wagą = pewność OCR.
+- Ślad przestaje wymagać OCR, gdy konsensus jest pewny (albo po max_reads odczytach).
+- Ślad niewidziany przez max_age próbkowanych klatek zamyka się jako jeden
+  przejazd pojazdu (VehiclePassage).
+"""
+from collections import defaultdict
+from dataclasses import dataclass, field
+
+from src.vision.validate import validate_and_fix
+
+
+def iou(a, b) -> float:
+    ax1, ay1, ax2, ay2 = a[:4]
+    bx1, by1, bx2, by2 = b[:4]
+    iw = max(0, min(ax2, bx2) - max(ax1, bx1))
+    ih = max(0, min(ay2, by2) - max(ay1, by1))
+    inter = iw * ih
+    union = (ax2 - ax1) * (ay2 - ay1) + (bx2 - bx1) * (by2 - by1) - inter
+    return inter / union if union > 0 else 0.0
+
+
+def _center_shift(a, b) -> float:
+    """Odległość środków ramek względem szerokości ramki a."""
+    acx, acy = (a[0] + a[2]) / 2, (a[1] + a[3]) / 2
+    bcx, bcy = (b[0] + b[2]) / 2, (b[1] + b[3]) / 2
+    w = max(1, a[2] - a[0])
+    return (((acx - bcx) ** 2 + (acy - bcy) ** 2) ** 0.5) / w
+
+
+@dataclass(frozen=True)
+class VehiclePassage:
+    track_id: int
+    plate: str | None
+    conf: float                 # zgodność głosów (0..1)
+    first_frame: int
+    last_frame: int
+    first_ts: float | None
+    last_ts: float | None
+    frames: int                 # klatki z detekcją w tym śladzie
+    ocr_calls: int
+
+    @property
+    def ocr_saved(self) -> int:
+        return self.frames - self.ocr_calls
+
+
+@dataclass(eq=False)
+class Track:
+    track_id: int
+    box: tuple
+    first_frame: int
+    last_frame: int
+    first_ts: float | None = None
+    last_ts: float | None = None
+    frames: int = 1
+    ocr_calls: int = 0
+    locked: bool = False
+    len_votes: dict = field(default_factory=lambda: defaultdict(float))
+    # długość -> lista {znak: waga} po pozycjach
+    char_votes: dict = field(default_factory=dict)
+
+    def add_read(self, raw: str, conf: float):
+        self.ocr_calls += 1
+        plate = validate_and_fix(raw)
+        if not plate:
+            return
+        w = max(float(conf), 1e-3)
+        self.len_votes[len(plate)] += w
+        pos = self.char_votes.setdefault(len(plate), [defaultdict(float) for _ in plate])
+        for slot, ch in zip(pos, plate):
+            slot[ch] += w
+
+    def consensus(self) -> tuple[str | None, float]:
+        """
+        (tekst, pewność): najczęstsza długość, potem najcięższy znak na każdej pozycji.
+        Pewność = mniejsza z: udział zwycięskiej długości, najsłabszy udział zwycięskiego znaku.
+        """
+        if not self.len_votes:
+            return None, 0.0
+        total_len = sum(self.len_votes.values())
+        n = max(self.len_votes, key=self.len_votes.get)
+        conf = self.len_votes[n] / total_len
+
+        chars = []
+        for slot in self.char_votes[n]:
+            ch = max(slot, key=slot.get)
+            chars.append(ch)
+            conf = min(conf, slot[ch] / sum(slot.values()))
+        return "".join(chars), conf
+
+    def passage(self) -> VehiclePassage:
+        plate, conf = self.consensus()
+        return VehiclePassage(
+            track_id=self.track_id,
+            plate=plate,
+            conf=conf,
+            first_frame=self.first_frame,
+            last_frame=self.last_frame,
+            first_ts=self.first_ts,
+            last_ts=self.last_ts,
+            frames=self.frames,
+            ocr_calls=self.ocr_calls,
+        )
+
+
+class PlateTracker:
+    def __init__(self, iou_thr: float = 0.3, max_shift: float = 1.5, max_age: int = 5,
+                 min_reads: int = 2, max_reads: int = 6, lock_conf: float = 0.8,
+                 min_weight: float = 1.5):
+        """
+        iou_thr:    minimalne IoU, żeby uznać ramkę za ten sam ślad
+        max_shift:  awaryjnie - maks. przesunięcie środka (w szerokościach ramki)
+        max_age:    po ilu próbkowanych klatkach bez detekcji zamknąć ślad
+        min_reads / max_reads: ile odczytów OCR najmniej / najwięcej na ślad
+        lock_conf / min_weight: konsensus uznany za pewny, gdy zgodność >= lock_conf
+                    i suma wag zwycięskiej długości >= min_weight
+        """
+        self.iou_thr = iou_thr
+        self.max_shift = max_shift
+        self.max_age = max_age
+        self.min_reads = min_reads
+        self.max_reads = max_reads
+        self.lock_conf = lock_conf
+        self.min_weight = min_weight
+        self.tracks: list[Track] = []
+        self._next_id = 1
+        self._age: dict[int, int] = {}
+
+    def needs_ocr(self, track: Track) -> bool:
+        return not track.locked and track.ocr_calls < self.max_reads
+
+    def add_read(self, track: Track, raw: str, conf: float):
+        track.add_read(raw, conf)
+        if track.ocr_calls >= self.min_reads:
+            _, c = track.consensus()
+            if c >= self.lock_conf and max(track.len_votes.values(), default=0.0) >= self.min_weight:
+                track.locked = True
+
+    def update(self, frame_index: int, boxes: list, ts: float | None = None) -> list[Track]:
+        """
+        Przypisuje ramki z jednej klatki do śladów (zachłannie, najpierw najwyższe IoU).
+        Zwraca ślad dla każdej ramki w tej samej kolejności.
+        """
+        pairs = []
+        for bi, box in enumerate(boxes):
+            for t in self.tracks:
+                pairs.append((iou(t.box, box), bi, t))
+        pairs.sort(key=lambda p: p[0], reverse=True)
+
+        out: list[Track | None] = [None] * len(boxes)
+        used = set()
+        for score, bi, t in pairs:
+            if out[bi] is not None or t.track_id in used:
+                continue
+            if score >= self.iou_thr or _center_shift(t.box, boxes[bi]) <= self.max_shift:
+                out[bi] = t
+                used.add(t.track_id)
+
+        for bi, box in enumerate(boxes):
+            t = out[bi]
+            if t is None:
+                t = Track(self._next_id, tuple(box[:4]), frame_index, frame_index,
+                          first_ts=ts, last_ts=ts)
+                self._next_id += 1
+                self.tracks.append(t)
+                out[bi] = t
+            else:
+                t.box = tuple(box[:4])
+                t.last_frame = frame_index
+                t.last_ts = ts
+                t.frames += 1
+            self._age[t.track_id] = 0
+
+        seen = {t.track_id for t in out}
+        for t in self.tracks:
+            if t.track_id not in seen:
+                self._age[t.track_id] = self._age.get(t.track_id, 0) + 1
+        return out
+
+    def expire(self) -> list[VehiclePassage]:
+        """Zamyka ślady niewidziane od max_age klatek."""
+        done = [t for t in self.tracks if self._age.get(t.track_id, 0) >= self.max_age]
+        return self._close(done)
+
+    def flush(self) -> list[VehiclePassage]:
+        """Zamyka wszystkie ślady (koniec strumienia)."""
+        return self._close(list(self.tracks))
+
+    def _close(self, done: list[Track]) -> list[VehiclePassage]:
+        for t in done:
+            self.tracks.remove(t)
+            self._age.pop(t.track_id, None)
+        return [t.passage() for t in done]
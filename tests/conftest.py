@@ -0,0 +1,12 @@
+import pytest
+
+from src.storage import db
+
+
+@pytest.fixture
+def tmp_db(tmp_path, monkeypatch):
+    """Osobna baza SQLite na test (get_conn trzyma połączenia per ścieżka)."""
+    monkeypatch.setattr(db, "DB_PATH", tmp_path / "parking.db")
+    db.init_db()
+    yield db.DB_PATH
+    db.close_conn()
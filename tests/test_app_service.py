@@ -0,0 +1,56 @@
+import numpy as np
+import pytest
+
+from src.app_service import ParkingService
+from src.vision.stubs import StubDetector, StubOCR
+
+pytest.importorskip("cv2")
+
+
+def test_read_plate_all_errors_does_not_load_models(tmp_db):
+    service = ParkingService(model_path="models/nope.pt", cache_size=0, timings=True)
+
+    res = service.read_plate("/nope.jpg")
+
+    assert res["ok"] is False
+    assert "Brak pliku" in res["error"]
+    assert service._detector is None and service._ocr is None
+    assert "detect" not in service.timer.snapshot()
+
+
+def test_read_frame_all_cache_hits_skip_detection(tmp_db):
+    detector, ocr = StubDetector(base_ms=0, per_item_ms=0), StubOCR(base_ms=0, per_item_ms=0)
+    service = ParkingService(detector=detector, ocr=ocr, cache_size=8, cache_frames=True,
+                             timings=True)
+    frame = np.random.default_rng(0).integers(0, 256, size=(240, 320, 3), dtype=np.uint8)
+
+    first = service.read_frame(frame)
+    second = service.read_frame(frame)
+
+    assert second == first
+    assert detector.calls == 1 and ocr.calls == 1
+    assert service.timer.snapshot()["detect"]["count"] == 1
+
+
+def test_frames_not_cached_by_default(tmp_db):
+    detector, ocr = StubDetector(base_ms=0, per_item_ms=0), StubOCR(base_ms=0, per_item_ms=0)
+    service = ParkingService(detector=detector, ocr=ocr, cache_size=8)
+    frame = np.zeros((240, 320, 3), dtype=np.uint8)
+
+    service.read_frame(frame)
+    service.read_frame(frame)
+
+    assert detector.calls == 2
+    assert service.cache_stats()["size"] == 0
+
+
+def test_cache_ident_depends_on_backend(tmp_db, tmp_path):
+    from src.config import DetectorBackend
+
+    pt = tmp_path / "plate_detector.pt"
+    pt.write_bytes(b"weights")
+    torch = ParkingService(model_path=str(pt))
+    onnx = ParkingService(model_path=str(pt), backend=DetectorBackend("onnx"))
+
+    assert torch._cache_ident != onnx._cache_ident
+    assert "plate_detector.onnx" in onnx._cache_ident
@@ -0,0 +1,44 @@
+from datetime import datetime
+
+from src.storage.repo import apply_events, list_last
+
+
+def test_apply_events_rejects_aware_time_without_aborting_batch(tmp_db):
+    out = apply_events([
+        {"kind": "entry", "plate": "AAA11111", "when": "2025-01-01T08:00:00"},
+        {"kind": "exit", "plate": "AAA11111", "when": "2025-01-01T08:00:09+00:00"},
+        {"kind": "entry", "plate": "BBB22222", "when": datetime(2025, 1, 1, 8, 1)},
+    ])
+
+    assert [r["ok"] for r in out] == [True, False, True]
+    assert "strefą" in out[1]["error"]
+    rows = {r["plate"]: r["status"] for r in list_last(10)}
+    assert rows == {"AAA11111": "IN", "BBB22222": "IN"}
+
+
+def test_apply_events_rejects_non_datetime_time(tmp_db):
+    out = apply_events([
+        {"kind": "entry", "plate": "AAA11111", "when": 1735718400},
+        {"kind": "entry", "plate": "BBB22222", "when": "2025-01-01T08:00:00"},
+    ])
+
+    assert [r["ok"] for r in out] == [False, True]
+    assert [r["plate"] for r in list_last(10)] == ["BBB22222"]
+
+
+def test_apply_events_sql_error_rolls_back_only_that_event(tmp_db):
+    # wjazd zapisany wcześniej z czasem ze strefą -> fee_for w UPDATE rzuca błąd SQLite
+    from src.storage.db import get_conn
+    with get_conn() as conn:
+        conn.execute("INSERT INTO parking_events(plate, entry_time, status) "
+                     "VALUES ('CCC33333', '2025-01-01T07:00:00+00:00', 'IN')")
+
+    out = apply_events([
+        {"kind": "entry", "plate": "AAA11111", "when": "2025-01-01T08:00:00"},
+        {"kind": "exit", "plate": "CCC33333", "when": "2025-01-01T09:00:00"},
+        {"kind": "exit", "plate": "AAA11111", "when": "2025-01-01T09:00:00"},
+    ])
+
+    assert [r["ok"] for r in out] == [True, False, True]
+    rows = {r["plate"]: r["status"] for r in list_last(10)}
+    assert rows == {"AAA11111": "OUT", "CCC33333": "IN"}